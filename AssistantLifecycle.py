@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from openai import OpenAI, NotFoundError
+from ExtractionManifest import prompt_hash
+
+
+class AssistantLifecycle:
+    """
+    Owns the remote Assistants API objects used by the PDF extraction pipeline.
+    - The assistant is created once per (model, instructions, tools) and its id is cached on disk.
+    - Each PDF gets its own thread, created when the PDF needs it: threads keep their message
+      history, so they cannot be reused, and pre-created spares would only cost extra API calls.
+    - Used threads (with the vector stores file_search attached to them) and uploaded
+      files are deleted in the background, so remote resources do not pile up.
+    """
+    def __init__(self, client: OpenAI, model: str, instructions: str, cache_path: str,
+                 name: str = "PDF assistant", description: str = ""):
+        self._client = client
+        self._model = model
+        self._instructions = instructions
+        self._name = name
+        self._description = description
+        self._tools = [{"type": "file_search"}]
+        self.cache_path = cache_path
+        self._cache_key = prompt_hash(model, instructions, json.dumps(self._tools))
+        self._assistant_id = None
+        self._lock = threading.Lock()
+
+        self._background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="assistant-cleanup")
+
+    # --- assistant ---
+
+    @property
+    def assistant_id(self) -> str:
+        with self._lock:
+            if self._assistant_id is None:
+                self._assistant_id = self._load_or_create_assistant()
+            return self._assistant_id
+
+    def _load_or_create_assistant(self) -> str:
+        cache = self._read_cache()
+        assistant_id = cache.get(self._cache_key)
+        if assistant_id:
+            try:
+                return self._client.beta.assistants.retrieve(assistant_id).id
+            except NotFoundError:
+                print(f"Cached assistant {assistant_id} no longer exists, creating a new one.")
+
+        assistant = self._client.beta.assistants.create(
+            model=self._model,
+            description=self._description,
+            tools=self._tools,
+            name=self._name,
+            instructions=self._instructions,
+        )
+        cache[self._cache_key] = assistant.id
+        self._write_cache(cache)
+        return assistant.id
+
+    def _read_cache(self) -> dict:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_cache(self, cache: dict):
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        tmp_path = self.cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(cache, fh, indent=4)
+        os.replace(tmp_path, self.cache_path)
+
+    # --- threads ---
+
+    def acquire_thread(self) -> str:
+        return self._client.beta.threads.create().id
+
+    def release_thread(self, thread_id: str):
+        """
+        Threads keep their message history, so a used thread is deleted rather than reused.
+        """
+        self._background.submit(self._delete_thread, thread_id)
+
+    def _delete_thread(self, thread_id: str):
+        try:
+            thread = self._client.beta.threads.retrieve(thread_id)
+            file_search = thread.tool_resources.file_search if thread.tool_resources else None
+            for vector_store_id in (file_search.vector_store_ids or []) if file_search else []:
+                self._client.beta.vector_stores.delete(vector_store_id)
+            self._client.beta.threads.delete(thread_id)
+        except Exception as e:
+            print(f"[WARN] Could not clean up thread {thread_id}: {e}")
+
+    # --- files ---
+
+    def release_file(self, file_id: str):
+        self._background.submit(self._delete_file, file_id)
+
+    def _delete_file(self, file_id: str):
+        try:
+            self._client.files.delete(file_id)
+        except NotFoundError:
+            pass
+        except Exception as e:
+            print(f"[WARN] Could not delete uploaded file {file_id}: {e}")
+
+    def close(self):
+        """
+        Wait for pending cleanup to finish.
+        """
+        self._background.shutdown(wait=True)
@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from PdfExtractor import page_count
+from PdfTextCache import file_sha256
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "contract_catalog.sqlite")
+
+CATALOG_COLUMNS = ("name", "file_path", "file_name", "size", "sha256", "page_count", "uploaded_at")
+
+
+class ContractCatalog:
+    """
+    Persistent catalog (SQLite) of the uploaded contract PDFs: name, path, size, hash, page count
+    and upload time. It is updated on every upload, so listing contracts never scans or stats
+    data/contracts; sync_directory reconciles it with the folder when asked to.
+    """
+    def __init__(self, db_path: str = DEFAULT_CATALOG_PATH):
+        self._db_path = db_path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS contracts (
+                    file_path TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    page_count INTEGER,
+                    uploaded_at TEXT NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS contracts_uploaded_at ON contracts (uploaded_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS contracts_name ON contracts (name COLLATE NOCASE)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def add(self, name: str, file_path: str, uploaded_at: Optional[str] = None, sha256: Optional[str] = None) -> Dict:
+        """
+        Record (or refresh) one contract file.
+        """
+        try:
+            pages = page_count(file_path)
+        except Exception as e:
+            print(f"[WARN] Could not count the pages of {file_path}: {e}")
+            pages = None
+        entry = {
+            "name": name,
+            "file_path": file_path,
+            "file_name": os.path.basename(file_path),
+            "size": os.path.getsize(file_path),
+            "sha256": sha256 or file_sha256(file_path),
+            "page_count": pages,
+            "uploaded_at": uploaded_at or datetime.now().isoformat(),
+        }
+        conn = self._connection()
+        with conn:
+            conn.execute(f"INSERT OR REPLACE INTO contracts ({', '.join(CATALOG_COLUMNS)}) "
+                         f"VALUES ({', '.join('?' * len(CATALOG_COLUMNS))})",
+                         [entry[column] for column in CATALOG_COLUMNS])
+        return entry
+
+    def list(self, offset: int = 0, limit: Optional[int] = None, search: Optional[str] = None) -> List[Dict]:
+        """
+        Newest uploads first; search matches a substring of the contract name, case-insensitively.
+        """
+        where, parameters = self._where(search)
+        rows = self._connection().execute(
+            f"SELECT {', '.join(CATALOG_COLUMNS)} FROM contracts {where} "
+            f"ORDER BY uploaded_at DESC, file_path LIMIT ? OFFSET ?",
+            [*parameters, -1 if limit is None else limit, offset]).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, search: Optional[str] = None) -> int:
+        where, parameters = self._where(search)
+        return self._connection().execute(f"SELECT COUNT(*) FROM contracts {where}", parameters).fetchone()[0]
+
+    def remove(self, file_path: str):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM contracts WHERE file_path = ?", (file_path,))
+
+    @staticmethod
+    def _where(search: Optional[str]):
+        if not search or not search.strip():
+            return "", []
+        escaped = search.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return "WHERE name LIKE ? ESCAPE '\\' COLLATE NOCASE", [f"%{escaped}%"]
+
+    def sync_directory(self, contracts_dir: str) -> Dict:
+        """
+        Reconcile the catalog with the PDFs in contracts_dir: add untracked files (named and dated
+        like add_contract's <name>_<timestamp>.pdf, by modification time) and drop missing ones.
+        """
+        known = {row[0] for row in self._connection().execute("SELECT file_path FROM contracts")}
+        on_disk = {os.path.join(contracts_dir, fname) for fname in os.listdir(contracts_dir) if fname.endswith(".pdf")}
+        for file_path in sorted(on_disk - known):
+            name = os.path.basename(file_path).rsplit("_", 1)[0].replace("_", " ")
+            self.add(name, file_path, uploaded_at=datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat())
+        for file_path in known - on_disk:
+            self.remove(file_path)
+        return {"added": len(on_disk - known), "removed": len(known - on_disk)}
@@ -0,0 +1,128 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import List, Tuple
+from LocalExtractor import chunk_sections
+from PdfTextCache import PdfTextCache
+
+SIDECAR_SUFFIX = ".chunks.json"
+
+TOKEN = re.compile(r"\w+")
+STOPWORDS = frozenset("""
+a an and any are as at be by can do does for from has have how i if in is it its may of on or shall
+should that the their there this to under was what when where which who will with would
+""".split())
+
+
+# Light suffix stripping so "terminate", "terminated" and "termination" share a term
+SUFFIXES = ("ations", "ation", "ings", "ing", "ions", "ion", "ed", "es", "s", "e")
+
+
+def _stem(token: str) -> str:
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(token) for token in TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the chunks of one contract.
+    """
+    def __init__(self, chunks: List[str], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self._k1 = k1
+        self._b = b
+        self._term_counts = [Counter(tokenize(chunk)) for chunk in chunks]
+        self._lengths = [sum(counts.values()) for counts in self._term_counts]
+        self._average_length = (sum(self._lengths) / len(chunks)) if chunks else 0.0
+        document_frequency = Counter(term for counts in self._term_counts for term in counts)
+        self._idf = {term: math.log(1 + (len(chunks) - df + 0.5) / (df + 0.5))
+                     for term, df in document_frequency.items()}
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        """
+        (chunk index, score) of the best matching chunks; chunks sharing no term with the query are left out.
+        """
+        terms = [term for term in set(tokenize(query)) if term in self._idf]
+        scores = []
+        for i, counts in enumerate(self._term_counts):
+            score = 0.0
+            for term in terms:
+                tf = counts.get(term)
+                if tf:
+                    norm = self._k1 * (1 - self._b + self._b * self._lengths[i] / (self._average_length or 1))
+                    score += self._idf[term] * tf * (self._k1 + 1) / (tf + norm)
+            if score > 0:
+                scores.append((i, score))
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[:top_k]
+
+
+class ContractChunkIndex:
+    """
+    Per-contract BM25 chunk indexes for question answering.
+    The chunks (whole sections packed to at most max_chars) are stored in a sidecar next to the
+    PDF (<contract>.pdf.chunks.json) keyed by the PDF hash; built indexes are kept in an LRU.
+    """
+    def __init__(self, text_cache: PdfTextCache, max_chars: int = 1500, max_entries: int = 32):
+        self._text_cache = text_cache
+        self._max_chars = max_chars
+        self._max_entries = max_entries
+        self._indexes = OrderedDict()   # sha256 -> BM25Index
+        self._lock = threading.Lock()
+
+    def get_index(self, pdf_path: str) -> BM25Index:
+        key = self._text_cache.content_hash(pdf_path)
+        with self._lock:
+            if key in self._indexes:
+                self._indexes.move_to_end(key)
+                return self._indexes[key]
+
+        chunks = self._read_sidecar(pdf_path, key)
+        if chunks is None:
+            chunks = chunk_sections(self._text_cache.get_pages(pdf_path), max_chars=self._max_chars)
+            self._write_sidecar(pdf_path, key, chunks)
+        index = BM25Index(chunks)
+
+        with self._lock:
+            self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self._max_entries:
+                self._indexes.popitem(last=False)
+        return index
+
+    def search(self, pdf_path: str, question: str, top_k: int = 5) -> List[str]:
+        """
+        The top_k passages for the question, in document order.
+        """
+        index = self.get_index(pdf_path)
+        hits = sorted(i for i, _ in index.search(question, top_k))
+        return [index.chunks[i] for i in hits]
+
+    def _read_sidecar(self, pdf_path: str, key: str):
+        try:
+            with open(pdf_path + SIDECAR_SUFFIX, 'r', encoding='utf-8') as fh:
+                sidecar = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if sidecar.get('sha256') != key or sidecar.get('max_chars') != self._max_chars:
+            return None
+        return sidecar.get('chunks')
+
+    def _write_sidecar(self, pdf_path: str, key: str, chunks: List[str]):
+        sidecar_path = pdf_path + SIDECAR_SUFFIX
+        tmp_path = sidecar_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                json.dump({'sha256': key, 'max_chars': self._max_chars, 'chunks': chunks}, fh)
+            os.replace(tmp_path, sidecar_path)
+        except OSError as e:
+            print(f"[WARN] Could not write chunk index for {pdf_path}: {e}")
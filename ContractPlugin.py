@@ -1,39 +1,82 @@
 import tempfile
-import fitz
 import os
 from typing import List, Dict, Optional, Annotated
 from AgreementSchema import Agreement, ClauseType
 from semantic_kernel.functions import kernel_function
 from ContractService import ContractSearchService
+from PdfTextCache import PdfTextCache, contract_id_from_sha256
+from ContractChunkIndex import BM25Index, ContractChunkIndex
+from ContractSummarizer import ContractSummarizer, SummaryCache, SUMMARY_PROMPT, MAP_PROMPT, REDUCE_PROMPT, FINAL_PROMPT
+from ResponseCache import ResponseCache, template_hash
+from LlmStreaming import LatencyLog, TimedStream, stream_chat
 import asyncio
-from semantic_kernel.contents import ChatHistory
-from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
+import re
 from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
 
+ASK_PROMPT = "Answer this question simply for a non-expert, using these passages from the contract:\n{context}\n\nQuestion: {question}"
+ASK_CONTEXT_TOP_K = 5
+
+# Cached responses are only reused for the prompts (and retrieval settings) that produced them
+SUMMARY_TEMPLATE = template_hash(SUMMARY_PROMPT, MAP_PROMPT, REDUCE_PROMPT, FINAL_PROMPT)
+ASK_TEMPLATE = template_hash(ASK_PROMPT, f"top_k={ASK_CONTEXT_TOP_K}")
+
 class ContractPlugin:
-    def __init__(self, contract_search_service: ContractSearchService, llm: Optional[ChatCompletionClientBase] = None):
+    def __init__(self, contract_search_service: ContractSearchService, llm: Optional[ChatCompletionClientBase] = None,
+                 response_cache: Optional[ResponseCache] = None, summary_cache: Optional[SummaryCache] = None,
+                 latency_log: Optional[LatencyLog] = None):
+        # the caches and the latency log default to files under data/
         self.contract_search_service = contract_search_service
         self._llm = llm
+        self._text_cache = PdfTextCache()
+        self._chunk_index = ContractChunkIndex(self._text_cache)
+        self._summarizer = ContractSummarizer(llm, summary_cache or SummaryCache()) if llm else None
+        self._latency_log = latency_log or LatencyLog()
+        self._response_cache = response_cache or ResponseCache()
+        self._model = getattr(llm, "ai_model_id", type(llm).__name__)
 
     @kernel_function
     async def get_contract(self, contract_id: int) -> Annotated[Agreement, "A contract"]:
         return await self.contract_search_service.get_contract(contract_id)
 
+    @kernel_function(description="Several contracts by contract_id in one call; format is 'short' or 'long', "
+                                 "include_excerpts adds the clause excerpts")
+    async def get_contracts_by_ids(self, contract_ids: List[int], format: str = "short",
+                                   include_excerpts: bool = False) -> Annotated[List[Agreement], "A list of contracts"]:
+        return await self.contract_search_service.get_contracts_by_ids(
+            contract_ids=contract_ids, format=format, include_excerpts=include_excerpts)
+
     @kernel_function
     async def get_contracts(self, organization_name: str) -> Annotated[List[Agreement], "A list of contracts"]:
         return await self.contract_search_service.get_contracts(organization_name)
 
-    @kernel_function
-    async def get_contracts_without_clause(self, clause_type: ClauseType) -> Annotated[List[Agreement], "Contracts without a clause"]:
-        return await self.contract_search_service.get_contracts_without_clause(clause_type=clause_type)
+    @kernel_function(description="Contracts without a clause, at most `limit` (1-500) per call ordered by contract_id; "
+                                 "pass the last contract_id returned as after_contract_id for the next page")
+    async def get_contracts_without_clause(self, clause_type: ClauseType, limit: int = 20,
+                                           after_contract_id: Optional[int] = None) -> Annotated[List[Agreement], "Contracts without a clause"]:
+        return await self.contract_search_service.get_contracts_without_clause(
+            clause_type=clause_type, limit=limit, after_contract_id=after_contract_id)
+
+    @kernel_function(description="Contracts with a clause, at most `limit` (1-500) per call ordered by contract_id; "
+                                 "pass the last contract_id returned as after_contract_id for the next page")
+    async def get_contracts_with_clause_type(self, clause_type: ClauseType, limit: int = 20,
+                                             after_contract_id: Optional[int] = None) -> Annotated[List[Agreement], "Contracts with a clause"]:
+        return await self.contract_search_service.get_contracts_with_clause_type(
+            clause_type=clause_type, limit=limit, after_contract_id=after_contract_id)
 
     @kernel_function
-    async def get_contracts_with_clause_type(self, clause_type: ClauseType) -> Annotated[List[Agreement], "Contracts with a clause"]:
-        return await self.contract_search_service.get_contracts_with_clause_type(clause_type=clause_type)
+    async def count_contracts_without_clause(self, clause_type: ClauseType) -> Annotated[int, "Number of contracts without a clause"]:
+        return await self.contract_search_service.count_contracts_without_clause(clause_type=clause_type)
 
     @kernel_function
-    async def get_contracts_similar_text(self, clause_text: str) -> Annotated[List[Agreement], "Contracts with similar text in a clause"]:
-        return await self.contract_search_service.get_contracts_similar_text(clause_text=clause_text)
+    async def count_contracts_with_clause_type(self, clause_type: ClauseType) -> Annotated[int, "Number of contracts with a clause"]:
+        return await self.contract_search_service.count_contracts_with_clause_type(clause_type=clause_type)
+
+    @kernel_function(description="Contracts with a clause excerpt similar to clause_text. mode is 'hybrid' (default), "
+                                 "'vector' (meaning) or 'fulltext' (exact wording); max_per_contract limits results per contract")
+    async def get_contracts_similar_text(self, clause_text: str, top_k: int = 3, mode: str = "hybrid",
+                                         max_per_contract: int = 2) -> Annotated[List[Agreement], "Contracts with similar text in a clause"]:
+        return await self.contract_search_service.get_contracts_similar_text(
+            clause_text=clause_text, top_k=top_k, mode=mode, max_per_contract=max_per_contract)
 
     @kernel_function
     async def answer_aggregation_question(self, user_question: str) -> Annotated[str, "Answer to a user question"]:
@@ -57,21 +100,94 @@ class ContractPlugin:
             tmp.write(uploaded_file.getbuffer())
             tmp_path = tmp.name
 
+        # Summaries and answers cached for an earlier upload under this name are dropped
+        self._invalidate_previous_uploads(contract_name, contracts_dir)
+
         dest_path = self.contract_search_service.add_contract(contract_name, tmp_path)
+
+        # Extract the page text and build the chunk index once now, so summaries and questions read them from the cache
+        try:
+            self._chunk_index.get_index(dest_path)
+        except Exception as e:
+            print(f"[WARN] Could not pre-extract text for {dest_path}: {e}")
+
         return {"status": "success", "contract_name": contract_name, "file_path": dest_path}
     
-    def get_all_contracts(self) -> List[Dict]:
+    def _invalidate_previous_uploads(self, contract_name: str, contracts_dir: str):
+        # add_contract stores uploads as <name>_<YYYYmmddHHMMSS>.pdf
+        pattern = re.compile(re.escape(contract_name.replace(' ', '_')) + r"_\d{14}\.pdf$")
+        for fname in os.listdir(contracts_dir):
+            if pattern.match(fname):
+                try:
+                    self._response_cache.invalidate_contract(
+                        self._text_cache.content_hash(os.path.join(contracts_dir, fname)))
+                except OSError as e:
+                    print(f"[WARN] Could not invalidate cached responses for {fname}: {e}")
+
+    async def _cached_llm_stream(self, contract_path: str, kind: str, question: str, template: str, llm_stream,
+                                 timed: Optional[TimedStream] = None):
         """
-        Return all PDF contracts in persistent storage.
+        Serve a response from the ResponseCache, or stream it from llm_stream() and store it once complete.
+        A cache hit is flagged on `timed`, so it is not logged as an LLM request.
+        """
+        key = (self._text_cache.content_hash(contract_path), kind, question, self._model, template)
+        cached = await asyncio.to_thread(self._response_cache.get, *key)
+        if cached is not None:
+            if timed is not None:
+                timed.cached = True
+            yield cached
+            return
+        chunks = []
+        async for chunk in llm_stream():
+            chunks.append(chunk)
+            yield chunk
+        if chunks:
+            await asyncio.to_thread(self._response_cache.put, *key, "".join(chunks))
+
+    def get_all_contracts(self, offset: int = 0, limit: Optional[int] = None, search: Optional[str] = None) -> List[Dict]:
+        """
+        Return PDF contracts in persistent storage from the contract catalog, newest first.
+        'name' is the stored file name; the contract name, size, hash, page count and upload time are included.
         """
-        contracts_dir = os.path.join(os.getcwd(), "data/contracts")
-        os.makedirs(contracts_dir, exist_ok=True)
         contracts = []
-        for fname in os.listdir(contracts_dir):
-            if fname.endswith(".pdf"):
-                contracts.append({"name": fname, "file_path": os.path.join(contracts_dir, fname)})
+        for entry in self.contract_search_service.get_all_contracts(offset=offset, limit=limit, search=search):
+            contracts.append(dict(entry, name=entry["file_name"], contract_name=entry["name"]))
         return contracts
+
+    def count_contracts(self, search: Optional[str] = None) -> int:
+        return self.contract_search_service.count_contracts(search=search)
+
+    def sync_contract_catalog(self) -> Dict:
+        return self.contract_search_service.sync_contract_catalog()
+
+    def get_contract_text(self, contract_path: str) -> str:
+        """
+        Return the full text of a PDF contract, served from the extraction cache.
+        """
+        return self._text_cache.get_text(contract_path)
     
+    async def get_question_context(self, contract_path: str, question: str, top_k: int = 5) -> str:
+        """
+        Passages of the contract to answer a question from: when the contract is in the graph,
+        its clause excerpts that match the question come first, followed by the top_k chunks
+        of the contract's BM25 index. When nothing matches, the contract's excerpts (or else
+        its first top_k chunks) are used.
+        """
+        excerpts = []
+        try:
+            contract_id = contract_id_from_sha256(self._text_cache.content_hash(contract_path))
+            agreement = await self.contract_search_service.get_contract_excerpts(contract_id=contract_id)
+            excerpts = [f"{clause['clause_type']}: {excerpt}"
+                        for clause in agreement.get('clauses', []) for excerpt in clause.get('excerpts', [])]
+        except Exception as e:
+            print(f"[WARN] Could not read clause excerpts for {contract_path}: {e}")
+
+        matching_excerpts = [excerpts[i] for i, _ in BM25Index(excerpts).search(question, top_k)] if excerpts else []
+        passages = matching_excerpts + self._chunk_index.search(contract_path, question, top_k)
+        if not passages:
+            passages = excerpts[:top_k] or self._chunk_index.get_index(contract_path).chunks[:top_k]
+        return "\n\n---\n\n".join(passages)
+
     def summarize_contract(self, contract_path: str) -> str:
         """
         Extract text from PDF and generate a very short, simple summary for non-experts.
@@ -81,10 +197,7 @@ class ContractPlugin:
 
         # Step 1: Extract text
         try:
-            text_content = ""
-            with fitz.open(contract_path) as doc:
-                for page in doc:
-                    text_content += page.get_text()
+            text_content = self.get_contract_text(contract_path)
             if not text_content.strip():
                 return "Contract is empty or could not extract text."
         except Exception as e:
@@ -93,20 +206,73 @@ class ContractPlugin:
         # Step 2: Summarize using LLM
         if self._llm:
             try:
-                prompt = f"Summarize the following contract very briefly in simple English so anyone can understand it. Only include main points:\n\n{text_content}"
-                async def summarize_async():
-                    settings = OpenAIChatPromptExecutionSettings()
-                    chat_history = ChatHistory()
-                    chat_history.add_user_message(prompt)
-                    result = await self._llm.get_chat_message_contents(
-                        chat_history=chat_history,
-                        settings=settings,
-                        kernel=None
-                    )
-                    return result[0].content if result else "Summary could not be generated."
-                return asyncio.run(summarize_async())
+                key = (self._text_cache.content_hash(contract_path), "summarize", "", self._model, SUMMARY_TEMPLATE)
+                summary = self._response_cache.get(*key)
+                if summary is None:
+                    # long contracts are summarized chunk by chunk (map-reduce) with cached partial summaries
+                    summary = asyncio.run(self._summarizer.summarize(self._text_cache.get_pages(contract_path)))
+                    if summary:
+                        self._response_cache.put(*key, summary)
+                return summary or "Summary could not be generated."
             except Exception as e:
                 return f"Failed to summarize with LLM: {e}"
 
         # Step 3: Fallback: first 1000 chars
         return text_content[:1000] + ("..." if len(text_content) > 1000 else "")
+
+    # --- streaming (st.write_stream) ---
+
+    def stream_summary(self, contract_path: str) -> TimedStream:
+        """
+        Streaming version of summarize_contract; the returned iterator's .metrics holds the latencies.
+        """
+        async def summary():
+            if not contract_path or not contract_path.endswith(".pdf"):
+                yield "Invalid contract file."
+                return
+            try:
+                pages = self._text_cache.get_pages(contract_path)
+                if not "".join(pages).strip():
+                    yield "Contract is empty or could not extract text."
+                    return
+            except Exception as e:
+                yield f"Failed to read PDF: {e}"
+                return
+            if not self._summarizer:
+                text_content = "".join(pages)
+                yield text_content[:1000] + ("..." if len(text_content) > 1000 else "")
+                return
+            try:
+                async for chunk in self._cached_llm_stream(contract_path, "summarize", "", SUMMARY_TEMPLATE,
+                                                           lambda: self._summarizer.stream_summary(pages), timed):
+                    yield chunk
+            except Exception as e:
+                yield f"Failed to summarize with LLM: {e}"
+
+        timed = TimedStream(summary(), kind="summarize", log=self._latency_log)
+        return timed
+
+    def stream_answer(self, contract_path: str, question: str) -> TimedStream:
+        """
+        Answer a question about a contract from its relevant passages, streamed as it is generated.
+        """
+        async def answer():
+            try:
+                context = await self.get_question_context(contract_path, question, top_k=ASK_CONTEXT_TOP_K)
+                if not context.strip():
+                    yield "Contract is empty or could not extract text."
+                    return
+            except Exception as e:
+                yield f"Failed to read PDF: {e}"
+                return
+
+            prompt = ASK_PROMPT.format(context=context, question=question)
+            try:
+                async for chunk in self._cached_llm_stream(contract_path, "ask", question, ASK_TEMPLATE,
+                                                           lambda: stream_chat(self._llm, prompt), timed):
+                    yield chunk
+            except Exception as e:
+                yield f"Failed to answer with LLM: {e}"
+
+        timed = TimedStream(answer(), kind="ask", log=self._latency_log)
+        return timed
@@ -1,180 +1,421 @@
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase, AsyncDriver, RoutingControl
 from typing import List 
 from AgreementSchema import Agreement, ClauseType,Party, ContractClause
 from neo4j_graphrag.retrievers import VectorCypherRetriever,Text2CypherRetriever
 from neo4j_graphrag.embeddings import OpenAIEmbeddings
+from EmbeddingCache import EmbeddingCache, CachedEmbedder
 from formatters import my_vector_search_excerpt_record_formatter
+from neo4j_graphrag.generation.prompts import Text2CypherTemplate
+from GraphSchema import load_graph_schema
+from Text2CypherCache import Text2CypherCache
+from ContractCatalog import ContractCatalog
+from HybridSearch import lucene_query, reciprocal_rank_fusion, diversify
+from QueryCache import QueryResultCache, cached_read, GET_GRAPH_GENERATION_QUERY, BUMP_GRAPH_GENERATION_STATEMENT
 from neo4j_graphrag.llm import OpenAILLM
 import os
+import asyncio
+import re
+import threading
 from datetime import datetime
 
 
+#Cypher to traverse from the semantically similar excerpts back to the agreement
+EXCERPT_TO_AGREEMENT_TRAVERSAL_QUERY="""
+    MATCH (a:Agreement)-[:HAS_CLAUSE]->(cc:ContractClause)-[:HAS_EXCERPT]-(node) 
+    RETURN a.name as agreement_name, a.contract_id as contract_id, cc.type as clause_type, node.text as excerpt
+"""
+
+# Same columns as the vector traversal, for excerpts found through the fulltext index
+FULLTEXT_EXCERPT_SEARCH_QUERY = """
+    CALL db.index.fulltext.queryNodes('excerptTextIndex', $query, {limit: $limit})
+    YIELD node, score
+    MATCH (a:Agreement)-[:HAS_CLAUSE]->(cc:ContractClause)-[:HAS_EXCERPT]->(node)
+    RETURN a.name as agreement_name, a.contract_id as contract_id, cc.type as clause_type, node.text as excerpt
+    ORDER BY score DESC
+"""
+
+TEXT2CYPHER_RESULT_LIMIT = 10
+
+VECTOR_INDEX_STATE_QUERY = """
+    SHOW VECTOR INDEXES YIELD name, state WHERE name = 'excerpt_embedding' RETURN state
+"""
+
+# Parties of agreement `a` as ready-made maps, one per IS_PARTY_TO relationship.
+# A pattern comprehension keeps the agreement at one row instead of multiplying it per party/clause.
+PARTIES_PROJECTION = """[(a)<-[r:IS_PARTY_TO]-(p:Organization)-[i:INCORPORATED_IN]->(country:Country) |
+        {name: p.name, role: r.role, incorporation_country: country.name, incorporation_state: i.state}]"""
+
+GET_CONTRACT_BY_ID_QUERY = """
+    MATCH (a:Agreement {contract_id: $contract_id})
+    RETURN a as agreement,
+        [(a)-[:HAS_CLAUSE]->(clause:ContractClause) | {type: clause.type}] as clauses,
+        """ + PARTIES_PROJECTION + """ as parties
+"""
+
+# Any number of agreements in one round-trip; excerpts are only read when asked for
+GET_CONTRACTS_BY_IDS_QUERY = """
+    UNWIND $contract_ids AS contract_id
+    MATCH (a:Agreement {contract_id: contract_id})
+    RETURN a as agreement,
+        [(a)-[:HAS_CLAUSE]->(clause:ContractClause) |
+            {type: clause.type,
+             excerpts: CASE WHEN $include_excerpts THEN [(clause)-[:HAS_EXCERPT]->(e:Excerpt) | e.text] ELSE [] END}] as clauses,
+        """ + PARTIES_PROJECTION + """ as parties
+"""
+
+GET_CONTRACTS_BY_PARTY_NAME_QUERY = """
+    CALL db.index.fulltext.queryNodes('organizationNameTextIndex', $organization_name)
+    YIELD node AS o, score
+    WITH o, score
+    ORDER BY score DESC
+    LIMIT 1
+    MATCH (o)-[:IS_PARTY_TO]->(a:Agreement)
+    RETURN a as agreement, """ + PARTIES_PROJECTION + """ as parties
+"""
+
+# Clause-type list queries ({clause_filter} is one of CLAUSE_TYPE_FILTERS): the agreement page
+# (ordered by the indexed contract_id, after the cursor) is cut first, so only `limit` agreements
+# are expanded to their parties
+CLAUSE_TYPE_FILTERS = {
+    "with": "EXISTS { (a)-[:HAS_CLAUSE]->(:ContractClause {type: $clause_type}) }",
+    "without": "NOT EXISTS { (a)-[:HAS_CLAUSE]->(:ContractClause {type: $clause_type}) }",
+}
+
+# limit/page_size come from the LLM; they are clamped to this range before reaching Cypher
+MAX_PAGE_SIZE = 500
+
+HAS_PARTIES_FILTER = "EXISTS { (a)<-[:IS_PARTY_TO]-(:Organization)-[:INCORPORATED_IN]->(:Country) }"
+
+CONTRACTS_PAGE_QUERY = """
+    MATCH (a:Agreement)
+    WHERE ($after_contract_id IS NULL OR a.contract_id > $after_contract_id)
+      AND {clause_filter}
+      AND """ + HAS_PARTIES_FILTER + """
+    WITH a
+    ORDER BY a.contract_id
+    LIMIT $limit
+    RETURN a as agreement, """ + PARTIES_PROJECTION + """ as parties
+    ORDER BY agreement.contract_id
+"""
+
+CONTRACTS_COUNT_QUERY = """
+    MATCH (a:Agreement)
+    WHERE {clause_filter}
+      AND """ + HAS_PARTIES_FILTER + """
+    RETURN count(a) as count
+"""
+
+
 class ContractSearchService:
-    def __init__(self, uri, user ,pwd ):
+    def __init__(self, uri, user ,pwd, max_connection_pool_size: int = 50,
+                 text2cypher_similarity_threshold: float = None, excerpt_index=None,
+                 catalog: ContractCatalog = None):
+        # The sync driver serves the neo4j_graphrag retrievers and the Streamlit helpers;
+        # the kernel functions use the async driver so parallel tool calls overlap their round-trips
         driver = GraphDatabase.driver(uri, auth=(user, pwd))
         self._driver = driver
-        self._openai_embedder = OpenAIEmbeddings(model = "text-embedding-3-small")
+        self._async_driver_config = {"uri": uri, "auth": (user, pwd), "max_connection_pool_size": max_connection_pool_size}
+        # The async driver lives on one long-lived event loop owned by the service (see _get_async_driver)
+        self._async_driver = None
+        self._driver_loop = None
+        self._driver_loop_thread = None
+        self._driver_loop_lock = threading.Lock()
+        # Reads are cached until the graph generation changes (ingestion / add_contract)
+        self._result_cache = QueryResultCache()
+        # Repeated query texts are served from the on-disk embedding cache
+        self._openai_embedder = CachedEmbedder(OpenAIEmbeddings(model = "text-embedding-3-small"), EmbeddingCache())
         # Create LLM object. Used to generate the CYPHER queries
         self._llm = OpenAILLM(model_name="gpt-4o-mini", model_params={"temperature": 0}) 
+        # Retrievers are built on first use (or by warm_up) and then reused
+        self._retriever_lock = threading.Lock()
+        self._vector_retriever = None
+        self._text2cypher_retriever = None
+        # Optional ExcerptVectorIndex: vector search runs in-process instead of on the excerpt_embedding index
+        self._excerpt_index = excerpt_index
+        # Uploaded PDFs are listed from the catalog instead of scanning data/contracts
+        self._catalog = catalog or ContractCatalog()
+        self._catalog_synced = False
+        # Generated aggregation Cypher is reused for repeated questions (exact, or similar when a threshold is set)
+        self._text2cypher_cache = Text2CypherCache(embedder=self._openai_embedder,
+                                                   similarity_threshold=text2cypher_similarity_threshold)
         
     
-    async def get_contract(self, contract_id: int) -> Agreement:
-        
-        GET_CONTRACT_BY_ID_QUERY = """
-            MATCH (a:Agreement {contract_id: $contract_id})-[:HAS_CLAUSE]->(clause:ContractClause)
-            WITH a, collect(clause) as clauses
-            MATCH (country:Country)-[i:INCORPORATED_IN]-(p:Organization)-[r:IS_PARTY_TO]-(a)
-            WITH a, clauses, collect(p) as parties, collect(country) as countries, collect(r) as roles, collect(i) as states
-            RETURN a as agreement, clauses, parties, countries, roles, states
+    def _get_async_driver(self) -> AsyncDriver:
         """
-        
-        agreement_node = {}
-        
-        records, _, _  = self._driver.execute_query(GET_CONTRACT_BY_ID_QUERY,{'contract_id':contract_id})
-        
+        Async connections cannot cross event loops, and Streamlit runs each request in a
+        fresh asyncio.run loop. So the service keeps a single async driver (and connection
+        pool) on its own loop in a background thread, and callers await its results from any loop.
+        """
+        with self._driver_loop_lock:
+            if self._async_driver is None:
+                self._driver_loop = asyncio.new_event_loop()
+                self._driver_loop_thread = threading.Thread(target=self._driver_loop.run_forever,
+                                                            name="neo4j-async-driver", daemon=True)
+                self._driver_loop_thread.start()
+                config = self._async_driver_config
+                self._async_driver = AsyncGraphDatabase.driver(config["uri"], auth=config["auth"],
+                                                               max_connection_pool_size=config["max_connection_pool_size"])
+            return self._async_driver
+
+    async def _on_driver_loop(self, coroutine):
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._driver_loop)
+        return await asyncio.wrap_future(future)
+
+    async def _execute_read(self, query, parameters=None):
+        driver = self._get_async_driver()
+        return await self._on_driver_loop(driver.execute_query(query, parameters, routing_=RoutingControl.READ))
+
+    async def _fetch_graph_generation(self) -> int:
+        records, _, _ = await self._execute_read(GET_GRAPH_GENERATION_QUERY)
+        return records[0]['generation'] if records else 0
+
+    def bump_graph_generation(self):
+        """
+        Record a change to the contract graph so every cache of read results is invalidated.
+        """
+        records, _, _ = self._driver.execute_query(BUMP_GRAPH_GENERATION_STATEMENT)
+        self._result_cache.invalidate(records[0]['generation'])
+
+    # --- retrievers (built once per service) ---
+
+    @property
+    def vector_retriever(self) -> VectorCypherRetriever:
+        with self._retriever_lock:
+            if self._vector_retriever is None:
+                self._vector_retriever = VectorCypherRetriever(
+                    driver= self._driver,  
+                    index_name="excerpt_embedding",
+                    embedder=self._openai_embedder, 
+                    retrieval_query=EXCERPT_TO_AGREEMENT_TRAVERSAL_QUERY,
+                    result_formatter=my_vector_search_excerpt_record_formatter
+                )
+            return self._vector_retriever
+
+    @property
+    def text2cypher_retriever(self) -> Text2CypherRetriever:
+        with self._retriever_lock:
+            if self._text2cypher_retriever is None:
+                self._text2cypher_retriever = Text2CypherRetriever(
+                    driver=self._driver,
+                    llm=self._llm,
+                    neo4j_schema=load_graph_schema(self._driver)
+                )
+            return self._text2cypher_retriever
+
+    def warm_up(self):
+        """
+        Open the driver connections, validate the vector index and load the schema at startup,
+        so the first question does not pay for it.
+        """
+        self._driver.verify_connectivity()
+        self.vector_retriever
+        self.text2cypher_retriever
+
+    def health_check(self) -> dict:
+        """
+        Report whether Neo4j is reachable, the excerpt vector index is online and the retrievers are built.
+        """
+        health = {"neo4j": False, "vector_index": None,
+                  "vector_retriever": self._vector_retriever is not None,
+                  "text2cypher_retriever": self._text2cypher_retriever is not None}
+        try:
+            records, _, _ = self._driver.execute_query(VECTOR_INDEX_STATE_QUERY, routing_=RoutingControl.READ)
+            health["neo4j"] = True
+            health["vector_index"] = records[0]["state"] if records else "MISSING"
+        except Exception as e:
+            health["error"] = str(e)
+        return health
+
+    async def close(self):
+        with self._driver_loop_lock:
+            driver, loop, thread = self._async_driver, self._driver_loop, self._driver_loop_thread
+            self._async_driver = self._driver_loop = self._driver_loop_thread = None
+        if driver is not None:
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(driver.close(), loop))
+            loop.call_soon_threadsafe(loop.stop)
+            await asyncio.to_thread(thread.join)
+            loop.close()
+        self._driver.close()
+
+    @cached_read
+    async def get_contract(self, contract_id: int) -> Agreement:
+        records, _, _  = await self._execute_read(GET_CONTRACT_BY_ID_QUERY,{'contract_id':contract_id})
+        if not records:
+            return {}
 
-        if (len(records)==1):
-            agreement_node =    records[0].get('agreement')
-            party_list =        records[0].get('parties')
-            role_list =         records[0].get('roles')
-            country_list =      records[0].get('countries')
-            state_list =        records[0].get('states')
-            clause_list =       records[0].get('clauses')
-        
         return await self._get_agreement(
-            agreement_node, format="long",
-            party_list=party_list, role_list=role_list,
-            country_list=country_list,state_list=state_list,
-            clause_list=clause_list
+            records[0]['agreement'], format="long",
+            party_list=records[0]['parties'],
+            clause_list=records[0]['clauses']
         )
 
+    async def get_contracts_by_ids(self, contract_ids: List[int], format: str = "short",
+                                   include_excerpts: bool = False) -> List[Agreement]:
+        """
+        Fetch several agreements with one UNWIND query, in the order of contract_ids.
+        Unknown ids are skipped. With include_excerpts the clauses carry their excerpts,
+        as in get_contract_excerpts (this implies the long format).
+        """
+        return await self._get_contracts_by_ids(tuple(dict.fromkeys(contract_ids)), format, include_excerpts)
+
+    @cached_read
+    async def _get_contracts_by_ids(self, contract_ids: tuple, format: str, include_excerpts: bool) -> List[Agreement]:
+        records, _, _ = await self._execute_read(
+            GET_CONTRACTS_BY_IDS_QUERY, {'contract_ids': list(contract_ids), 'include_excerpts': include_excerpts})
+
+        agreements_by_id = {}
+        for row in records:
+            if include_excerpts:
+                agreement = await self._get_agreement(
+                    row['agreement'], format="long", party_list=row['parties'],
+                    clause_dict={clause['type']: clause['excerpts'] for clause in row['clauses']})
+            else:
+                agreement = await self._get_agreement(
+                    row['agreement'], format=format, party_list=row['parties'], clause_list=row['clauses'])
+            agreements_by_id[row['agreement'].get('contract_id')] = agreement
+
+        return [agreements_by_id[contract_id] for contract_id in contract_ids if contract_id in agreements_by_id]
+
+    @cached_read
     async def get_contracts(self, organization_name: str) -> List[Agreement]:
-        GET_CONTRACTS_BY_PARTY_NAME = """
-            CALL db.index.fulltext.queryNodes('organizationNameTextIndex', $organization_name)
-            YIELD node AS o, score
-            WITH o, score
-            ORDER BY score DESC
-            LIMIT 1
-            WITH o
-            MATCH (o)-[:IS_PARTY_TO]->(a:Agreement)
-            WITH a
-            MATCH (country:Country)-[i:INCORPORATED_IN]-(p:Organization)-[r:IS_PARTY_TO]-(a:Agreement)
-            RETURN a as agreement, collect(p) as parties, collect(r) as roles, collect(country) as countries, collect(i) as states
-        """
-       
         #run the Cypher query
-        records, _ , _ = self._driver.execute_query(GET_CONTRACTS_BY_PARTY_NAME,{'organization_name':organization_name})
+        records, _ , _ = await self._execute_read(GET_CONTRACTS_BY_PARTY_NAME_QUERY,{'organization_name':organization_name})
 
         #Build the result
         all_aggrements = []
         for row in records:
-            agreement_node =  row['agreement']
-            party_list =  row['parties']
-            role_list =  row['roles']
-            country_list = row['countries']
-            state_list = row['states']
-            
             agreement : Agreement = await self._get_agreement(
                 format="short",
-                agreement_node=agreement_node,
-                party_list=party_list,
-                role_list=role_list,
-                country_list=country_list,
-                state_list=state_list
+                agreement_node=row['agreement'],
+                party_list=row['parties']
             )
             all_aggrements.append(agreement)
         
         return all_aggrements
 
-    async def get_contracts_with_clause_type(self, clause_type: ClauseType) -> List[Agreement]:
-        GET_CONTRACT_WITH_CLAUSE_TYPE_QUERY = """
-            MATCH (a:Agreement)-[:HAS_CLAUSE]->(cc:ContractClause {type: $clause_type})
-            WITH a
-            MATCH (country:Country)-[i:INCORPORATED_IN]-(p:Organization)-[r:IS_PARTY_TO]-(a:Agreement)
-            RETURN a as agreement, collect(p) as parties, collect(r) as roles, collect(country) as countries, collect(i) as states
-            
-        """
-        #run the Cypher query
-        records, _ , _ = self._driver.execute_query(GET_CONTRACT_WITH_CLAUSE_TYPE_QUERY,{'clause_type': str(clause_type.value)})
-        # Process the results
-        
-        all_agreements = []
-        for row in records:
-            agreement_node =  row['agreement']
-            party_list =  row['parties']
-            role_list =  row['roles']
-            country_list = row['countries']
-            state_list = row['states']
-            agreement : Agreement = await self._get_agreement(
-                format="short",
-                agreement_node=agreement_node,
-                party_list=party_list,
-                role_list=role_list,
-                country_list=country_list,
-                state_list=state_list
-            )
-            
-            all_agreements.append(agreement)
-        
-        return all_agreements
-        
-    async def get_contracts_without_clause(self, clause_type: ClauseType) -> List[Agreement]:
-        GET_CONTRACT_WITHOUT_CLAUSE_TYPE_QUERY = """
-            MATCH (a:Agreement)
-            OPTIONAL MATCH (a)-[:HAS_CLAUSE]->(cc:ContractClause {type: $clause_type})
-            WITH a,cc
-            WHERE cc is NULL
-            WITH a
-            MATCH (country:Country)-[i:INCORPORATED_IN]-(p:Organization)-[r:IS_PARTY_TO]-(a)
-            RETURN a as agreement, collect(p) as parties, collect(r) as roles, collect(country) as countries, collect(i) as states
-        """
-       
-        #run the Cypher query
-        records, _ , _ = self._driver.execute_query(GET_CONTRACT_WITHOUT_CLAUSE_TYPE_QUERY,{'clause_type':clause_type.value})
+    @staticmethod
+    def _page_size(limit) -> int:
+        return min(max(int(limit), 1), MAX_PAGE_SIZE)
+
+    async def _get_contracts_page(self, clause_filter: str, clause_type: ClauseType, limit: int,
+                                  after_contract_id: int = None) -> List[Agreement]:
+        limit = self._page_size(limit)
+        query = CONTRACTS_PAGE_QUERY.replace("{clause_filter}", CLAUSE_TYPE_FILTERS[clause_filter])
+        records, _, _ = await self._execute_read(query, {
+            'clause_type': str(clause_type.value), 'limit': limit, 'after_contract_id': after_contract_id})
 
         all_agreements = []
         for row in records:
-            agreement_node =  row['agreement']
-            party_list =  row['parties']
-            role_list =  row['roles']
-            country_list = row['countries']
-            state_list = row['states']
             agreement : Agreement = await self._get_agreement(
                 format="short",
-                agreement_node=agreement_node,
-                party_list=party_list,
-                role_list=role_list,
-                country_list=country_list,
-                state_list=state_list
+                agreement_node=row['agreement'],
+                party_list=row['parties']
             )
             all_agreements.append(agreement)
         return all_agreements
 
-    async def get_contracts_similar_text(self, clause_text: str) -> List[Agreement]:
+    async def _stream_contracts(self, clause_filter: str, clause_type: ClauseType, page_size: int):
+        page_size = self._page_size(page_size)
+        after_contract_id = None
+        while True:
+            page = await self._get_contracts_page(clause_filter, clause_type, page_size, after_contract_id)
+            for agreement in page:
+                yield agreement
+            if len(page) < page_size:
+                return
+            after_contract_id = page[-1]['contract_id']
+
+    async def _count_contracts(self, clause_filter: str, clause_type: ClauseType) -> int:
+        query = CONTRACTS_COUNT_QUERY.replace("{clause_filter}", CLAUSE_TYPE_FILTERS[clause_filter])
+        records, _, _ = await self._execute_read(query, {'clause_type': str(clause_type.value)})
+        return records[0]['count'] if records else 0
+
+    @cached_read
+    async def get_contracts_with_clause_type(self, clause_type: ClauseType, limit: int = 100,
+                                             after_contract_id: int = None) -> List[Agreement]:
+        """
+        One page of the contracts that have the clause, ordered by contract_id.
+        Pass the last contract_id of a page as after_contract_id to get the next one.
+        """
+        return await self._get_contracts_page("with", clause_type, limit, after_contract_id)
 
+    @cached_read
+    async def get_contracts_without_clause(self, clause_type: ClauseType, limit: int = 100,
+                                           after_contract_id: int = None) -> List[Agreement]:
+        """
+        One page of the contracts that lack the clause, ordered by contract_id.
+        Pass the last contract_id of a page as after_contract_id to get the next one.
+        """
+        return await self._get_contracts_page("without", clause_type, limit, after_contract_id)
 
-        #Cypher to traverse from the semantically similar excerpts back to the agreement
-        EXCERPT_TO_AGREEMENT_TRAVERSAL_QUERY="""
-            MATCH (a:Agreement)-[:HAS_CLAUSE]->(cc:ContractClause)-[:HAS_EXCERPT]-(node) 
-            RETURN a.name as agreement_name, a.contract_id as contract_id, cc.type as clause_type, node.text as excerpt
+    def stream_contracts_with_clause_type(self, clause_type: ClauseType, page_size: int = 100):
         """
-        
-        #Set up vector Cypher retriever
-        retriever = VectorCypherRetriever(
-            driver= self._driver,  
-            index_name="excerpt_embedding",
-            embedder=self._openai_embedder, 
-            retrieval_query=EXCERPT_TO_AGREEMENT_TRAVERSAL_QUERY,
-            result_formatter=my_vector_search_excerpt_record_formatter
-        )
-        
-        # run vector search query on excerpts and get results containing the relevant agreement and clause 
-        retriever_result = retriever.search(query_text=clause_text, top_k=3)
+        Async generator over every contract with the clause, fetched one page at a time (not cached).
+        """
+        return self._stream_contracts("with", clause_type, page_size)
+
+    def stream_contracts_without_clause(self, clause_type: ClauseType, page_size: int = 100):
+        """
+        Async generator over every contract without the clause, fetched one page at a time (not cached).
+        """
+        return self._stream_contracts("without", clause_type, page_size)
+
+    @cached_read
+    async def count_contracts_with_clause_type(self, clause_type: ClauseType) -> int:
+        return await self._count_contracts("with", clause_type)
+
+    @cached_read
+    async def count_contracts_without_clause(self, clause_type: ClauseType) -> int:
+        return await self._count_contracts("without", clause_type)
+
+    async def _vector_excerpt_search(self, clause_text: str, limit: int) -> List[dict]:
+        if self._excerpt_index is not None:
+            query_vector = await asyncio.to_thread(self._openai_embedder.embed_query, clause_text)
+            return self._excerpt_index.search(query_vector, top_k=limit)
+        # the retriever is synchronous; run it off the event loop
+        retriever_result = await asyncio.to_thread(self.vector_retriever.search, query_text=clause_text, top_k=limit)
+        return [item.content for item in retriever_result.items]
+
+    async def _fulltext_excerpt_search(self, clause_text: str, limit: int) -> List[dict]:
+        query = lucene_query(clause_text)
+        if not query:
+            return []
+        records, _, _ = await self._execute_read(FULLTEXT_EXCERPT_SEARCH_QUERY, {'query': query, 'limit': limit})
+        return [record.data() for record in records]
+
+    async def get_contracts_similar_text(self, clause_text: str, top_k: int = 3, mode: str = "hybrid",
+                                         max_per_contract: int = 2) -> List[Agreement]:
+        """
+        Excerpts similar to clause_text, with their agreement and clause.
+        mode: "vector" (embedding search), "fulltext" (excerptTextIndex, no embedding call) or
+        "hybrid" (both concurrently, fused with reciprocal-rank fusion).
+        Results are deduplicated by (contract, clause type) and at most max_per_contract
+        are returned for one contract.
+        """
+        if mode not in ("vector", "fulltext", "hybrid"):
+            raise ValueError(f"Unknown search mode: {mode}")
+
+        # fetch extra candidates so deduplication and the per-contract limit can still fill top_k
+        candidates = max(top_k * 4, 10)
+        searches = []
+        if mode in ("vector", "hybrid"):
+            searches.append(self._vector_excerpt_search(clause_text, candidates))
+        if mode in ("fulltext", "hybrid"):
+            searches.append(self._fulltext_excerpt_search(clause_text, candidates))
+        # in hybrid mode one failed search (e.g. the fulltext index missing) leaves the other's results
+        ranked_lists = await asyncio.gather(*searches, return_exceptions=True)
+        failures = [result for result in ranked_lists if isinstance(result, Exception)]
+        if len(failures) == len(ranked_lists):
+            raise failures[0]
+        for failure in failures:
+            print(f"[WARN] One excerpt search failed, using the other: {failure}")
+        ranked_lists = [result for result in ranked_lists if not isinstance(result, Exception)]
+
+        fused = reciprocal_rank_fusion(ranked_lists, key=lambda item: (item['contract_id'], item['clause_type']))
 
         #set up List of Agreements (with partial data) to be returned
         agreements = []
-        for item in retriever_result.items:
-            content = item.content
+        for content in diversify(fused, top_k, max_per_contract):
             a : Agreement = {
                 'agreement_name': content['agreement_name'],
                 'contract_id': content['contract_id']
@@ -188,54 +429,54 @@ class ContractSearchService:
 
         return agreements
     
+    def _generate_cypher(self, user_question: str) -> str:
+        """
+        Ask the LLM for Cypher with the Text2CypherRetriever prompt and schema.
+        """
+        retriever = self.text2cypher_retriever
+        prompt = Text2CypherTemplate(template=retriever.custom_prompt).format(
+            schema=retriever.neo4j_schema, examples="\n".join(retriever.examples or []), query_text=user_question)
+        cypher = retriever.llm.invoke(prompt).content.strip()
+        # drop a markdown code fence around the query, if any
+        return re.sub(r"^```(?:cypher)?\s*|\s*```$", "", cypher, flags=re.IGNORECASE)
+
+    def _validate_cypher(self, cypher: str):
+        """
+        EXPLAIN the query: it must compile and be read-only before it is run or cached.
+        """
+        _, summary, _ = self._driver.execute_query("EXPLAIN " + cypher, routing_=RoutingControl.READ)
+        if summary.query_type != "r":
+            raise ValueError(f"Generated Cypher is not read-only: {cypher}")
+
     async def answer_aggregation_question(self, user_question) -> str:
         answer = ""
 
-        NEO4J_SCHEMA = """
-            Node properties:
-            Agreement {agreement_type: STRING, contract_id: INTEGER,effective_date: STRING,renewal_term: STRING, name: STRING}
-            ContractClause {type: STRING}
-            ClauseType {name: STRING}
-            Country {name: STRING}
-            Excerpt {text: STRING}
-            Organization {name: STRING}
-
-            Relationship properties:
-            IS_PARTY_TO {role: STRING}
-            GOVERNED_BY_LAW {state: STRING}
-            HAS_CLAUSE {type: STRING}
-            INCORPORATED_IN {state: STRING}
-
-            The relationships:
-            (:Agreement)-[:HAS_CLAUSE]->(:ContractClause)
-            (:ContractClause)-[:HAS_EXCERPT]->(:Excerpt)
-            (:ContractClause)-[:HAS_TYPE]->(:ClauseType)
-            (:Agreement)-[:GOVERNED_BY_LAW]->(:Country)
-            (:Organization)-[:IS_PARTY_TO]->(:Agreement)
-            (:Organization)-[:INCORPORATED_IN]->(:Country)
-
-        """
-
-        # Initialize the retriever
-        retriever = Text2CypherRetriever(
-            driver=self._driver,
-            llm=self._llm,
-            neo4j_schema=NEO4J_SCHEMA,
-            result_limit=10
-        )
-
-        # Generate a Cypher query using the LLM, send it to the Neo4j database, and return the results
-        retriever_result = retriever.search(query_text=user_question)
-
-        for item in retriever_result.items:
-            content = str(item.content)
+        # Generate (or reuse) a validated Cypher query, send it to the Neo4j database, and return the results.
+        # With a similarity threshold the cache embeds the question, so it is kept off the event loop
+        cypher = await asyncio.to_thread(self._text2cypher_cache.get, user_question)
+        if cypher is None:
+            cypher = await asyncio.to_thread(self._generate_cypher, user_question)
+            await asyncio.to_thread(self._validate_cypher, cypher)
+            await asyncio.to_thread(self._text2cypher_cache.put, user_question, cypher)
+
+        try:
+            records, _, _ = await self._execute_read(cypher)
+        except Exception:
+            # a stored query that stopped working is generated again next time
+            self._text2cypher_cache.discard(user_question)
+            raise
+
+        for record in records[:TEXT2CYPHER_RESULT_LIMIT]:
+            content = str(record)
             if content:
                 answer += content + '\n\n'
 
         return answer
 
-    async def _get_agreement (self,agreement_node, format="short", party_list=None, role_list=None,country_list=None,
-                              state_list=None,clause_list=None,clause_dict=None): 
+    def text2cypher_cache_stats(self) -> dict:
+        return self._text2cypher_cache.stats()
+
+    async def _get_agreement (self,agreement_node, format="short", party_list=None, clause_list=None, clause_dict=None): 
         agreement : Agreement = {}
 
         if format == "short" and agreement_node:
@@ -244,11 +485,7 @@ class ContractSearchService:
                 "name" : agreement_node.get('name'),
                 "agreement_type": agreement_node.get('agreement_type')
             }
-            agreement['parties']= await self._get_parties (
-                party_list=party_list,
-                role_list=role_list,
-                country_list=country_list,
-                state_list=state_list)               
+            agreement['parties']= await self._get_parties (party_list=party_list)
                 
         elif format=="long" and agreement_node: 
             agreement: Agreement = {
@@ -259,11 +496,7 @@ class ContractSearchService:
                 "expiration_date":  agreement_node.get('expiration_date'),
                 "renewal_term": agreement_node.get('renewal_term')
             }
-            agreement['parties'] = await self._get_parties (
-                party_list=party_list, 
-                role_list=role_list,
-                country_list=country_list,
-                state_list=state_list)   
+            agreement['parties'] = await self._get_parties (party_list=party_list)
 
             clauses = []
             if clause_list:
@@ -284,20 +517,23 @@ class ContractSearchService:
 
         return agreement
 
-    async def _get_parties (self, party_list=None, role_list=None,country_list=None,state_list=None):
+    async def _get_parties (self, party_list=None):
+        """
+        party_list holds the party maps built by PARTIES_PROJECTION.
+        """
         parties = []
-        if party_list:
-            for i in range(len(party_list)):
-                p: Party = {
-                    "name":  party_list[i].get('name'),
-                    "role":  role_list[i].get('role'),
-                    "incorporation_country": country_list[i].get('name'),
-                    "incorporation_state": state_list[i].get('state')
-                }
-                parties.append(p)
+        for party in party_list or []:
+            p: Party = {
+                "name":  party.get('name'),
+                "role":  party.get('role'),
+                "incorporation_country": party.get('incorporation_country'),
+                "incorporation_state": party.get('incorporation_state')
+            }
+            parties.append(p)
         
         return parties
     
+    @cached_read
     async def get_contract_excerpts (self, contract_id:int):
 
         GET_CONTRACT_CLAUSES_QUERY = """
@@ -305,9 +541,10 @@ class ContractSearchService:
         RETURN a as agreement, cc.type as contract_clause_type, collect(e.text) as excerpts 
         """
         #run CYPHER query
-        clause_records, _, _  = self._driver.execute_query(GET_CONTRACT_CLAUSES_QUERY,{'contract_id':contract_id})
+        clause_records, _, _  = await self._execute_read(GET_CONTRACT_CLAUSES_QUERY,{'contract_id':contract_id})
 
         #get a dict d[clause_type]=list(Excerpt)
+        agreement_node = None
         clause_dict = {}
         for row in clause_records:
             agreement_node = row['agreement']
@@ -340,40 +577,47 @@ class ContractSearchService:
         # Move the uploaded file to persistent storage
         os.rename(source_file_path, dest_path)
 
-        # Store contract metadata in Neo4j
+        # Record the file in the catalog, then store contract metadata in Neo4j
+        entry = self._catalog.add(contract_name, dest_path)
         query = """
         MERGE (c:Contract {name: $name})
-        SET c.file_path = $file_path, c.uploaded_at = datetime()
+        SET c.file_path = $file_path, c.uploaded_at = datetime(), c.size = $size, c.sha256 = $sha256,
+            c.page_count = $page_count
         RETURN c
         """
-        self._driver.execute_query(query, {"name": contract_name, "file_path": dest_path})
+        self._driver.execute_query(query, {"name": contract_name, "file_path": dest_path, "size": entry["size"],
+                                           "sha256": entry["sha256"], "page_count": entry["page_count"]})
+        self.bump_graph_generation()
 
         # Optional: generate embeddings for retrieval
         # self._openai_embedder.embed_file(dest_path)
 
         return dest_path
     
-    def get_all_contracts(self):
+    def get_all_contracts(self, offset: int = 0, limit: int = None, search: str = None):
         """
-        Returns a list of all uploaded contracts stored in data/contracts
-        as dictionaries with keys: 'name', 'file_path', 'uploaded_at'
+        Returns the uploaded contracts stored in data/contracts, newest first, from the contract catalog
+        as dictionaries with keys: 'name', 'file_path', 'uploaded_at' (and 'file_name', 'size', 'sha256', 'page_count').
+        offset/limit page through the list and search filters on the contract name.
         """
-        contracts_dir = os.path.join(os.getcwd(), "data/contracts")
-        os.makedirs(contracts_dir, exist_ok=True)
+        self._ensure_catalog()
+        return self._catalog.list(offset=offset, limit=limit, search=search)
 
-        contracts = []
-        for filename in os.listdir(contracts_dir):
-            if filename.endswith(".pdf"):
-                file_path = os.path.join(contracts_dir, filename)
-                uploaded_at = datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
-                contract_name = filename.rsplit("_", 1)[0].replace("_", " ")
-                contracts.append({
-                    "name": contract_name,
-                    "file_path": file_path,
-                    "uploaded_at": uploaded_at
-                })
-
-        # Sort by uploaded_at descending
-        contracts.sort(key=lambda x: x['uploaded_at'], reverse=True)
-        return contracts
+    def count_contracts(self, search: str = None) -> int:
+        self._ensure_catalog()
+        return self._catalog.count(search=search)
 
+    def sync_contract_catalog(self) -> dict:
+        """
+        Reconcile the catalog with data/contracts (files copied in or deleted by hand).
+        """
+        contracts_dir = os.path.join(os.getcwd(), "data/contracts")
+        os.makedirs(contracts_dir, exist_ok=True)
+        self._catalog_synced = True
+        return self._catalog.sync_directory(contracts_dir)
+
+    def _ensure_catalog(self):
+        # an empty catalog is filled from the folder once, e.g. for uploads made before it existed
+        if not self._catalog_synced and self._catalog.count() == 0:
+            self.sync_contract_catalog()
+        self._catalog_synced = True
@@ -0,0 +1,143 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import AsyncIterator, List, Optional
+from semantic_kernel.contents import ChatHistory
+from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from LocalExtractor import chunk_sections
+from LlmStreaming import stream_chat
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "summary_cache.sqlite")
+
+SUMMARY_PROMPT = ("Summarize the following contract very briefly in simple English so anyone can understand it. "
+                  "Only include main points:\n\n{text}")
+# No chunk position in the map prompt: it is part of the cache key, and inserting or removing
+# a section would otherwise miss the cache for every chunk after it
+MAP_PROMPT = ("The text below is one part of a contract. List its main points (parties, obligations, "
+              "payments, dates, termination, restrictions) in a few short bullet points:\n\n{text}")
+REDUCE_PROMPT = ("Below are notes on consecutive parts of a contract. Merge them into one shorter list of the main "
+                 "points, without repeating anything:\n\n{text}")
+FINAL_PROMPT = ("Below are notes on the parts of a contract. Summarize the contract very briefly in simple English "
+                "so anyone can understand it. Only include main points:\n\n{text}")
+
+
+class SummaryCache:
+    """
+    On-disk cache (SQLite) of partial summaries keyed by the hash of the prompt that produced them.
+    The least recently used entries beyond max_entries are dropped.
+    """
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH, max_entries: int = 20000):
+        self._db_path = db_path
+        self._max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS summaries (
+                    key TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS summaries_last_used ON summaries (last_used)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        conn = self._connection()
+        row = conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+        if row:
+            with conn:
+                conn.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0] if row else None
+
+    def put(self, key: str, summary: str):
+        conn = self._connection()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO summaries (key, summary, last_used) VALUES (?, ?, ?)",
+                         (key, summary, time.time()))
+            conn.execute("""
+                DELETE FROM summaries WHERE key IN (
+                    SELECT key FROM summaries ORDER BY last_used DESC LIMIT -1 OFFSET ?)""", (self._max_entries,))
+
+
+class ContractSummarizer:
+    """
+    Map-reduce summarizer for contracts of any length.
+    map: the text is split into section chunks that are summarized concurrently (at most
+         max_concurrency requests at a time);
+    reduce: the partial summaries are merged in groups until they fit one request, then
+         summarized for the reader.
+    Partial summaries are cached by the hash of their prompt (model, template and chunk text only),
+    so a lightly edited contract only re-summarizes the chunks that changed. A contract that fits one chunk gets one request.
+    """
+    def __init__(self, llm: ChatCompletionClientBase, cache: Optional[SummaryCache] = None,
+                 max_chars: int = 12000, max_concurrency: int = 4, reduce_group_size: int = 8):
+        self._llm = llm
+        self._cache = cache
+        self._max_chars = max_chars
+        self._max_concurrency = max_concurrency
+        self._reduce_group_size = reduce_group_size
+        self._model = getattr(llm, "ai_model_id", type(llm).__name__)
+        self.llm_calls = 0
+
+    async def summarize(self, pages: List[str]) -> str:
+        return await self.complete(await self.final_prompt(pages))
+
+    async def stream_summary(self, pages: List[str]) -> AsyncIterator[str]:
+        """
+        Like summarize, but the final summary is streamed as it is generated.
+        """
+        prompt = await self.final_prompt(pages)
+        self.llm_calls += 1
+        async for chunk in stream_chat(self._llm, prompt):
+            yield chunk
+
+    async def final_prompt(self, pages: List[str]) -> str:
+        """
+        Run the map and reduce steps and return the prompt of the final summary.
+        """
+        chunks = chunk_sections(pages, max_chars=self._max_chars)
+        if len(chunks) <= 1:
+            return SUMMARY_PROMPT.format(text="".join(pages))
+
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        notes = await asyncio.gather(*[
+            self._cached_complete(MAP_PROMPT.format(text=chunk), semaphore) for chunk in chunks])
+
+        while len(notes) > 1 and sum(len(note) for note in notes) > self._max_chars:
+            groups = [notes[i:i + self._reduce_group_size] for i in range(0, len(notes), self._reduce_group_size)]
+            notes = await asyncio.gather(*[
+                self._cached_complete(REDUCE_PROMPT.format(text="\n\n".join(group)), semaphore) for group in groups])
+        return FINAL_PROMPT.format(text="\n\n".join(notes))
+
+    async def _cached_complete(self, prompt: str, semaphore: asyncio.Semaphore) -> str:
+        key = hashlib.sha256(f"{self._model}\n{prompt}".encode("utf-8")).hexdigest()
+        summary = await asyncio.to_thread(self._cache.get, key) if self._cache else None
+        if summary is None:
+            async with semaphore:
+                summary = await self.complete(prompt)
+            if self._cache and summary:
+                await asyncio.to_thread(self._cache.put, key, summary)
+        return summary
+
+    async def complete(self, prompt: str) -> str:
+        self.llm_calls += 1
+        settings = OpenAIChatPromptExecutionSettings()
+        chat_history = ChatHistory()
+        chat_history.add_user_message(prompt)
+        result = await self._llm.get_chat_message_contents(
+            chat_history=chat_history,
+            settings=settings,
+            kernel=None
+        )
+        return result[0].content if result else ""
@@ -0,0 +1,116 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List
+from neo4j_graphrag.embeddings.base import Embedder
+from EmbeddingPipeline import BatchEmbedder
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "embedding_cache.sqlite")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache (SQLite, float32 blobs) keyed by (model, SHA-256 of the text).
+    When the live data grows past max_bytes the least recently used tenth of the entries is evicted.
+    Safe to share between threads and processes (WAL journal, one connection per thread).
+    """
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH, max_bytes: int = 512 * 1024 * 1024):
+        self._db_path = db_path
+        self._max_bytes = max_bytes
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[str, List[float]]:
+        hashes = {text_hash(text): text for text in texts}
+        found = {}
+        conn = self._connection()
+        keys = list(hashes)
+        # stay below SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                [model, *chunk]).fetchall()
+            for key, blob in rows:
+                found[hashes[key]] = array("f", blob).tolist()
+        if found:
+            with conn:
+                conn.executemany("UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                                 [(time.time(), model, text_hash(text)) for text in found])
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]):
+        if not vectors:
+            return
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model, text_hash(text), array("f", vector).tobytes(), now) for text, vector in vectors.items()])
+        self._evict_if_needed(conn)
+
+    def _evict_if_needed(self, conn: sqlite3.Connection):
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        while True:
+            used_pages = conn.execute("PRAGMA page_count").fetchone()[0] - conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if used_pages * page_size <= self._max_bytes:
+                return
+            with conn:
+                deleted = conn.execute("""
+                    DELETE FROM embeddings WHERE rowid IN (
+                        SELECT rowid FROM embeddings ORDER BY last_used
+                        LIMIT (SELECT COUNT(*) / 10 + 1 FROM embeddings))""").rowcount
+            if not deleted:
+                return
+
+
+class CachedEmbedder(BatchEmbedder):
+    """
+    Wraps an embedder (a BatchEmbedder or any neo4j_graphrag Embedder) so that
+    texts already embedded with the same model are read from the EmbeddingCache.
+    """
+    def __init__(self, embedder: Embedder, cache: EmbeddingCache):
+        self._embedder = embedder
+        self._cache = cache
+        self.model = getattr(embedder, "model", type(embedder).__name__)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        cached = self._cache.get_many(self.model, texts)
+        missing = [text for text in dict.fromkeys(texts) if text not in cached]
+        if missing:
+            if isinstance(self._embedder, BatchEmbedder):
+                vectors = self._embedder.embed_documents(missing)
+            else:
+                vectors = [self._embedder.embed_query(text) for text in missing]
+            fresh = dict(zip(missing, vectors))
+            self._cache.put_many(self.model, fresh)
+            cached.update(fresh)
+        return [cached[text] for text in texts]
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from neo4j import Driver
+from neo4j_graphrag.embeddings.base import Embedder
+
+EMBEDDING_DIMENSIONS = 1536  # must match the excerpt_embedding vector index
+
+# Excerpts still missing a vector, one page at a time in elementId order
+GET_EXCERPTS_TO_EMBED_QUERY = """
+MATCH (e:Excerpt)
+WHERE e.text IS NOT NULL AND e.text <> '' AND e.embedding IS NULL AND elementId(e) > $after
+RETURN elementId(e) AS id, e.text AS text
+ORDER BY id
+LIMIT $page_size
+"""
+
+SET_EMBEDDINGS_STATEMENT = """
+UNWIND $rows AS row
+UNWIND row.ids AS id
+MATCH (e:Excerpt) WHERE elementId(e) = id
+SET e.embedding = row.embedding
+"""
+
+
+class BatchEmbedder(Embedder):
+    """
+    Embedder that can embed many texts per request. It is also a neo4j_graphrag Embedder,
+    so the same object can be handed to the retrievers in ContractSearchService.
+    """
+    model: str
+
+    @abstractmethod
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        ...
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class OpenAIBatchEmbedder(BatchEmbedder):
+    def __init__(self, model: str = "text-embedding-3-small", dimensions: int = EMBEDDING_DIMENSIONS, **kwargs):
+        from openai import OpenAI
+        self.model = model
+        self._dimensions = dimensions
+        self._client = OpenAI(**kwargs)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        response = self._client.embeddings.create(model=self.model, input=texts, dimensions=self._dimensions)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+class LocalHashEmbedder(BatchEmbedder):
+    """
+    Deterministic, offline embedder (feature hashing of word unigrams and bigrams).
+    It carries no semantics beyond word overlap; it exists for tests and offline runs.
+    """
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.model = f"local-hash-{dimensions}"
+        self._dimensions = dimensions
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self._dimensions
+        words = re.findall(r"\w+", text.lower())
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = hashlib.md5(feature.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self._dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+
+class EmbeddingPipeline:
+    """
+    Fills Excerpt.embedding client-side: streams excerpts without a vector in pages,
+    embeds each distinct text once in batched requests with bounded concurrency,
+    writes the vectors back with UNWIND and checkpoints the page cursor after every page.
+    Batches that still fail after retries are skipped and reported, never fatal.
+    """
+    def __init__(self, driver: Driver, embedder: BatchEmbedder, page_size: int = 1000, batch_size: int = 100,
+                 max_concurrency: int = 4, retries: int = 3, backoff: float = 1.0,
+                 checkpoint_path: Optional[str] = None):
+        self._driver = driver
+        self._embedder = embedder
+        self._page_size = page_size
+        self._batch_size = batch_size
+        self._max_concurrency = max_concurrency
+        self._retries = retries
+        self._backoff = backoff
+        self._checkpoint_path = checkpoint_path
+
+    def run(self) -> Dict:
+        checkpoint = self._load_checkpoint()
+        with ThreadPoolExecutor(max_workers=max(1, self._max_concurrency)) as executor:
+            while True:
+                records, _, _ = self._driver.execute_query(
+                    GET_EXCERPTS_TO_EMBED_QUERY, after=checkpoint["after"], page_size=self._page_size)
+                if not records:
+                    break
+
+                # identical texts (boilerplate excerpts) are embedded once per page
+                ids_by_text = {}
+                for record in records:
+                    ids_by_text.setdefault(record["text"], []).append(record["id"])
+                texts = list(ids_by_text)
+                batches = [texts[i:i + self._batch_size] for i in range(0, len(texts), self._batch_size)]
+
+                futures = {executor.submit(self._embed_and_write, batch, ids_by_text): batch for batch in batches}
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    try:
+                        checkpoint["embedded"] += future.result()
+                    except Exception as e:
+                        failed_ids = [id for text in batch for id in ids_by_text[text]]
+                        checkpoint["failed"] += len(failed_ids)
+                        print(f"[WARN] Embedding batch of {len(batch)} text(s) failed, skipped: {e}")
+
+                checkpoint["after"] = records[-1]["id"]
+                self._save_checkpoint(checkpoint)
+                print(f"Embedded {checkpoint['embedded']} excerpt(s) so far ({checkpoint['failed']} failed)")
+
+        # a finished run starts from the beginning next time, picking up skipped excerpts
+        if self._checkpoint_path and os.path.exists(self._checkpoint_path):
+            os.remove(self._checkpoint_path)
+        return checkpoint
+
+    def _embed_and_write(self, texts: List[str], ids_by_text: Dict[str, List[str]]) -> int:
+        vectors = self._with_retries(self._embedder.embed_documents, texts)
+        rows = [{"ids": ids_by_text[text], "embedding": vector} for text, vector in zip(texts, vectors)]
+        self._driver.execute_query(SET_EMBEDDINGS_STATEMENT, rows=rows)
+        return sum(len(row["ids"]) for row in rows)
+
+    def _with_retries(self, fn, *args):
+        for attempt in range(self._retries + 1):
+            try:
+                return fn(*args)
+            except Exception:
+                if attempt == self._retries:
+                    raise
+                time.sleep(self._backoff * (2 ** attempt) * (0.5 + random.random()))
+
+    def _load_checkpoint(self) -> Dict:
+        checkpoint = {"after": "", "embedded": 0, "failed": 0}
+        if self._checkpoint_path and os.path.exists(self._checkpoint_path):
+            with open(self._checkpoint_path, "r", encoding="utf-8") as fh:
+                checkpoint.update(json.load(fh))
+            if checkpoint["after"]:
+                print(f"Resuming embeddings after excerpt {checkpoint['after']}")
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint: Dict):
+        if not self._checkpoint_path:
+            return
+        tmp_path = self._checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(checkpoint, fh)
+        os.replace(tmp_path, self._checkpoint_path)
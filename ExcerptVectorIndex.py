@@ -0,0 +1,111 @@
+import json
+import os
+import shutil
+from typing import Dict, List, Optional
+import numpy as np
+from neo4j import Driver
+from neo4j_graphrag.embeddings.base import Embedder
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "excerpt_index")
+
+# Embedded excerpts with their contract and clause, one page at a time in elementId order
+EXPORT_EXCERPTS_QUERY = """
+MATCH (a:Agreement)-[:HAS_CLAUSE]->(cc:ContractClause)-[:HAS_EXCERPT]->(e:Excerpt)
+WHERE e.embedding IS NOT NULL AND elementId(e) > $after
+RETURN elementId(e) AS id, a.name AS agreement_name, a.contract_id AS contract_id,
+       cc.type AS clause_type, e.text AS excerpt, e.embedding AS embedding
+ORDER BY id
+LIMIT $page_size
+"""
+
+VECTORS_FILE = "vectors.f32"
+EXCERPTS_FILE = "excerpts.jsonl"
+INFO_FILE = "index.json"
+
+
+def export_excerpt_index(driver: Driver, index_dir: str = DEFAULT_INDEX_DIR, page_size: int = 1000) -> int:
+    """
+    Dump every embedded Excerpt into index_dir: a row-major float32 matrix of L2-normalised
+    embeddings (vectors.f32), one JSON line of metadata per row (excerpts.jsonl) and index.json.
+    The export is written next to index_dir and swapped in when complete.
+    Returns the number of excerpts exported.
+    """
+    tmp_dir = index_dir.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    count, dimensions, after = 0, None, ""
+    with open(os.path.join(tmp_dir, VECTORS_FILE), "wb") as vectors_fh, \
+            open(os.path.join(tmp_dir, EXCERPTS_FILE), "w", encoding="utf-8") as excerpts_fh:
+        while True:
+            records, _, _ = driver.execute_query(EXPORT_EXCERPTS_QUERY, after=after, page_size=page_size)
+            if not records:
+                break
+            vectors = np.asarray([record["embedding"] for record in records], dtype=np.float32)
+            if dimensions is None:
+                dimensions = vectors.shape[1]
+            elif vectors.shape[1] != dimensions:
+                raise ValueError(f"Mixed embedding dimensions in the graph: {dimensions} and {vectors.shape[1]}")
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors_fh.write((vectors / np.where(norms == 0, 1, norms)).tobytes())
+            for record in records:
+                excerpts_fh.write(json.dumps({key: record[key] for key in
+                                              ("id", "agreement_name", "contract_id", "clause_type", "excerpt")}) + "\n")
+            count += len(records)
+            after = records[-1]["id"]
+            print(f"Exported {count} excerpt(s)")
+
+    with open(os.path.join(tmp_dir, INFO_FILE), "w", encoding="utf-8") as fh:
+        json.dump({"count": count, "dimensions": dimensions or 0}, fh, indent=4)
+
+    shutil.rmtree(index_dir, ignore_errors=True)
+    os.replace(tmp_dir, index_dir)
+    return count
+
+
+class ExcerptVectorIndex:
+    """
+    Exact top-k cosine search over an exported excerpt matrix, memory-mapped so only the pages
+    touched by a search are read. Results have the same fields as the excerpt_embedding
+    vector traversal, so the index can back ContractSearchService.get_contracts_similar_text.
+    """
+    def __init__(self, index_dir: str = DEFAULT_INDEX_DIR, embedder: Optional[Embedder] = None,
+                 block_rows: int = 65536):
+        with open(os.path.join(index_dir, INFO_FILE), "r", encoding="utf-8") as fh:
+            info = json.load(fh)
+        self.count = info["count"]
+        self.dimensions = info["dimensions"]
+        self._embedder = embedder
+        self._block_rows = block_rows
+        self._vectors = (np.memmap(os.path.join(index_dir, VECTORS_FILE), dtype=np.float32, mode="r",
+                                   shape=(self.count, self.dimensions))
+                         if self.count else np.zeros((0, self.dimensions), dtype=np.float32))
+        with open(os.path.join(index_dir, EXCERPTS_FILE), "r", encoding="utf-8") as fh:
+            self._excerpts = [json.loads(line) for line in fh]
+
+    def search(self, query_vector: List[float], top_k: int = 3) -> List[Dict]:
+        query = np.asarray(query_vector, dtype=np.float32)
+        if query.shape != (self.dimensions,):
+            raise ValueError(f"Query has {query.shape[-1]} dimensions, the index has {self.dimensions}")
+        norm = np.linalg.norm(query)
+        query = query / norm if norm else query
+        top_k = min(top_k, self.count)
+        if top_k <= 0:
+            return []
+
+        # best top_k of every block, then of the candidates; keeps memory bounded for large exports
+        best_rows, best_scores = [], []
+        for start in range(0, self.count, self._block_rows):
+            scores = self._vectors[start:start + self._block_rows] @ query
+            k = min(top_k, len(scores))
+            rows = np.argpartition(-scores, k - 1)[:k]
+            best_rows.append(rows + start)
+            best_scores.append(scores[rows])
+        rows, scores = np.concatenate(best_rows), np.concatenate(best_scores)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [dict(self._excerpts[rows[i]], score=float(scores[i])) for i in order]
+
+    def search_text(self, text: str, top_k: int = 3) -> List[Dict]:
+        if self._embedder is None:
+            raise ValueError("ExcerptVectorIndex needs an embedder to search by text")
+        return self.search(self._embedder.embed_query(text), top_k)
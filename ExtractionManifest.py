@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Set
+from PdfTextCache import file_sha256
+
+
+def prompt_hash(*parts: str) -> str:
+    """
+    Hash of everything that shapes an extraction (prompt texts, model name).
+    Changing any part invalidates the manifest entries made with the old value.
+    """
+    sha = hashlib.sha256()
+    for part in parts:
+        sha.update(part.encode('utf-8'))
+        sha.update(b'\0')
+    return sha.hexdigest()
+
+
+class ExtractionManifest:
+    """
+    Append-only JSON-lines manifest of PDF -> JSON extractions.
+    Entries are keyed by (PDF SHA-256, prompt hash) and record status, output path,
+    uploaded file id and timings, so reruns skip unchanged PDFs and resume after a crash.
+    The last line written for a key wins; the file is compacted when it is loaded.
+    """
+    def __init__(self, manifest_path: str, prompt_hash: str):
+        self._path = manifest_path
+        self._prompt_hash = prompt_hash
+        self._entries = {}   # (pdf_sha, prompt_hash) -> entry
+        self._files = {}     # pdf_sha -> uploaded file id
+        self._uploaded_at = {}   # pdf_sha -> when the file was uploaded
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def prompt_hash(self) -> str:
+        return self._prompt_hash
+
+    def pdf_hash(self, pdf_path: str) -> str:
+        return file_sha256(pdf_path)
+
+    def get(self, pdf_sha: str) -> Optional[Dict]:
+        with self._lock:
+            return self._entries.get((pdf_sha, self._prompt_hash))
+
+    def is_done(self, pdf_sha: str) -> bool:
+        entry = self.get(pdf_sha)
+        return bool(entry and entry['status'] == 'done' and os.path.exists(entry['output_path']))
+
+    def file_id(self, pdf_sha: str) -> Optional[str]:
+        with self._lock:
+            return self._files.get(pdf_sha)
+
+    def record_upload(self, pdf_sha: str, file_id: Optional[str]):
+        with self._lock:
+            if file_id == self._files.get(pdf_sha) and file_id:
+                return   # a reused upload keeps its original time
+            if file_id:
+                self._files[pdf_sha] = file_id
+                self._uploaded_at[pdf_sha] = time.time()
+            else:
+                self._files.pop(pdf_sha, None)
+                self._uploaded_at.pop(pdf_sha, None)
+            self._append({'type': 'file', 'pdf_sha256': pdf_sha, 'file_id': file_id,
+                          'uploaded_at': self._uploaded_at.get(pdf_sha)})
+
+    def stale_uploads(self, current_shas: Set[str], max_age_s: float) -> Dict[str, str]:
+        """
+        Uploads kept for retries that should be deleted: those of PDFs that are no longer
+        in the input folder, and those older than max_age_s. Returns pdf_sha -> file id.
+        """
+        now = time.time()
+        with self._lock:
+            return {pdf_sha: file_id for pdf_sha, file_id in self._files.items()
+                    if pdf_sha not in current_shas or now - self._uploaded_at.get(pdf_sha, 0) > max_age_s}
+
+    def start(self, pdf_sha: str, pdf_path: str):
+        self._update(pdf_sha, pdf_path=pdf_path, status='running', started_at=time.time(), error=None)
+
+    def finish(self, pdf_sha: str, output_path: str, timings: Dict):
+        self._update(pdf_sha, status='done', output_path=output_path, finished_at=time.time(),
+                     timings=timings, error=None)
+
+    def fail(self, pdf_sha: str, error: str, timings: Optional[Dict] = None):
+        self._update(pdf_sha, status='failed', finished_at=time.time(), timings=timings or {}, error=error)
+
+    def _update(self, pdf_sha: str, **fields):
+        with self._lock:
+            key = (pdf_sha, self._prompt_hash)
+            entry = dict(self._entries.get(key) or {'pdf_sha256': pdf_sha, 'prompt_hash': self._prompt_hash,
+                                                    'output_path': None})
+            entry.update(fields)
+            self._entries[key] = entry
+            self._append(dict(entry, type='entry'))
+
+    def _append(self, record: Dict):
+        # caller holds the lock; one line per change keeps updates O(1) and crash-safe
+        with open(self._path, 'a', encoding='utf-8') as fh:
+            fh.write(json.dumps(record) + '\n')
+
+    def _load(self):
+        if not os.path.exists(self._path):
+            os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+            return
+
+        with open(self._path, 'r', encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # a line cut short by a crash; everything before it is still valid
+                    continue
+                if record.pop('type', None) == 'file':
+                    if record.get('file_id'):
+                        self._files[record['pdf_sha256']] = record['file_id']
+                        self._uploaded_at[record['pdf_sha256']] = record.get('uploaded_at') or 0
+                    else:
+                        self._files.pop(record['pdf_sha256'], None)
+                        self._uploaded_at.pop(record['pdf_sha256'], None)
+                else:
+                    self._entries[(record['pdf_sha256'], record['prompt_hash'])] = record
+
+        # a run that was interrupted mid-extraction must be picked up again
+        for entry in self._entries.values():
+            if entry['status'] == 'running':
+                entry['status'] = 'interrupted'
+        self._compact()
+
+    def _compact(self):
+        tmp_path = self._path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            for pdf_sha, file_id in self._files.items():
+                fh.write(json.dumps({'type': 'file', 'pdf_sha256': pdf_sha, 'file_id': file_id,
+                                     'uploaded_at': self._uploaded_at.get(pdf_sha)}) + '\n')
+            for entry in self._entries.values():
+                fh.write(json.dumps(dict(entry, type='entry')) + '\n')
+        os.replace(tmp_path, self._path)
@@ -0,0 +1,79 @@
+import json
+import os
+from neo4j import Driver
+from neo4j_graphrag.schema import get_schema
+from QueryCache import GET_GRAPH_GENERATION_QUERY
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "neo4j_schema.json")
+
+# Labels that are bookkeeping, not contract data, and must not be offered to Text2Cypher
+INTERNAL_LABELS = ["GraphMeta"]
+
+# Used when the schema cannot be introspected (e.g. APOC is not installed)
+FALLBACK_NEO4J_SCHEMA = """
+Node properties:
+Agreement {agreement_type: STRING, contract_id: INTEGER,effective_date: STRING,renewal_term: STRING, name: STRING}
+ContractClause {type: STRING}
+ClauseType {name: STRING}
+Country {name: STRING}
+Excerpt {text: STRING}
+Organization {name: STRING}
+
+Relationship properties:
+IS_PARTY_TO {role: STRING}
+GOVERNED_BY_LAW {state: STRING}
+HAS_CLAUSE {type: STRING}
+INCORPORATED_IN {state: STRING}
+
+The relationships:
+(:Agreement)-[:HAS_CLAUSE]->(:ContractClause)
+(:ContractClause)-[:HAS_EXCERPT]->(:Excerpt)
+(:ContractClause)-[:HAS_TYPE]->(:ClauseType)
+(:Agreement)-[:GOVERNED_BY_LAW]->(:Country)
+(:Organization)-[:IS_PARTY_TO]->(:Agreement)
+(:Organization)-[:INCORPORATED_IN]->(:Country)
+"""
+
+
+def _graph_generation(driver: Driver) -> int:
+    records, _, _ = driver.execute_query(GET_GRAPH_GENERATION_QUERY)
+    return records[0]["generation"] if records else 0
+
+
+def introspect_schema(driver: Driver) -> str:
+    schema = get_schema(driver)
+    return "\n".join(line for line in schema.splitlines()
+                     if not any(label in line for label in INTERNAL_LABELS))
+
+
+def load_graph_schema(driver: Driver, snapshot_path: str = DEFAULT_SNAPSHOT_PATH) -> str:
+    """
+    Return the graph schema for Text2Cypher. The introspected schema is snapshotted on disk
+    together with the graph generation, and only introspected again after the graph changed.
+    """
+    try:
+        generation = _graph_generation(driver)
+    except Exception as e:
+        print(f"[WARN] Could not read the graph generation, using the built-in schema: {e}")
+        return FALLBACK_NEO4J_SCHEMA
+
+    try:
+        with open(snapshot_path, "r", encoding="utf-8") as fh:
+            snapshot = json.load(fh)
+        if snapshot.get("generation") == generation and snapshot.get("schema"):
+            return snapshot["schema"]
+    except (OSError, ValueError):
+        pass
+
+    try:
+        schema = introspect_schema(driver)
+    except Exception as e:
+        print(f"[WARN] Schema introspection failed, using the built-in schema: {e}")
+        return FALLBACK_NEO4J_SCHEMA
+
+    os.makedirs(os.path.dirname(os.path.abspath(snapshot_path)), exist_ok=True)
+    tmp_path = snapshot_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump({"generation": generation, "schema": schema}, fh, indent=4)
+    os.replace(tmp_path, snapshot_path)
+    return schema
@@ -0,0 +1,58 @@
+import re
+from typing import Callable, Dict, Hashable, List, Optional
+
+# Reciprocal-rank fusion constant; 60 is the value from the original RRF paper
+RRF_K = 60
+
+LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+# Bare upper-case AND/OR/NOT are operators; lower-cased they are plain words (the analyzer lower-cases anyway)
+LUCENE_OPERATOR_WORDS = {"AND", "OR", "NOT"}
+
+
+def lucene_query(text: str) -> str:
+    """
+    Fulltext query for a clause text: the exact phrase (boosted) or any of its words,
+    with Lucene operators in the text escaped.
+    """
+    words = [word.lower() if word in LUCENE_OPERATOR_WORDS else word for word in text.split()]
+    escaped = LUCENE_SPECIAL.sub(r"\\\1", " ".join(words))
+    if not escaped:
+        return ""
+    return f'"{escaped}"^2 OR ({escaped})'
+
+
+def reciprocal_rank_fusion(ranked_lists: List[List[Dict]], key: Callable[[Dict], Hashable],
+                           k: int = RRF_K) -> List[Dict]:
+    """
+    Fuse ranked result lists: an item scores sum(1 / (k + rank)) over the lists it appears in,
+    counting only its best rank within each list. Items with the same key are merged
+    (the first, best-ranked occurrence is kept).
+    Returns the items best first, each with its fused score under 'rrf_score'.
+    """
+    scores, items = {}, {}
+    for ranked in ranked_lists:
+        best_ranks = {}
+        for rank, item in enumerate(ranked, start=1):
+            item_key = key(item)
+            best_ranks.setdefault(item_key, rank)
+            items.setdefault(item_key, item)
+        for item_key, rank in best_ranks.items():
+            scores[item_key] = scores.get(item_key, 0.0) + 1.0 / (k + rank)
+    fused = sorted(scores, key=scores.get, reverse=True)
+    return [dict(items[item_key], rrf_score=scores[item_key]) for item_key in fused]
+
+
+def diversify(items: List[Dict], top_k: int, max_per_contract: Optional[int] = None) -> List[Dict]:
+    """
+    Take the first top_k items, with at most max_per_contract items per contract_id.
+    """
+    selected, per_contract = [], {}
+    for item in items:
+        count = per_contract.get(item["contract_id"], 0)
+        if max_per_contract is not None and count >= max_per_contract:
+            continue
+        per_contract[item["contract_id"]] = count + 1
+        selected.append(item)
+        if len(selected) == top_k:
+            break
+    return selected
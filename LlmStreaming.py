@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator, Optional
+from semantic_kernel.contents import ChatHistory
+from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+
+DEFAULT_LATENCY_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "llm_latency.jsonl")
+
+
+async def stream_chat(llm: ChatCompletionClientBase, prompt: str) -> AsyncIterator[str]:
+    """
+    Yield the text of a single-prompt chat completion as it is generated.
+    """
+    settings = OpenAIChatPromptExecutionSettings()
+    chat_history = ChatHistory()
+    chat_history.add_user_message(prompt)
+    async for messages in llm.get_streaming_chat_message_contents(
+            chat_history=chat_history, settings=settings, kernel=None):
+        for message in messages:
+            if message.content:
+                yield message.content
+
+
+class LatencyLog:
+    """
+    Appends one JSON line per LLM request: kind, time to first token, total latency, characters.
+    """
+    def __init__(self, path: str = DEFAULT_LATENCY_LOG):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, metrics: Dict):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with self._lock, open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(metrics) + "\n")
+        except OSError as e:
+            print(f"[WARN] Could not record LLM latency: {e}")
+
+
+class TimedStream:
+    """
+    Synchronous iterator over an async text stream (for st.write_stream), which measures
+    time to first token and total latency from the first read and records them when the stream ends.
+    The async stream runs on its own event loop, like the asyncio.run calls elsewhere in the app.
+    A producer that serves the text from a cache sets .cached, which is recorded with the metrics
+    so cache hits can be told apart from LLM requests.
+    """
+    def __init__(self, stream: AsyncIterator[str], kind: str, log: Optional[LatencyLog] = None):
+        self._stream = stream
+        self._kind = kind
+        self._log = log
+        self.cached = False
+        self.metrics = None
+
+    def __iter__(self) -> Iterator[str]:
+        loop = asyncio.new_event_loop()
+        started = time.perf_counter()
+        first_token, chars = None, 0
+        try:
+            while True:
+                try:
+                    chunk = loop.run_until_complete(self._stream.__anext__())
+                except StopAsyncIteration:
+                    break
+                if first_token is None and chunk:
+                    first_token = time.perf_counter() - started
+                chars += len(chunk)
+                yield chunk
+        finally:
+            loop.run_until_complete(self._stream.aclose())
+            loop.close()
+            total = time.perf_counter() - started
+            self.metrics = {"kind": self._kind, "ttft_s": round(first_token if first_token is not None else total, 3),
+                            "total_s": round(total, 3), "chars": chars, "cached": self.cached, "at": time.time()}
+            if self._log:
+                self._log.record(self.metrics)
@@ -0,0 +1,157 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from openai import OpenAI
+from PdfExtractor import extract_pages
+from Utils import extract_json_from_string
+
+# Lines that open a new section/clause: "ARTICLE 5", "Section 12.", "12.3 Term", "IV. NON-COMPETITION"
+SECTION_HEADING = re.compile(
+    r'^\s*(?:(?:ARTICLE|Article|SECTION|Section|CLAUSE|Clause)\s+[0-9IVXLC]+|\d{1,3}(?:\.\d{1,3})*\.?\s+[A-Z]|[IVXLC]{1,6}\.\s+[A-Z])'
+)
+
+AGREEMENT_FIELDS = ["agreement_name", "agreement_type", "effective_date", "expiration_date",
+                    "renewal_term", "Notice_period_to_Terminate_Renewal"]
+
+
+def split_sections(pages: List[str]) -> List[str]:
+    """
+    Split the contract text into sections at clause headings.
+    """
+    sections, current = [], []
+    for line in "".join(pages).splitlines():
+        if SECTION_HEADING.match(line) and current:
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current))
+    return [section for section in sections if section.strip()]
+
+
+def chunk_sections(pages: List[str], max_chars: int = 12000) -> List[str]:
+    """
+    Pack whole sections into chunks of at most max_chars, so a clause is never cut
+    in half unless the section itself is longer than a chunk.
+    """
+    chunks, current, size = [], [], 0
+    for section in split_sections(pages):
+        while len(section) > max_chars:
+            # an oversized section is split on its own
+            if current:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            chunks.append(section[:max_chars])
+            section = section[max_chars:]
+        if size + len(section) > max_chars and current:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(section)
+        size += len(section) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _is_yes(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("yes", "true", "y")
+    return bool(value)
+
+
+def merge_extractions(results: List[Dict]) -> Dict:
+    """
+    Merge per-chunk extractions (in document order) into one agreement:
+    the first non-empty value wins for scalar fields, parties are merged by name,
+    and a clause exists if any chunk found it, with the excerpts of all chunks.
+    """
+    merged = {field: "" for field in AGREEMENT_FIELDS}
+    merged["parties"] = []
+    merged["governing_law"] = {"country": "", "state": "", "most_favored_country": ""}
+    merged["clauses"] = []
+    parties, clauses = {}, {}
+
+    for result in results:
+        agreement = (result or {}).get("agreement") or {}
+        for field in AGREEMENT_FIELDS:
+            if not merged[field] and agreement.get(field):
+                merged[field] = agreement[field]
+
+        governing_law = agreement.get("governing_law") or {}
+        if not merged["governing_law"]["country"] and governing_law.get("country"):
+            merged["governing_law"] = {key: governing_law.get(key, "") for key in merged["governing_law"]}
+
+        for party in agreement.get("parties") or []:
+            name = (party.get("name") or "").strip()
+            if not name:
+                continue
+            known = parties.setdefault(name.lower(), {"role": "", "name": name, "incorporation_country": "",
+                                                      "incorporation_state": ""})
+            for key, value in party.items():
+                if value and not known.get(key):
+                    known[key] = value
+
+        for clause in agreement.get("clauses") or []:
+            clause_type = clause.get("clause_type")
+            if not clause_type:
+                continue
+            known = clauses.setdefault(clause_type, {"clause_type": clause_type, "exists": False, "excerpts": []})
+            if _is_yes(clause.get("exists")):
+                known["exists"] = True
+                for excerpt in clause.get("excerpts") or []:
+                    if excerpt and excerpt not in known["excerpts"]:
+                        known["excerpts"].append(excerpt)
+
+    merged["parties"] = list(parties.values())
+    merged["clauses"] = list(clauses.values())
+    return {"agreement": merged}
+
+
+class LocalContractExtractor:
+    """
+    Extraction engine that reads the PDF text locally and sends section chunks straight to
+    chat completions, instead of uploading the file for the Assistants file_search tool.
+    Chunks are extracted in parallel and merged into the usual data/output/*.json shape.
+    """
+    def __init__(self, client: OpenAI, model: str, system_prompt: str, extraction_prompt: str,
+                 max_chars: int = 12000, max_workers: int = 4):
+        self._client = client
+        self._model = model
+        self._system_prompt = system_prompt
+        self._extraction_prompt = extraction_prompt
+        self._max_chars = max_chars
+        self._max_workers = max_workers
+
+    def extract(self, pdf_path: str) -> Tuple[Dict, List[str]]:
+        """
+        Returns the merged contract JSON and the raw per-chunk responses.
+        """
+        chunks = chunk_sections(extract_pages(pdf_path), max_chars=self._max_chars)
+        if not chunks:
+            raise ValueError(f"No text could be extracted from {pdf_path}")
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            responses = list(executor.map(self._extract_chunk, range(len(chunks)), chunks, [len(chunks)] * len(chunks)))
+
+        results = [extract_json_from_string(response) for response in responses]
+        if not any(results):
+            raise ValueError("No valid JSON extracted from any chunk")
+        return merge_extractions(results), responses
+
+    def _extract_chunk(self, index: int, chunk: str, total: int) -> str:
+        prompt = (
+            f"{self._extraction_prompt}\n\n"
+            f"The contract text below is part {index + 1} of {total}. Answer only from this part; "
+            f"leave fields empty and set exists to false for anything it does not contain.\n\n"
+            f"Contract text:\n{chunk}"
+        )
+        response = self._client.chat.completions.create(
+            model=self._model,
+            temperature=0,
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": self._system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+        )
+        return response.choices[0].message.content or ""
@@ -0,0 +1,80 @@
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+import fitz
+
+# Below this many pages per worker the pool start-up costs more than it saves
+MIN_PAGES_PER_WORKER = 16
+
+# One pool for the process, sized to the CPUs and never replaced: callers on other
+# threads may still be submitting to it. Each call limits its share by how it chunks the pages.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _extract_range(pdf_path: str, start: int, end: int) -> List[str]:
+    """
+    Worker: open a private fitz document and return the text of pages [start, end).
+    """
+    with fitz.open(pdf_path) as doc:
+        return [doc[i].get_text() for i in range(start, end)]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the callers (Streamlit, the threaded converter) are multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+@atexit.register
+def _shutdown_pool():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+
+
+def page_count(pdf_path: str) -> int:
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def iter_pages(pdf_path: str, start: int = 0, end: Optional[int] = None,
+               workers: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of pages [start, end) in page order.
+    The range is split into chunks that are extracted concurrently by a process pool,
+    each worker opening its own fitz document; small ranges are read in-process.
+    """
+    total = page_count(pdf_path)
+    end = total if end is None else min(end, total)
+    start = max(start, 0)
+    if start >= end:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, math.ceil((end - start) / MIN_PAGES_PER_WORKER))
+    if workers <= 1:
+        yield from _extract_range(pdf_path, start, end)
+        return
+
+    # a few chunks per worker keeps the pool busy and lets the first pages stream early
+    chunk_size = max(MIN_PAGES_PER_WORKER // 4, math.ceil((end - start) / (workers * 4)))
+    pool = _get_pool()
+    futures = [
+        pool.submit(_extract_range, pdf_path, chunk_start, min(chunk_start + chunk_size, end))
+        for chunk_start in range(start, end, chunk_size)
+    ]
+    for future in futures:
+        yield from future.result()
+
+
+def extract_pages(pdf_path: str, start: int = 0, end: Optional[int] = None,
+                  workers: Optional[int] = None) -> List[str]:
+    return list(iter_pages(pdf_path, start=start, end=end, workers=workers))
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import List
+from PdfExtractor import extract_pages
+
+SIDECAR_SUFFIX = ".pages.json"
+
+
+def file_sha256(file_path: str) -> str:
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def contract_id_from_sha256(digest: str) -> int:
+    """
+    The graph contract_id of a PDF: the first 13 hex digits (52 bits) of its SHA-256,
+    as assigned by create_graph_from_json.py.
+    """
+    return int(digest[:13], 16)
+
+
+class PdfTextCache:
+    """
+    Content-hash keyed cache of the per-page text of PDF contracts.
+    Pages live in an in-memory LRU and in a JSON sidecar next to the PDF
+    (<contract>.pdf.pages.json), so each file is parsed only once.
+    """
+    def __init__(self, max_entries: int = 32, max_hash_entries: int = 1024):
+        self._max_entries = max_entries
+        self._max_hash_entries = max_hash_entries
+        self._pages = OrderedDict()   # sha256 -> list of page texts
+        self._hashes = OrderedDict()  # (path, mtime, size) -> sha256
+        self._lock = threading.Lock()
+
+    def get_text(self, pdf_path: str) -> str:
+        return "".join(self.get_pages(pdf_path))
+
+    def get_pages(self, pdf_path: str) -> List[str]:
+        key = self._content_hash(pdf_path)
+
+        #1. in-memory LRU
+        with self._lock:
+            if key in self._pages:
+                self._pages.move_to_end(key)
+                return self._pages[key]
+
+        #2. on-disk sidecar, 3. extract and persist
+        pages = self._read_sidecar(pdf_path, key)
+        if pages is None:
+            pages = self._extract_pages(pdf_path)
+            self._write_sidecar(pdf_path, key, pages)
+
+        with self._lock:
+            self._pages[key] = pages
+            self._pages.move_to_end(key)
+            while len(self._pages) > self._max_entries:
+                self._pages.popitem(last=False)
+        return pages
+
+    def content_hash(self, pdf_path: str) -> str:
+        """
+        SHA-256 of the file, memoised by path, mtime and size.
+        """
+        return self._content_hash(pdf_path)
+
+    def _content_hash(self, pdf_path: str) -> str:
+        stat = os.stat(pdf_path)
+        stat_key = (os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            key = self._hashes.get(stat_key)
+            if key is not None:
+                self._hashes.move_to_end(stat_key)
+        if key is None:
+            key = file_sha256(pdf_path)
+            with self._lock:
+                self._hashes[stat_key] = key
+                while len(self._hashes) > self._max_hash_entries:
+                    self._hashes.popitem(last=False)
+        return key
+
+    def _extract_pages(self, pdf_path: str) -> List[str]:
+        return extract_pages(pdf_path)
+
+    def _read_sidecar(self, pdf_path: str, key: str):
+        try:
+            with open(pdf_path + SIDECAR_SUFFIX, 'r', encoding='utf-8') as fh:
+                sidecar = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if sidecar.get('sha256') != key:
+            return None
+        return sidecar.get('pages')
+
+    def _write_sidecar(self, pdf_path: str, key: str, pages: List[str]):
+        sidecar_path = pdf_path + SIDECAR_SUFFIX
+        tmp_path = sidecar_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                json.dump({'sha256': key, 'pages': pages}, fh)
+            os.replace(tmp_path, sidecar_path)
+        except OSError as e:
+            # the cache is an optimisation only; a read-only folder must not break extraction
+            print(f"[WARN] Could not write text cache for {pdf_path}: {e}")
@@ -0,0 +1,95 @@
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable
+
+# The graph "generation" is bumped by every write path (ingestion, add_contract);
+# cached read results from an older generation are discarded
+GET_GRAPH_GENERATION_QUERY = """
+OPTIONAL MATCH (g:GraphMeta {name: 'graph'})
+RETURN coalesce(g.generation, 0) AS generation
+"""
+
+BUMP_GRAPH_GENERATION_STATEMENT = """
+MERGE (g:GraphMeta {name: 'graph'})
+SET g.generation = coalesce(g.generation, 0) + 1, g.updated_at = datetime()
+RETURN g.generation AS generation
+"""
+
+
+class QueryResultCache:
+    """
+    TTL + LRU cache for read results, invalidated when the graph generation changes.
+    The generation is re-read from Neo4j at most every generation_check_interval seconds,
+    so between checks a repeated read costs a dictionary lookup.
+    Cached results are shared between callers and must not be mutated.
+    """
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 600.0, generation_check_interval: float = 5.0):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._check_interval = generation_check_interval
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._generation = None
+        self._generation_checked_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable],
+                          fetch_generation: Callable[[], Awaitable[int]]):
+        await self._check_generation(fetch_generation)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = await loader()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, generation: int = None):
+        with self._lock:
+            self._entries.clear()
+            if generation is not None:
+                self._generation = generation
+                self._generation_checked_at = time.monotonic()
+
+    async def _check_generation(self, fetch_generation):
+        now = time.monotonic()
+        if now - self._generation_checked_at < self._check_interval:
+            return
+        generation = await fetch_generation()
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+            self._generation_checked_at = now
+
+
+def cached_read(method):
+    """
+    Serve an async ContractSearchService read method through self._result_cache,
+    keyed by the method name and its bound arguments.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__,) + tuple(
+            (name, value) for name, value in bound.arguments.items() if name != "self")
+        return await self._result_cache.get_or_load(
+            key, functools.partial(method, self, *args, **kwargs), self._fetch_graph_generation)
+
+    return wrapper
@@ -0,0 +1,89 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from Text2CypherCache import normalize_question
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "response_cache.sqlite")
+
+
+def template_hash(*templates: str) -> str:
+    return hashlib.sha256("\x00".join(templates).encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCache:
+    """
+    On-disk cache (SQLite) of LLM summaries and answers, shared by all Streamlit sessions and processes.
+    Entries are keyed by (PDF content hash, kind, normalized question, model, prompt template hash),
+    expire after ttl_seconds and are evicted least recently used first beyond max_bytes of text.
+    """
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH, ttl_seconds: float = 7 * 24 * 3600,
+                 max_bytes: int = 64 * 1024 * 1024):
+        self._db_path = db_path
+        self._ttl = ttl_seconds
+        self._max_bytes = max_bytes
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    pdf_sha256 TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_pdf ON responses (pdf_sha256)")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(pdf_sha256: str, kind: str, question: str, model: str, template: str) -> str:
+        parts = [pdf_sha256, kind, normalize_question(question or ""), model, template]
+        return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, pdf_sha256: str, kind: str, question: str, model: str, template: str) -> Optional[str]:
+        key = self._key(pdf_sha256, kind, question, model, template)
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with conn:
+            if now - row[1] > self._ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, pdf_sha256: str, kind: str, question: str, model: str, template: str, response: str):
+        key = self._key(pdf_sha256, kind, question, model, template)
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO responses (key, pdf_sha256, response, size, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)""", (key, pdf_sha256, response, len(response.encode("utf-8")), now, now))
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self._ttl,))
+            # drop least recently used entries until the cached text fits max_bytes
+            conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS running_size FROM responses
+                    ) WHERE running_size > ?)""", (self._max_bytes,))
+
+    def invalidate_contract(self, pdf_sha256: str) -> int:
+        conn = self._connection()
+        with conn:
+            return conn.execute("DELETE FROM responses WHERE pdf_sha256 = ?", (pdf_sha256,)).rowcount
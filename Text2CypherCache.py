@@ -0,0 +1,98 @@
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from neo4j_graphrag.embeddings.base import Embedder
+
+
+def normalize_question(question: str) -> str:
+    """
+    Case, whitespace and trailing punctuation do not change the Cypher a question needs.
+    """
+    return re.sub(r"\s+", " ", question).strip().strip("?!. ").lower()
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class Text2CypherCache:
+    """
+    LRU cache from a normalized question to Cypher that was generated for it and passed EXPLAIN.
+    With an embedder and a similarity_threshold, a question that misses the exact key may reuse
+    the Cypher of its nearest cached neighbour when the cosine similarity is at least the threshold.
+    Keep the threshold high: "with clause X" and "without clause X" embed very close together.
+    """
+    def __init__(self, max_entries: int = 512, embedder: Optional[Embedder] = None,
+                 similarity_threshold: Optional[float] = None):
+        self._max_entries = max_entries
+        self._embedder = embedder if similarity_threshold is not None else None
+        self._similarity_threshold = similarity_threshold
+        self._entries = OrderedDict()   # normalized question -> (cypher, embedding or None)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, question: str) -> Optional[str]:
+        key = normalize_question(question)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        if self._embedder:
+            cypher = self._get_similar(key)
+            if cypher:
+                return cypher
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _get_similar(self, key: str) -> Optional[str]:
+        embedding = self._embedder.embed_query(key)
+        with self._lock:
+            best_key, best_score = None, self._similarity_threshold
+            for other_key, (_, other_embedding) in self._entries.items():
+                if other_embedding is None:
+                    continue
+                score = _cosine(embedding, other_embedding)
+                if score >= best_score:
+                    best_key, best_score = other_key, score
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            self.similar_hits += 1
+            return self._entries[best_key][0]
+
+    def put(self, question: str, cypher: str):
+        key = normalize_question(question)
+        embedding = self._embedder.embed_query(key) if self._embedder else None
+        with self._lock:
+            self._entries[key] = (cypher, embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, question: str):
+        with self._lock:
+            self._entries.pop(normalize_question(question), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.similar_hits + self.misses
+            return {"entries": len(self._entries), "hits": self.hits, "similar_hits": self.similar_hits,
+                    "misses": self.misses, "evictions": self.evictions,
+                    "hit_rate": (self.hits + self.similar_hits) / lookups if lookups else 0.0}
@@ -3,12 +3,8 @@ load_dotenv()
 
 import streamlit as st
 import os
-import asyncio
-import fitz
 from semantic_kernel import Kernel
 from semantic_kernel.connectors.ai.open_ai import OpenAIChatCompletion
-from semantic_kernel.contents import ChatHistory
-from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
 from ContractPlugin import ContractPlugin
 from ContractService import ContractSearchService
 
@@ -28,6 +24,10 @@ if not OPENAI_KEY:
 if "semantic_kernel" not in st.session_state:
     kernel = Kernel()
     contract_service = ContractSearchService("bolt://localhost:7687", "neo4j", os.getenv("NEO4J_PASSWORD"))
+    try:
+        contract_service.warm_up()
+    except Exception as e:
+        st.warning(f"Contract search is not ready: {e}")
     
     # Add LLM service
     llm = OpenAIChatCompletion(ai_model_id="gpt-4o-mini", api_key=OPENAI_KEY)
@@ -61,10 +61,20 @@ if st.button("Upload Contract"):
 # List and Select Contracts
 # -----------------------------
 st.subheader("Available Contracts")
-contracts = st.session_state.contract_plugin.get_all_contracts()
+PAGE_SIZE = 50
+search_input = st.text_input("Search contracts by name:")
+total_contracts = st.session_state.contract_plugin.count_contracts(search=search_input)
+page_count = max(1, (total_contracts + PAGE_SIZE - 1) // PAGE_SIZE)
+page = st.number_input(f"Page (of {page_count}):", min_value=1, max_value=page_count, value=1) if page_count > 1 else 1
+if st.button("Rescan contract folder"):
+    st.json(st.session_state.contract_plugin.sync_contract_catalog())
+
+# only the visible page is read from the contract catalog
+contracts = st.session_state.contract_plugin.get_all_contracts(offset=(page - 1) * PAGE_SIZE, limit=PAGE_SIZE,
+                                                               search=search_input)
 if contracts:
     contract_names = [c["name"] for c in contracts]
-    selected_name = st.selectbox("Select a contract to ask about:", contract_names)
+    selected_name = st.selectbox(f"Select a contract to ask about ({total_contracts} found):", contract_names)
     st.session_state.selected_contract = next((c for c in contracts if c["name"] == selected_name), None)
 else:
     st.info("No contracts available yet.")
@@ -72,11 +82,19 @@ else:
 # -----------------------------
 # Summarize Selected Contract
 # -----------------------------
+def show_latency(stream):
+    if stream.metrics and stream.metrics["cached"]:
+        st.caption("Served from the response cache")
+    elif stream.metrics:
+        st.caption(f"First token after {stream.metrics['ttft_s']:.2f}s, complete after {stream.metrics['total_s']:.2f}s")
+
 if st.session_state.selected_contract:
     if st.button("Summarize Selected Contract"):
-        summary = st.session_state.contract_plugin.summarize_contract(st.session_state.selected_contract["file_path"])
         st.markdown("**Summary:**")
-        st.write(summary)
+        # tokens are rendered as they arrive
+        summary_stream = st.session_state.contract_plugin.stream_summary(st.session_state.selected_contract["file_path"])
+        st.write_stream(summary_stream)
+        show_latency(summary_stream)
 
 # -----------------------------
 # Ask Questions About Contract
@@ -84,37 +102,12 @@ if st.session_state.selected_contract:
 st.subheader("Ask About Contract")
 question_input = st.text_input("Your question:")
 
-async def ask_question(question, contract_path):
-    """
-    Sends question and contract text to LLM for answer.
-    """
-    plugin = st.session_state.contract_plugin
-    # Extract text from PDF
-    try:
-        text_content = ""
-        with fitz.open(contract_path) as doc:
-            for page in doc:
-                text_content += page.get_text()
-        if not text_content.strip():
-            return "Contract is empty or could not extract text."
-    except Exception as e:
-        return f"Failed to read PDF: {e}"
-
-    prompt = f"Answer this question simply for a non-expert. Contract:\n{text_content}\n\nQuestion: {question}"
-    settings = OpenAIChatPromptExecutionSettings()
-    chat_history = ChatHistory()
-    chat_history.add_user_message(prompt)
-    result = await plugin._llm.get_chat_message_contents(
-        chat_history=chat_history,
-        settings=settings,
-        kernel=None
-    )
-    return result[0].content if result else "No answer generated."
-
 if st.button("Ask Question") and question_input.strip() != "" and st.session_state.selected_contract:
-    answer = asyncio.run(ask_question(question_input, st.session_state.selected_contract["file_path"]))
     st.markdown("**Answer:**")
-    st.write(answer)
+    answer_stream = st.session_state.contract_plugin.stream_answer(
+        st.session_state.selected_contract["file_path"], question_input)
+    st.write_stream(answer_stream)
+    show_latency(answer_stream)
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,62 @@
+import argparse
+import random
+import statistics
+import time
+import numpy as np
+from create_graph_from_json import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, connect
+from ExcerptVectorIndex import DEFAULT_INDEX_DIR, ExcerptVectorIndex
+
+NEO4J_VECTOR_SEARCH_QUERY = """
+CALL db.index.vector.queryNodes('excerpt_embedding', $top_k, $vector)
+YIELD node, score
+RETURN elementId(node) AS id, score
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the offline excerpt index with the excerpt_embedding index: latency and recall@k.")
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    index = ExcerptVectorIndex(args.index_dir)
+    if not index.count:
+        print("The exported index is empty; run export_excerpt_index.py first.")
+        return
+
+    # stored excerpt vectors (slightly perturbed) serve as queries, so no embedding calls are made
+    rng = np.random.default_rng(42)
+    rows = random.Random(42).sample(range(index.count), min(args.queries, index.count))
+    queries = [np.asarray(index._vectors[row]) + rng.normal(0, 0.01, index.dimensions).astype(np.float32)
+               for row in rows]
+
+    driver = connect(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    local_ms, neo4j_ms, recalls = [], [], []
+    try:
+        for query in queries:
+            started = time.perf_counter()
+            exact = index.search(query, args.top_k)
+            local_ms.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            records, _, _ = driver.execute_query(NEO4J_VECTOR_SEARCH_QUERY, top_k=args.top_k, vector=query.tolist())
+            neo4j_ms.append((time.perf_counter() - started) * 1000)
+
+            # the local search is exact, so overlap with it is the recall of the Neo4j ANN index
+            expected = {item["id"] for item in exact}
+            recalls.append(len(expected & {record["id"] for record in records}) / len(expected))
+    finally:
+        driver.close()
+
+    print(f"{index.count} excerpts x {index.dimensions} dims, {len(queries)} queries, top_k={args.top_k}")
+    print(f"{'backend':<20} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, timings in (("offline numpy", local_ms), ("neo4j vector index", neo4j_ms)):
+        timings = sorted(timings)
+        print(f"{name:<20} {statistics.median(timings):>8.2f} {timings[int(len(timings) * 0.95) - 1]:>8.2f}")
+    print(f"recall@{args.top_k} of the Neo4j index vs exact search: {statistics.mean(recalls):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import ast
+import random
+import time
+from neo4j import Record
+from formatters import my_excerpt_record_formatter, format_records
+
+RECORDS = 2000
+DIMENSIONS = 1536
+REPEATS = 5
+
+
+def literal_eval_excerpt_record_formatter(record):
+    # the previous formatter: node -> to_string -> to_dict -> d['text']
+    node_as_dict = ast.literal_eval(str(record.get("node")))
+    return "Excerpt: " + node_as_dict['text']
+
+
+def synthetic_records(rng):
+    node_records, projected_records = [], []
+    for i in range(RECORDS):
+        text = f"Excerpt {i}: the Supplier shall not, during the Term, compete with the Company in region {rng.randrange(50)}."
+        node = {"text": text, "embedding": [rng.random() for _ in range(DIMENSIONS)]}
+        score = rng.random()
+        node_records.append(Record([("node", node), ("score", score), ("nodeLabels", ["Excerpt"]), ("id", str(i))]))
+        projected_records.append(Record([("text", text), ("score", score), ("nodeLabels", ["Excerpt"]), ("id", str(i))]))
+    return node_records, projected_records
+
+
+def best_time(fn, records, repeats):
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn(records)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    node_records, projected_records = synthetic_records(random.Random(42))
+    runs = [
+        ("str + ast.literal_eval (node with embedding)",
+         lambda records: [literal_eval_excerpt_record_formatter(r) for r in records], node_records, 1),
+        ("direct field access (node with embedding)",
+         lambda records: format_records(records, my_excerpt_record_formatter), node_records, REPEATS),
+        ("direct field access (projected node.text)",
+         lambda records: format_records(records, my_excerpt_record_formatter), projected_records, REPEATS),
+    ]
+    baseline = None
+    # the literal_eval path takes seconds per run, so it is timed once
+    print(f"{RECORDS} synthetic excerpt records ({DIMENSIONS}-dim embeddings on the nodes), best of {REPEATS}")
+    for name, fn, records, repeats in runs:
+        elapsed = best_time(fn, records, repeats)
+        baseline = baseline or elapsed
+        print(f"{name:<48} {elapsed * 1000:>9.1f} ms  {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import random
+import time
+from create_graph_from_json import (NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, connect, ingest_contracts)
+
+# synthetic agreements get negative contract_ids so they can be removed afterwards;
+# real ids are content hashes and never negative
+CLEANUP_STATEMENT = """
+MATCH (a:Agreement) WHERE a.contract_id < 0
+OPTIONAL MATCH (a)-[:HAS_CLAUSE]->(cl:ContractClause)
+OPTIONAL MATCH (cl)-[:HAS_EXCERPT]->(e:Excerpt)
+DETACH DELETE a, cl, e
+"""
+
+# the synthetic parties, once no agreement is left for them
+CLEANUP_PARTIES_STATEMENT = """
+MATCH (o:Organization) WHERE o.name STARTS WITH 'Synthetic ' AND NOT (o)-[:IS_PARTY_TO]->()
+DETACH DELETE o
+"""
+
+CLAUSE_TYPES = ["Non-Compete", "Exclusivity", "Anti-Assignment", "Audit Rights", "Insurance",
+                "Cap On Liability", "License grant", "Termination For Convenience"]
+
+
+def synthetic_contract(i, rng):
+    return {"agreement": {
+        "contract_id": -(i + 1),
+        "agreement_name": f"Synthetic Agreement {i}",
+        "agreement_type": rng.choice(["Supply Agreement", "License Agreement", "Services Agreement"]),
+        "effective_date": "2020-01-01",
+        "expiration_date": "",
+        "renewal_term": "",
+        "parties": [
+            {"role": "Vendor", "name": f"Synthetic Vendor {rng.randrange(200)}",
+             "incorporation_country": "United States", "incorporation_state": "Delaware"},
+            {"role": "Client", "name": f"Synthetic Client {rng.randrange(200)}",
+             "incorporation_country": "United States", "incorporation_state": "New York"},
+        ],
+        "governing_law": {"country": "United States", "state": "New York", "most_favored_country": "United States"},
+        "clauses": [
+            {"clause_type": clause_type, "exists": True,
+             "excerpts": [f"Synthetic excerpt {i}-{j} for {clause_type}." for j in range(2)]}
+            for clause_type in rng.sample(CLAUSE_TYPES, 4)
+        ],
+    }}
+
+
+def cleanup(driver):
+    driver.execute_query(CLEANUP_STATEMENT)
+    driver.execute_query(CLEANUP_PARTIES_STATEMENT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure contracts/second of the batched graph loader.")
+    parser.add_argument("--contracts", type=int, default=2000)
+    parser.add_argument("--batch-sizes", default="1,10,50,100,250,500")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    contracts = [(f"synthetic_{i}.json", synthetic_contract(i, rng)) for i in range(args.contracts)]
+    driver = connect(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+
+    results = []
+    try:
+        for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+            cleanup(driver)
+            started = time.perf_counter()
+            written = ingest_contracts(driver, contracts, batch_size=batch_size, workers=args.workers)
+            elapsed = time.perf_counter() - started
+            results.append((batch_size, written, elapsed))
+    finally:
+        cleanup(driver)
+        driver.close()
+
+    print(f"\n{args.contracts} synthetic contracts, {args.workers} concurrent batches")
+    print(f"{'batch size':>10} {'written':>8} {'seconds':>9} {'contracts/s':>12}")
+    for batch_size, written, elapsed in results:
+        print(f"{batch_size:>10} {written:>8} {elapsed:>9.2f} {written / elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+import fitz
+from PdfExtractor import extract_pages
+
+INPUT_DIR = './data/input/'
+REPEATS = 3
+
+
+def sequential_extract(pdf_path):
+    # the original loop from ContractPlugin.summarize_contract / app.py
+    text_content = ""
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            text_content += page.get_text()
+    return text_content
+
+
+def best_time(fn, *args, **kwargs):
+    best = None
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    input_dir = sys.argv[1] if len(sys.argv) > 1 else INPUT_DIR
+    workers = os.cpu_count() or 1
+    pdf_files = sorted(f for f in os.listdir(input_dir) if f.lower().endswith('.pdf'))
+    if not pdf_files:
+        print("No PDF files found in", input_dir)
+        return
+
+    # warm the process pool so its start-up is not billed to the first file
+    extract_pages(os.path.join(input_dir, pdf_files[0]), workers=workers)
+
+    print(f"{'file':45} {'pages':>6} {'sequential':>12} {'parallel':>12} {'speedup':>8}")
+    for pdf_filename in pdf_files:
+        pdf_path = os.path.join(input_dir, pdf_filename)
+        seq_time, seq_text = best_time(sequential_extract, pdf_path)
+        par_time, pages = best_time(extract_pages, pdf_path, workers=workers)
+        assert "".join(pages) == seq_text, f"text mismatch for {pdf_filename}"
+        print(f"{pdf_filename:45} {len(pages):>6} {seq_time * 1000:>10.1f}ms {par_time * 1000:>10.1f}ms {seq_time / par_time:>7.2f}x")
+    print(f"({workers} worker processes, best of {REPEATS} runs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,17 @@
 import os
 import json
-from openai import OpenAI
+import time
+import shutil
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from openai import OpenAI, NotFoundError
 from openai.types.beta.threads.message_create_params import Attachment, AttachmentToolFileSearch
 from Utils import read_text_file, save_json_string_to_file, extract_json_from_string
+from ExtractionManifest import ExtractionManifest, prompt_hash
+from AssistantLifecycle import AssistantLifecycle
+from LocalExtractor import LocalContractExtractor
 
 # --------------------------
 # 1. Initialize OpenAI client
@@ -20,36 +29,57 @@ system_instruction = read_text_file('./prompts/system_prompt.txt')
 extraction_prompt = read_text_file('./prompts/contract_extraction_prompt.txt')
 
 # --------------------------
-# 3. Create the assistant
+# 3. Assistant, threads and cleanup
 # --------------------------
 MODEL_NAME = "gpt-4o-mini" 
+PROMPT_HASH = prompt_hash(MODEL_NAME, system_instruction, extraction_prompt)
 
-pdf_assistant = client.beta.assistants.create(
+# The assistant is created on first use and its id cached in data/assistant_cache.json
+lifecycle = AssistantLifecycle(
+    client,
     model=MODEL_NAME,
-    description="An assistant to extract the information from contracts in PDF format.",
-    tools=[{"type": "file_search"}],
-    name="PDF assistant",
     instructions=system_instruction,
+    cache_path='./data/assistant_cache.json',
+    name="PDF assistant",
+    description="An assistant to extract the information from contracts in PDF format.",
 )
 
 # --------------------------
 # 4. Process a single PDF
 # --------------------------
-def process_pdf(pdf_path):
-    # Create a thread for this PDF
-    thread = client.beta.threads.create()
+def upload_pdf(pdf_path, file_id=None):
+    """
+    Upload the PDF, or reuse a previously uploaded file when it still exists.
+    """
+    if file_id:
+        try:
+            return client.files.retrieve(file_id).id
+        except NotFoundError:
+            pass
 
-    # Upload the PDF
-    file = client.files.create(file=open(pdf_path, "rb"), purpose="assistants")
+    with open(pdf_path, "rb") as pdf_file:
+        file = client.files.create(file=pdf_file, purpose="assistants")
+    return file.id
 
+
+def run_extraction(file_id):
+    # Create a thread for this PDF; it is deleted in the background once we are done
+    thread_id = lifecycle.acquire_thread()
+    try:
+        return _run_on_thread(thread_id, file_id)
+    finally:
+        lifecycle.release_thread(thread_id)
+
+
+def _run_on_thread(thread_id, file_id):
     # Send a message to the assistant with the PDF attached
     client.beta.threads.messages.create(
-        thread_id=thread.id,
+        thread_id=thread_id,
         role="user",
         content=extraction_prompt,
         attachments=[
             Attachment(
-                file_id=file.id,
+                file_id=file_id,
                 tools=[AttachmentToolFileSearch(type="file_search")]
             )
         ],
@@ -57,8 +87,8 @@ def process_pdf(pdf_path):
 
     # Run the assistant on the thread
     run = client.beta.threads.runs.create_and_poll(
-        thread_id=thread.id,
-        assistant_id=pdf_assistant.id,
+        thread_id=thread_id,
+        assistant_id=lifecycle.assistant_id,
         timeout=1000
     )
 
@@ -66,57 +96,204 @@ def process_pdf(pdf_path):
         raise Exception(f"Run failed: {run.status}")
 
     # Retrieve messages from thread
-    messages_cursor = client.beta.threads.messages.list(thread_id=thread.id)
+    messages_cursor = client.beta.threads.messages.list(thread_id=thread_id)
     messages = [msg for msg in messages_cursor]
 
     # Return the assistant's first text output
     return messages[0].content[0].text.value
 
+
+# --------------------------
+# 5. Retries and progress
+# --------------------------
+def with_retries(fn, *args, retries=3, backoff=2.0, label=""):
+    """
+    Call fn(*args), retrying failed attempts with exponential backoff plus jitter.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn(*args)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = backoff * (2 ** attempt) * (0.5 + random.random())
+            print(f"Attempt {attempt + 1} for {label} failed ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+class Progress:
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.counts = {"extracted": 0, "skipped": 0, "failed": 0}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def update(self, pdf_filename, status, message):
+        with self._lock:
+            self.done += 1
+            self.counts[status] += 1
+            elapsed = time.monotonic() - self.started
+            eta = elapsed / self.done * (self.total - self.done)
+            print(f"[{self.done}/{self.total}] {pdf_filename}: {message} "
+                  f"(elapsed {elapsed:.0f}s, eta {eta:.0f}s, failed {self.counts['failed']})")
+
+
 # --------------------------
-# 5. Main script
+# 6. Main script
 # --------------------------
-def main():
-    input_dir = './data/input/'
-    debug_dir = './data/debug/'
-    output_dir = './data/output/'
+def extract_with_assistant(pdf_filename, pdf_path, pdf_sha, manifest, timings, retries, backoff):
+    """
+    Upload the PDF and run the file_search assistant on it. Returns (raw response, file id).
+    """
+    started = time.monotonic()
+    file_id = with_retries(upload_pdf, pdf_path, manifest.file_id(pdf_sha),
+                           retries=retries, backoff=backoff, label=f"uploading {pdf_filename}")
+    manifest.record_upload(pdf_sha, file_id)
+    timings['upload_s'] = round(time.monotonic() - started, 3)
+
+    complete_response = with_retries(run_extraction, file_id,
+                                     retries=retries, backoff=backoff, label=pdf_filename)
+    timings['extract_s'] = round(time.monotonic() - started - timings['upload_s'], 3)
+    return complete_response, file_id
+
+
+def convert_pdf(pdf_filename, input_dir, debug_dir, output_dir, manifest, retries=3, backoff=2.0, force=False,
+                local_extractor=None):
+    """
+    Extract one PDF and save its raw and parsed responses, unless the manifest shows
+    it was already extracted with the current prompts. Returns (status, message).
+    With a local_extractor the text is extracted locally instead of uploading the PDF.
+    """
+    pdf_path = os.path.join(input_dir, pdf_filename)
+    output_path = os.path.join(output_dir, f'{pdf_filename}.json')
+    pdf_sha = manifest.pdf_hash(pdf_path)
+    if not force and manifest.is_done(pdf_sha):
+        done_path = manifest.get(pdf_sha)['output_path']
+        if os.path.abspath(done_path) != os.path.abspath(output_path):
+            # same content under another name: reuse that extraction
+            shutil.copyfile(done_path, output_path)
+            return "skipped", f"identical to {os.path.basename(done_path)}, output copied"
+        return "skipped", "unchanged since last extraction"
+
+    manifest.start(pdf_sha, pdf_path)
+    timings = {}
+    started = time.monotonic()
+    file_id = None
+    try:
+        if local_extractor:
+            contract_json, chunk_responses = with_retries(local_extractor.extract, pdf_path,
+                                                          retries=retries, backoff=backoff, label=pdf_filename)
+            complete_response = json.dumps(chunk_responses, indent=4)
+            timings['extract_s'] = round(time.monotonic() - started, 3)
+        else:
+            complete_response, file_id = extract_with_assistant(pdf_filename, pdf_path, pdf_sha, manifest,
+                                                                timings, retries, backoff)
+            contract_json = extract_json_from_string(complete_response)
+    except Exception as e:
+        timings['total_s'] = round(time.monotonic() - started, 3)
+        manifest.fail(pdf_sha, str(e), timings)
+        raise
+
+    # Save raw response for debugging
+    save_json_string_to_file(
+        complete_response,
+        os.path.join(debug_dir, f'complete_response_{pdf_filename}.json')
+    )
+
+    timings['total_s'] = round(time.monotonic() - started, 3)
+    if contract_json:
+        save_json_string_to_file(contract_json, output_path)
+        manifest.finish(pdf_sha, output_path, timings)
+        if file_id:
+            # the upload is only kept around for retries; once extracted it can go
+            manifest.record_upload(pdf_sha, None)
+            lifecycle.release_file(file_id)
+        return "extracted", "saved extracted JSON"
+
+    manifest.fail(pdf_sha, "no valid JSON extracted", timings)
+    return "failed", "no valid JSON extracted"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract contract JSON from the PDFs in the input folder.")
+    parser.add_argument("--input-dir", default='./data/input/')
+    parser.add_argument("--debug-dir", default='./data/debug/')
+    parser.add_argument("--output-dir", default='./data/output/')
+    parser.add_argument("--manifest", default='./data/extraction_manifest.jsonl',
+                        help="records what was extracted with which prompts, so reruns skip unchanged PDFs")
+    parser.add_argument("--assistant-cache", default=lifecycle.cache_path,
+                        help="where the id of the reusable assistant is cached")
+    parser.add_argument("--engine", choices=["assistant", "local"], default="assistant",
+                        help="assistant: upload the PDF for file_search; local: extract text with PyMuPDF "
+                             "and send section chunks to chat completions")
+    parser.add_argument("--chunk-workers", type=int, default=4,
+                        help="chunks of one PDF extracted at once by the local engine")
+    parser.add_argument("--force", action="store_true", help="re-extract every PDF even if it is unchanged")
+    parser.add_argument("--concurrency", type=int, default=4, help="number of PDFs processed at once")
+    parser.add_argument("--retries", type=int, default=3, help="retries per PDF after a failed attempt")
+    parser.add_argument("--backoff", type=float, default=2.0, help="base delay in seconds between retries")
+    parser.add_argument("--upload-max-age-days", type=float, default=7.0,
+                        help="uploads of PDFs that keep failing are deleted after this many days")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    input_dir, debug_dir, output_dir = args.input_dir, args.debug_dir, args.output_dir
 
     os.makedirs(debug_dir, exist_ok=True)
     os.makedirs(output_dir, exist_ok=True)
 
     pdf_files = [f for f in os.listdir(input_dir) if f.lower().endswith('.pdf')]
     if not pdf_files:
+        # still runs to the end, which deletes the uploads left by PDFs that were removed
         print("No PDF files found in", input_dir)
-        return
 
-    for pdf_filename in pdf_files:
-        pdf_path = os.path.join(input_dir, pdf_filename)
-        print(f"Processing {pdf_filename} with model {MODEL_NAME}...")
+    local_extractor = None
+    extraction_hash = PROMPT_HASH
+    if args.engine == "local":
+        local_extractor = LocalContractExtractor(client, MODEL_NAME, system_instruction, extraction_prompt,
+                                                 max_workers=max(1, args.chunk_workers))
+        # the two engines produce different results, so each keeps its own manifest entries
+        extraction_hash = prompt_hash(PROMPT_HASH, "local")
 
-        try:
-            complete_response = process_pdf(pdf_path)
+    manifest = ExtractionManifest(args.manifest, extraction_hash)
+    lifecycle.cache_path = args.assistant_cache
+    concurrency = max(1, args.concurrency)
+    print(f"Processing {len(pdf_files)} PDF(s) with model {MODEL_NAME} ({args.engine} engine), {concurrency} at a time...")
+    progress = Progress(len(pdf_files))
 
-            # Save raw response for debugging
-            save_json_string_to_file(
-                complete_response,
-                os.path.join(debug_dir, f'complete_response_{pdf_filename}.json')
-            )
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {
+                executor.submit(convert_pdf, pdf_filename, input_dir, debug_dir, output_dir, manifest,
+                                args.retries, args.backoff, args.force, local_extractor): pdf_filename
+                for pdf_filename in pdf_files
+            }
+            for future in as_completed(futures):
+                pdf_filename = futures[future]
+                try:
+                    status, message = future.result()
+                except Exception as e:
+                    status, message = "failed", f"error: {e}"
+                progress.update(pdf_filename, status, message)
 
-            # Try to parse JSON
-            contract_json = extract_json_from_string(complete_response)
-            if contract_json:
-                save_json_string_to_file(
-                    contract_json,
-                    os.path.join(output_dir, f'{pdf_filename}.json')
-                )
-                print(f"Saved extracted JSON for {pdf_filename}")
-            else:
-                print(f"No valid JSON extracted from {pdf_filename}")
+        # uploads are kept for retrying failed PDFs; drop those of removed PDFs and old failures
+        current_shas = {manifest.pdf_hash(os.path.join(input_dir, f)) for f in pdf_files
+                        if os.path.exists(os.path.join(input_dir, f))}
+        for pdf_sha, file_id in manifest.stale_uploads(current_shas, args.upload_max_age_days * 86400).items():
+            manifest.record_upload(pdf_sha, None)
+            lifecycle.release_file(file_id)
+    finally:
+        # wait for background deletion of threads and files before exiting
+        lifecycle.close()
 
-        except Exception as e:
-            print(f"Error processing {pdf_filename}: {e}")
+    counts = progress.counts
+    print(f"Finished: {counts['extracted']} extracted, {counts['skipped']} skipped, {counts['failed']} failed.")
 
 # --------------------------
-# 6. Entry point
+# 7. Entry point
 # --------------------------
 if __name__ == "__main__":
     main()
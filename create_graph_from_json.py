@@ -2,27 +2,50 @@
 import os
 import json
 import sys
+import hashlib
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from neo4j import GraphDatabase, exceptions
+from EmbeddingPipeline import EmbeddingPipeline, OpenAIBatchEmbedder, LocalHashEmbedder
+from EmbeddingCache import EmbeddingCache, CachedEmbedder
+from QueryCache import BUMP_GRAPH_GENERATION_STATEMENT
+from PdfTextCache import contract_id_from_sha256
 
 # -------------------------
 # Cypher and constants
 # -------------------------
-CREATE_GRAPH_STATEMENT = """
-WITH $data AS data
-WITH data.agreement as a
+# One transaction per batch. Every row of $batch is a contract whose clauses were already
+# diffed against the graph (see diff_clauses), so only the changed clauses and excerpts are written.
+UPSERT_GRAPH_STATEMENT = """
+UNWIND $batch AS row
+WITH row, row.agreement as a
 MERGE (agreement:Agreement {contract_id: a.contract_id})
-ON CREATE SET 
+SET
   agreement.name = a.agreement_name,
   agreement.effective_date = a.effective_date,
   agreement.expiration_date = a.expiration_date,
   agreement.agreement_type = a.agreement_type,
   agreement.renewal_term = a.renewal_term,
-  agreement.most_favored_country = a.governing_law.most_favored_country
+  agreement.most_favored_country = a.governing_law.most_favored_country,
+  agreement.source_hash = row.source_hash
 
+WITH row, a, agreement
+CALL {
+  WITH a, agreement
+  MATCH (agreement)-[old:GOVERNED_BY_LAW]->(c:Country) WHERE c.name <> a.governing_law.country
+  DELETE old
+}
 MERGE (gl_country:Country {name: a.governing_law.country})
 MERGE (agreement)-[gbl:GOVERNED_BY_LAW]->(gl_country)
 SET gbl.state = a.governing_law.state
 
+WITH row, a, agreement
+CALL {
+  WITH a, agreement
+  MATCH (o:Organization)-[old:IS_PARTY_TO]->(agreement) WHERE NOT o.name IN [party IN a.parties | party.name]
+  DELETE old
+}
 FOREACH (party IN a.parties |
   MERGE (p:Organization {name: party.name})
   MERGE (p)-[ipt:IS_PARTY_TO]->(agreement)
@@ -32,17 +55,65 @@ FOREACH (party IN a.parties |
   SET incorporated.state = party.incorporation_state
 )
 
-WITH a, agreement, [clause IN a.clauses WHERE clause.exists = true] AS valid_clauses
-FOREACH (clause IN valid_clauses |
-  CREATE (cl:ContractClause {type: clause.clause_type})
-  MERGE (agreement)-[clt:HAS_CLAUSE]->(cl)
-  SET clt.type = clause.clause_type
-  FOREACH (excerpt IN clause.excerpts |
-    MERGE (cl)-[:HAS_EXCERPT]->(e:Excerpt {text: excerpt})
-  )
-  MERGE (clType:ClauseType{name: clause.clause_type})
-  MERGE (cl)-[:HAS_TYPE]->(clType)
-)
+WITH row, agreement
+CALL {
+  WITH row, agreement
+  UNWIND row.removed_clauses AS clause_type
+  MATCH (agreement)-[:HAS_CLAUSE]->(cl:ContractClause {type: clause_type})
+  OPTIONAL MATCH (cl)-[:HAS_EXCERPT]->(e:Excerpt)
+  DETACH DELETE cl, e
+}
+CALL {
+  WITH row, agreement
+  UNWIND row.removed_excerpts AS x
+  MATCH (agreement)-[:HAS_CLAUSE]->(:ContractClause {type: x.clause_type})-[:HAS_EXCERPT]->(e:Excerpt {text: x.text})
+  DETACH DELETE e
+}
+CALL {
+  WITH row, agreement
+  UNWIND row.added_clauses AS clause_type
+  CREATE (cl:ContractClause {type: clause_type})
+  CREATE (agreement)-[:HAS_CLAUSE {type: clause_type}]->(cl)
+  MERGE (clType:ClauseType {name: clause_type})
+  CREATE (cl)-[:HAS_TYPE]->(clType)
+}
+CALL {
+  WITH row, agreement
+  UNWIND row.added_excerpts AS x
+  MATCH (agreement)-[:HAS_CLAUSE]->(cl:ContractClause {type: x.clause_type})
+  CREATE (cl)-[:HAS_EXCERPT]->(:Excerpt {text: x.text})
+}
+"""
+
+# What is already stored for the agreements of a batch, to diff against
+GET_STORED_AGREEMENTS_STATEMENT = """
+UNWIND $contract_ids AS contract_id
+MATCH (a:Agreement {contract_id: contract_id})
+RETURN a.contract_id AS contract_id, a.source_hash AS source_hash,
+       [(a)-[:HAS_CLAUSE]->(cl:ContractClause) |
+          {clause_type: cl.type, excerpts: [(cl)-[:HAS_EXCERPT]->(e:Excerpt) | e.text]}] AS clauses
+"""
+
+# Concurrent batches MERGE the same shared nodes; without these constraints two transactions
+# can both miss a node and both create it. Each constraint also backs its property with an index.
+CREATE_UNIQUE_CONSTRAINTS = [
+    ("agreementContractIdUnique", "CREATE CONSTRAINT agreementContractIdUnique IF NOT EXISTS FOR (a:Agreement) REQUIRE a.contract_id IS UNIQUE"),
+    ("countryNameUnique", "CREATE CONSTRAINT countryNameUnique IF NOT EXISTS FOR (c:Country) REQUIRE c.name IS UNIQUE"),
+    ("organizationNameUnique", "CREATE CONSTRAINT organizationNameUnique IF NOT EXISTS FOR (o:Organization) REQUIRE o.name IS UNIQUE"),
+    ("clauseTypeNameUnique", "CREATE CONSTRAINT clauseTypeNameUnique IF NOT EXISTS FOR (ct:ClauseType) REQUIRE ct.name IS UNIQUE"),
+]
+
+# Agreements written by the old loader were keyed by a loop counter and have no source_hash.
+# They are removed (with their clauses and excerpts) so a reload does not duplicate every contract.
+REMOVE_LEGACY_AGREEMENTS_STATEMENT = """
+MATCH (a:Agreement) WHERE a.source_hash IS NULL AND NOT a.contract_id IN $contract_ids
+OPTIONAL MATCH (a)-[:HAS_CLAUSE]->(cl:ContractClause)
+OPTIONAL MATCH (cl)-[:HAS_EXCERPT]->(e:Excerpt)
+WITH a, collect(DISTINCT cl) AS clauses, collect(DISTINCT e) AS excerpts
+FOREACH (n IN excerpts | DETACH DELETE n)
+FOREACH (n IN clauses | DETACH DELETE n)
+DETACH DELETE a
+RETURN count(*) AS removed
 """
 
 CREATE_VECTOR_INDEX_STATEMENT = """
@@ -57,17 +128,8 @@ CREATE_FULL_TEXT_INDICES = [
     ("clauseTypeNameTextIndex", "CREATE FULLTEXT INDEX clauseTypeNameTextIndex IF NOT EXISTS FOR (ct:ClauseType) ON EACH [ct.name]"),
     ("clauseNameTextIndex", "CREATE FULLTEXT INDEX contractClauseTypeTextIndex IF NOT EXISTS FOR (c:ContractClause) ON EACH [c.type]"),
     ("organizationNameTextIndex", "CREATE FULLTEXT INDEX organizationNameTextIndex IF NOT EXISTS FOR (o:Organization) ON EACH [o.name]"),
-    ("contractIdIndex","CREATE INDEX agreementContractId IF NOT EXISTS FOR (a:Agreement) ON (a.contract_id) ")
 ]
 
-EMBEDDINGS_STATEMENT = """
-MATCH (e:Excerpt) 
-WHERE e.text is not null and e.embedding is null
-SET e.embedding = genai.vector.encode(e.text, "OpenAI", { 
-                    token: $token, model: "text-embedding-3-small", dimensions: 1536
-                  })
-"""
-
 # -------------------------
 # Helpers
 # -------------------------
@@ -87,11 +149,32 @@ def create_full_text_indices(driver):
         except Exception as ex:
             print(f"[WARN] Could not ensure index {index_name}: {ex}")
 
+def create_unique_constraints(driver):
+    """
+    Ensure the uniqueness constraints the concurrent loader relies on.
+    Returns False if any of them could not be created (e.g. the graph already holds duplicates).
+    """
+    # the plain index on Agreement.contract_id is superseded by the constraint's own index
+    try:
+        if index_exists(driver, "agreementContractId"):
+            driver.execute_query("DROP INDEX agreementContractId IF EXISTS")
+    except Exception as ex:
+        print(f"[WARN] Could not drop index agreementContractId: {ex}")
+    ok = True
+    for constraint_name, create_query in CREATE_UNIQUE_CONSTRAINTS:
+        try:
+            driver.execute_query(create_query)
+        except Exception as ex:
+            print(f"[WARN] Could not create constraint {constraint_name}: {ex}")
+            ok = False
+    return ok
+
 # -------------------------
 # Configure runtime paths and env
 # -------------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 JSON_CONTRACT_FOLDER = os.path.join(BASE_DIR, "data", "output")
+PDF_CONTRACT_FOLDER = os.path.join(BASE_DIR, "data", "input")
 
 # Prefer explicit IPv4 to avoid localhost -> ::1 resolution issues
 NEO4J_URI = (os.getenv("NEO4J_URI") or "bolt://127.0.0.1:7687").strip()
@@ -99,98 +182,308 @@ NEO4J_USER = (os.getenv("NEO4J_USERNAME") or "neo4j").strip()
 NEO4J_PASSWORD = (os.getenv("NEO4J_PASSWORD") or "").strip()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-if not NEO4J_PASSWORD:
-    print("ERROR: NEO4J_PASSWORD environment variable not set. Set it and re-run.")
-    sys.exit(1)
-
 # -------------------------
-# Create driver and verify
+# Batched ingestion
 # -------------------------
-print(f"Connecting to Neo4j at {NEO4J_URI} as user '{NEO4J_USER}' ...")
-try:
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    # quick connectivity check to give a clear, immediate error if DB is unreachable
-    driver.verify_connectivity()
-    print("Successfully connected to Neo4j.")
-except exceptions.ServiceUnavailable as svc_ex:
-    print("ERROR: Could not reach Neo4j service. ServiceUnavailable:", svc_ex)
-    print(" - Make sure Neo4j is running and listening on the URL above.")
-    print(" - If using 'localhost', try setting NEO4J_URI to 'bolt://127.0.0.1:7687' explicitly.")
-    sys.exit(1)
-except exceptions.AuthError as auth_ex:
-    print("ERROR: Authentication to Neo4j failed:", auth_ex)
-    sys.exit(1)
-except Exception as e:
-    print("ERROR: Unexpected error creating Neo4j driver:", type(e).__name__, e)
-    sys.exit(1)
+def content_hash(json_data):
+    return hashlib.sha256(json.dumps(json_data, sort_keys=True).encode("utf-8")).hexdigest()
 
-# -------------------------
-# Validate input folder
-# -------------------------
-if not os.path.isdir(JSON_CONTRACT_FOLDER):
-    print(f"ERROR: JSON folder not found at {JSON_CONTRACT_FOLDER}")
-    print(" - Ensure the folder exists and contains JSON contract files.")
-    sys.exit(1)
 
-json_contracts = [f for f in os.listdir(JSON_CONTRACT_FOLDER) if f.lower().endswith(".json")]
-if not json_contracts:
-    print(f"No JSON contract files found in {JSON_CONTRACT_FOLDER}. Nothing to import.")
-    sys.exit(0)
+def stable_contract_id(json_contract, json_data, pdf_folder):
+    """
+    Derive a contract_id from the source content: the SHA-256 of the source PDF
+    (data/input/<name>.pdf for <name>.pdf.json) when it is available, else of the JSON itself.
+    The id is the first 13 hex digits (52 bits), so it stays exact as a JSON/JS number.
+    """
+    pdf_path = os.path.join(pdf_folder, json_contract[:-len(".json")]) if pdf_folder else None
+    if pdf_path and os.path.isfile(pdf_path):
+        with open(pdf_path, "rb") as fh:
+            digest = hashlib.sha256(fh.read()).hexdigest()
+    else:
+        digest = content_hash(json_data)
+    return contract_id_from_sha256(digest)
 
-# -------------------------
-# Ingest JSON files
-# -------------------------
-contract_id = 1
-for json_contract in json_contracts:
-    file_path = os.path.join(JSON_CONTRACT_FOLDER, json_contract)
-    print(f"Importing {file_path} ...")
-    try:
-        with open(file_path, "r", encoding="utf-8") as fh:
-            json_data = json.load(fh)
-    except Exception as e:
-        print(f"Failed to read/parse {file_path}: {e}")
-        continue
 
-    # add a contract_id if missing
-    agreement = json_data.get("agreement", {})
-    if "contract_id" not in agreement:
-        agreement["contract_id"] = contract_id
-        # ensure the change is present in the param map we pass to the query
-        json_data["agreement"] = agreement
+def load_contracts(json_folder, json_files, pdf_folder=None):
+    """
+    Read the JSON contracts, assigning a stable contract_id to those without one.
+    Files sharing a contract_id (outputs copied for byte-identical PDFs) are loaded once,
+    from the first file name in sorted order. Returns a list of (file name, json data).
+    """
+    contracts, seen = [], {}
+    for json_contract in sorted(json_files):
+        file_path = os.path.join(json_folder, json_contract)
+        try:
+            with open(file_path, "r", encoding="utf-8") as fh:
+                json_data = json.load(fh)
+        except Exception as e:
+            print(f"Failed to read/parse {file_path}: {e}")
+            continue
+
+        # add a contract_id if missing
+        agreement = json_data.get("agreement", {})
+        if "contract_id" not in agreement:
+            agreement["contract_id"] = stable_contract_id(json_contract, json_data, pdf_folder)
+            # ensure the change is present in the param map we pass to the query
+            json_data["agreement"] = agreement
+        if agreement["contract_id"] in seen:
+            print(f"[WARN] Skipping {json_contract}: same contract_id {agreement['contract_id']} as {seen[agreement['contract_id']]}")
+            continue
+        seen[agreement["contract_id"]] = json_contract
+        contracts.append((json_contract, json_data))
+    return contracts
+
+
+def diff_clauses(stored_clauses, agreement):
+    """
+    Compare the clauses stored for an agreement with the incoming JSON.
+    Returns the clause types and (clause_type, text) excerpts to add and to remove.
+    """
+    stored, stored_count = {}, {}
+    for clause in stored_clauses:
+        stored.setdefault(clause["clause_type"], set()).update(clause["excerpts"])
+        stored_count[clause["clause_type"]] = stored_count.get(clause["clause_type"], 0) + 1
+
+    incoming = {}
+    for clause in agreement.get("clauses") or []:
+        if clause.get("exists") is not True:
+            continue
+        excerpts = incoming.setdefault(clause["clause_type"], [])
+        for excerpt in clause.get("excerpts") or []:
+            if excerpt not in excerpts:
+                excerpts.append(excerpt)
+
+    # clause types duplicated by earlier non-idempotent imports are rebuilt from scratch
+    rebuilt = {clause_type for clause_type, count in stored_count.items() if count > 1}
+    for clause_type in rebuilt:
+        stored.pop(clause_type)
+
+    removed_clauses = [clause_type for clause_type in stored_count if clause_type not in incoming or clause_type in rebuilt]
+    added_clauses = [clause_type for clause_type in incoming if clause_type not in stored]
+    added_excerpts = [
+        {"clause_type": clause_type, "text": text}
+        for clause_type, excerpts in incoming.items() for text in excerpts
+        if text not in stored.get(clause_type, ())
+    ]
+    removed_excerpts = [
+        {"clause_type": clause_type, "text": text}
+        for clause_type, excerpts in stored.items() if clause_type in incoming
+        for text in excerpts if text not in incoming[clause_type]
+    ]
+    return {"added_clauses": added_clauses, "removed_clauses": removed_clauses,
+            "added_excerpts": added_excerpts, "removed_excerpts": removed_excerpts}
+
+
+def _upsert_batch(tx, batch):
+    """
+    Diff a batch against the stored agreements and write only what changed.
+    Contracts whose source_hash matches the stored one are skipped. Returns the number written.
+    """
+    contract_ids = [json_data["agreement"]["contract_id"] for json_data in batch]
+    stored = {record["contract_id"]: record
+              for record in tx.run(GET_STORED_AGREEMENTS_STATEMENT, contract_ids=contract_ids)}
+
+    rows = []
+    for json_data in batch:
+        agreement = json_data["agreement"]
+        source_hash = content_hash(json_data)
+        record = stored.get(agreement["contract_id"])
+        if record and record["source_hash"] == source_hash:
+            continue
+        row = diff_clauses(record["clauses"] if record else [], agreement)
+        row.update(agreement=agreement, source_hash=source_hash)
+        rows.append(row)
 
+    if rows:
+        tx.run(UPSERT_GRAPH_STATEMENT, batch=rows).consume()
+    return len(rows)
+
+
+def _write_batch(driver, batch):
+    # managed write transaction: transient errors (e.g. deadlocks between concurrent
+    # batches MERGE-ing the same Country/Organization nodes) are retried by the driver
+    with driver.session() as session:
+        return session.execute_write(_upsert_batch, batch)
+
+
+def remove_legacy_agreements(driver, contracts):
+    """
+    One-time migration from counter ids: delete the agreements the old loader wrote
+    (no source_hash) unless their id is one of the contracts being loaded.
+    Returns the number of agreements removed; 0 once the graph has been migrated.
+    """
+    contract_ids = [json_data["agreement"]["contract_id"] for _, json_data in contracts]
+    records, _, _ = driver.execute_query(REMOVE_LEGACY_AGREEMENTS_STATEMENT, contract_ids=contract_ids)
+    removed = records[0]["removed"] if records else 0
+    if removed:
+        print(f"Removed {removed} agreement(s) stored under the old counter ids; they are reloaded under hash ids.")
+    return removed
+
+
+def ingest_contracts(driver, contracts, batch_size=100, workers=4):
+    """
+    Upsert contracts in UNWIND batches of batch_size, with up to `workers` batches
+    in flight on separate sessions. A failed batch is retried one contract at a time,
+    so a malformed file only fails itself. Returns the number of contracts processed.
+    """
+    if not create_unique_constraints(driver) and workers > 1:
+        print("[WARN] Writing batches one at a time: concurrent MERGEs could duplicate nodes without the constraints.")
+        workers = 1
+
+    batches = [contracts[i:i + batch_size] for i in range(0, len(contracts), batch_size)]
+    written = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(_write_batch, driver, [json_data for _, json_data in batch]): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            names = [name for name, _ in batch]
+            try:
+                changed = future.result()
+                written += len(batch)
+                print(f"Upserted {len(batch)} contract(s), {changed} changed: {names[0]} .. {names[-1]}")
+            except exceptions.ServiceUnavailable as svc_ex:
+                print(f"[ERROR] Neo4j ServiceUnavailable while inserting batch {names}: {svc_ex}")
+                print(" - Check that Neo4j is still running and reachable.")
+            except Exception as e:
+                if len(batch) == 1:
+                    print(f"[ERROR] Failed to execute graph statement for {names[0]}: {e}")
+                    continue
+                print(f"[WARN] Batch {names[0]} .. {names[-1]} failed, retrying its contracts one by one: {e}")
+                written += _write_one_by_one(driver, batch)
+    return written
+
+
+def _write_one_by_one(driver, batch):
+    written = 0
+    for name, json_data in batch:
+        try:
+            _write_batch(driver, [json_data])
+            written += 1
+        except Exception as e:
+            print(f"[ERROR] Failed to execute graph statement for {name}: {e}")
+            # continue with the rest of the batch
+    print(f"Upserted {written}/{len(batch)} contract(s) of the failed batch individually")
+    return written
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load the extracted contract JSON files into Neo4j.")
+    parser.add_argument("--json-folder", default=JSON_CONTRACT_FOLDER)
+    parser.add_argument("--pdf-folder", default=PDF_CONTRACT_FOLDER,
+                        help="source PDFs; their content hash becomes the contract_id")
+    parser.add_argument("--batch-size", type=int, default=100, help="contracts written per transaction")
+    parser.add_argument("--workers", type=int, default=4, help="batches written concurrently")
+    parser.add_argument("--embedder", choices=["openai", "local"], default="openai",
+                        help="local: deterministic offline hashing embedder (tests / no API access)")
+    parser.add_argument("--embedding-batch-size", type=int, default=100, help="texts per embedding request")
+    parser.add_argument("--embedding-workers", type=int, default=4, help="embedding requests in flight")
+    parser.add_argument("--embedding-checkpoint", default=os.path.join(BASE_DIR, "data", "embedding_checkpoint.json"),
+                        help="progress file used to resume an interrupted embedding run")
+    return parser.parse_args(argv)
+
+
+def connect(uri, user, password):
+    """
+    Create the driver and verify it, exiting with a clear message if the DB is unreachable.
+    """
+    print(f"Connecting to Neo4j at {uri} as user '{user}' ...")
     try:
-        driver.execute_query(CREATE_GRAPH_STATEMENT, data=json_data)
-        print(f"Inserted graph data for {json_contract}")
+        driver = GraphDatabase.driver(uri, auth=(user, password))
+        # quick connectivity check to give a clear, immediate error if DB is unreachable
+        driver.verify_connectivity()
+        print("Successfully connected to Neo4j.")
+        return driver
     except exceptions.ServiceUnavailable as svc_ex:
-        print(f"[ERROR] Neo4j ServiceUnavailable while inserting {json_contract}: {svc_ex}")
-        print(" - Check that Neo4j is still running and reachable.")
-        break
+        print("ERROR: Could not reach Neo4j service. ServiceUnavailable:", svc_ex)
+        print(" - Make sure Neo4j is running and listening on the URL above.")
+        print(" - If using 'localhost', try setting NEO4J_URI to 'bolt://127.0.0.1:7687' explicitly.")
+        sys.exit(1)
+    except exceptions.AuthError as auth_ex:
+        print("ERROR: Authentication to Neo4j failed:", auth_ex)
+        sys.exit(1)
     except Exception as e:
-        print(f"[ERROR] Failed to execute graph statement for {json_contract}: {e}")
-        # continue processing other files
-    contract_id += 1
+        print("ERROR: Unexpected error creating Neo4j driver:", type(e).__name__, e)
+        sys.exit(1)
 
-# -------------------------
-# Create indices & embeddings
-# -------------------------
-try:
-    create_full_text_indices(driver)
-    print("Ensuring vector index (this may fail if your Neo4j version doesn't support vector indexes)...")
+
+def create_indices_and_embeddings(driver, args):
     try:
-        driver.execute_query(CREATE_VECTOR_INDEX_STATEMENT)
-    except Exception as e:
-        print(f"[WARN] Could not create vector index: {e}")
+        create_full_text_indices(driver)
+        print("Ensuring vector index (this may fail if your Neo4j version doesn't support vector indexes)...")
+        try:
+            driver.execute_query(CREATE_VECTOR_INDEX_STATEMENT)
+        except Exception as e:
+            print(f"[WARN] Could not create vector index: {e}")
 
-    print("Generating embeddings for excerpts (if any)...")
-    if OPENAI_API_KEY:
+        print("Generating embeddings for excerpts (if any)...")
+        if args.embedder == "local":
+            embedder = LocalHashEmbedder()
+        elif OPENAI_API_KEY:
+            embedder = OpenAIBatchEmbedder(model="text-embedding-3-small", api_key=OPENAI_API_KEY)
+        else:
+            print("[INFO] OPENAI_API_KEY not set — skipping embeddings.")
+            return
+        # excerpts already embedded in an earlier ingest (or shared boilerplate) cost no API call
+        embedder = CachedEmbedder(embedder, EmbeddingCache())
         try:
-            driver.execute_query(EMBEDDINGS_STATEMENT, token=OPENAI_API_KEY)
-            print("Embeddings job submitted.")
+            pipeline = EmbeddingPipeline(driver, embedder, batch_size=args.embedding_batch_size,
+                                         max_concurrency=args.embedding_workers,
+                                         checkpoint_path=args.embedding_checkpoint)
+            stats = pipeline.run()
+            print(f"Embeddings done: {stats['embedded']} excerpt(s) embedded, {stats['failed']} failed.")
         except Exception as e:
-            print(f"[WARN] Could not execute embeddings statement: {e}")
-    else:
-        print("[INFO] OPENAI_API_KEY not set — skipping embeddings.")
-except Exception as e:
-    print("[WARN] Error while creating indices or embeddings:", e)
+            print(f"[WARN] Could not generate embeddings: {e}")
+    except Exception as e:
+        print("[WARN] Error while creating indices or embeddings:", e)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if not NEO4J_PASSWORD:
+        print("ERROR: NEO4J_PASSWORD environment variable not set. Set it and re-run.")
+        sys.exit(1)
+
+    # -------------------------
+    # Validate input folder
+    # -------------------------
+    json_folder = args.json_folder
+    if not os.path.isdir(json_folder):
+        print(f"ERROR: JSON folder not found at {json_folder}")
+        print(" - Ensure the folder exists and contains JSON contract files.")
+        sys.exit(1)
+
+    json_contracts = [f for f in os.listdir(json_folder) if f.lower().endswith(".json")]
+    if not json_contracts:
+        print(f"No JSON contract files found in {json_folder}. Nothing to import.")
+        sys.exit(0)
+
+    driver = connect(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+
+    # -------------------------
+    # Ingest JSON files
+    # -------------------------
+    contracts = load_contracts(json_folder, json_contracts, args.pdf_folder)
+    started = time.monotonic()
+    removed = remove_legacy_agreements(driver, contracts)
+    written = ingest_contracts(driver, contracts, batch_size=max(1, args.batch_size), workers=args.workers)
+    elapsed = time.monotonic() - started
+    print(f"Imported {written}/{len(contracts)} contract(s) in {elapsed:.1f}s "
+          f"({written / elapsed if elapsed else 0:.1f} contracts/s)")
+    if written or removed:
+        # tell running ContractSearchService instances to drop their cached reads
+        driver.execute_query(BUMP_GRAPH_GENERATION_STATEMENT)
+
+    # -------------------------
+    # Create indices & embeddings
+    # -------------------------
+    create_indices_and_embeddings(driver, args)
+    driver.close()
+    print("Done.")
+
 
-print("Done.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import argparse
+import time
+from create_graph_from_json import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, connect
+from ExcerptVectorIndex import DEFAULT_INDEX_DIR, export_excerpt_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export embedded excerpts to an offline memory-mapped vector index.")
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR)
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    driver = connect(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    try:
+        started = time.perf_counter()
+        count = export_excerpt_index(driver, args.index_dir, page_size=args.page_size)
+        print(f"Exported {count} excerpt(s) to {args.index_dir} in {time.perf_counter() - started:.1f}s")
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
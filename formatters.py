@@ -1,28 +1,37 @@
+from typing import Callable, Iterable, List
 from neo4j_graphrag.types import RetrieverResultItem
-import ast
 from neo4j import Record
 
+# RETURN a.name as agreement_name, a.contract_id as contract_id, cc.type as clause_type, node.text as excerpt
+VECTOR_SEARCH_EXCERPT_FIELDS = ("agreement_name", "contract_id", "clause_type", "excerpt")
+VECTOR_SEARCH_EXCERPT_LABELS = ['Excerpt','Agreement','ContractClause']
+
+
+def _excerpt_text(record: Record) -> str:
+    text = record.get("text")
+    if text is None:
+        # a record with the whole node (a neo4j Node or a map projection) instead of node.text
+        node = record.get("node")
+        text = node.get("text") if node is not None else None
+    return text or ""
+
 def my_excerpt_record_formatter( record: Record) -> RetrieverResultItem:
     #set up metadata    
     metadata = {"score": record.get("score"),"nodeLabels": record.get("nodeLabels"),"id": record.get("id")}
-    
-    #Reformatting: node -> to_string -> to_dict -> d['text']
-    node = str(record.get("node")) #entire node as string
-    node_as_dict = ast.literal_eval(node) #convert to dict
-    node_text = "Excerpt: " + node_as_dict['text'] #take only the text property
-
-    return RetrieverResultItem(content= node_text,metadata = metadata)
+    return RetrieverResultItem(content= "Excerpt: " + _excerpt_text(record),metadata = metadata)
 
 def my_vector_search_excerpt_record_formatter( record: Record) -> RetrieverResultItem:
     #set up metadata    
-    metadata = {"contract_id": record.get("contract_id"),"nodeLabels": ['Excerpt','Agreement','ContractClause']}
+    metadata = {"contract_id": record.get("contract_id"),"nodeLabels": VECTOR_SEARCH_EXCERPT_LABELS}
 
-    #Reformatting: get individual fields from the RETURN stattement. 
-    #RETURN a.name as agreement_name, a.contract_id as contract_id, cc.type as clause_type, node.text as exceprt
-    result_dict = {}
-    result_dict['agreement_name'] = record.get("agreement_name") 
-    result_dict['contract_id'] = record.get("contract_id") 
-    result_dict['clause_type'] = record.get("clause_type") 
-    result_dict['excerpt'] = record.get("excerpt") 
+    #the fields are projected in the retrieval query; copy them as they are
+    result_dict = {field: record.get(field) for field in VECTOR_SEARCH_EXCERPT_FIELDS}
     
     return RetrieverResultItem(content = result_dict,metadata = metadata)
+
+def format_records(records: Iterable[Record],
+                   formatter: Callable[[Record], RetrieverResultItem] = my_excerpt_record_formatter) -> List[RetrieverResultItem]:
+    """
+    Format a whole result set with one formatter (e.g. rows fetched outside a retriever).
+    """
+    return [formatter(record) for record in records]
@@ -0,0 +1,103 @@
+import argparse
+import json
+from create_graph_from_json import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, connect
+from ContractService import (GET_CONTRACT_BY_ID_QUERY, GET_CONTRACTS_BY_PARTY_NAME_QUERY, CONTRACTS_PAGE_QUERY,
+                             CONTRACTS_COUNT_QUERY, CLAUSE_TYPE_FILTERS)
+
+# The ContractSearchService queries as they were before the directed / pattern-comprehension rewrite
+LEGACY_QUERIES = {
+    "get_contract": """
+        MATCH (a:Agreement {contract_id: $contract_id})-[:HAS_CLAUSE]->(clause:ContractClause)
+        WITH a, collect(clause) as clauses
+        MATCH (country:Country)-[i:INCORPORATED_IN]-(p:Organization)-[r:IS_PARTY_TO]-(a)
+        WITH a, clauses, collect(p) as parties, collect(country) as countries, collect(r) as roles, collect(i) as states
+        RETURN a as agreement, clauses, parties, countries, roles, states
+    """,
+    "get_contracts": """
+        CALL db.index.fulltext.queryNodes('organizationNameTextIndex', $organization_name)
+        YIELD node AS o, score
+        WITH o, score
+        ORDER BY score DESC
+        LIMIT 1
+        WITH o
+        MATCH (o)-[:IS_PARTY_TO]->(a:Agreement)
+        WITH a
+        MATCH (country:Country)-[i:INCORPORATED_IN]-(p:Organization)-[r:IS_PARTY_TO]-(a:Agreement)
+        RETURN a as agreement, collect(p) as parties, collect(r) as roles, collect(country) as countries, collect(i) as states
+    """,
+    "get_contracts_with_clause_type": """
+        MATCH (a:Agreement)-[:HAS_CLAUSE]->(cc:ContractClause {type: $clause_type})
+        WITH a
+        MATCH (country:Country)-[i:INCORPORATED_IN]-(p:Organization)-[r:IS_PARTY_TO]-(a:Agreement)
+        RETURN a as agreement, collect(p) as parties, collect(r) as roles, collect(country) as countries, collect(i) as states
+    """,
+    "get_contracts_without_clause": """
+        MATCH (a:Agreement)
+        OPTIONAL MATCH (a)-[:HAS_CLAUSE]->(cc:ContractClause {type: $clause_type})
+        WITH a,cc
+        WHERE cc is NULL
+        WITH a
+        MATCH (country:Country)-[i:INCORPORATED_IN]-(p:Organization)-[r:IS_PARTY_TO]-(a)
+        RETURN a as agreement, collect(p) as parties, collect(r) as roles, collect(country) as countries, collect(i) as states
+    """,
+}
+
+CURRENT_QUERIES = {
+    "get_contract": GET_CONTRACT_BY_ID_QUERY,
+    "get_contracts": GET_CONTRACTS_BY_PARTY_NAME_QUERY,
+    "get_contracts_with_clause_type": CONTRACTS_PAGE_QUERY.replace("{clause_filter}", CLAUSE_TYPE_FILTERS["with"]),
+    "get_contracts_without_clause": CONTRACTS_PAGE_QUERY.replace("{clause_filter}", CLAUSE_TYPE_FILTERS["without"]),
+    "count_contracts_without_clause": CONTRACTS_COUNT_QUERY.replace("{clause_filter}", CLAUSE_TYPE_FILTERS["without"]),
+}
+
+
+def total_db_hits(plan):
+    """
+    Sum of dbHits over a PROFILE plan tree (the summary.profile dict).
+    """
+    if not plan:
+        return 0
+    return plan.get("dbHits", 0) + sum(total_db_hits(child) for child in plan.get("children", []))
+
+
+def profile(driver, query, parameters):
+    records, summary, _ = driver.execute_query("PROFILE " + query, parameters)
+    return {"db_hits": total_db_hits(summary.profile), "rows": len(records),
+            "ms": summary.result_available_after + summary.result_consumed_after}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record PROFILE db hits of the ContractSearchService queries, before and after.")
+    parser.add_argument("--contract-id", type=int, required=True, help="contract_id used by get_contract")
+    parser.add_argument("--organization", default="Cybergy", help="organization name used by get_contracts")
+    parser.add_argument("--clause-type", default="Non-Compete", help="clause type used by the clause queries")
+    parser.add_argument("--limit", type=int, default=100, help="page size of the paginated queries")
+    parser.add_argument("--output", help="also write the measurements to this JSON file")
+    args = parser.parse_args()
+
+    parameters = {"contract_id": args.contract_id, "organization_name": args.organization,
+                  "clause_type": args.clause_type, "limit": args.limit, "after_contract_id": None}
+    driver = connect(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    results = {}
+    try:
+        for name in CURRENT_QUERIES:
+            results[name] = {
+                "before": profile(driver, LEGACY_QUERIES[name], parameters) if name in LEGACY_QUERIES else None,
+                "after": profile(driver, CURRENT_QUERIES[name], parameters),
+            }
+    finally:
+        driver.close()
+
+    print(f"{'query':<32} {'db hits before':>15} {'db hits after':>14} {'rows before':>12} {'rows after':>11}")
+    for name, result in results.items():
+        before, after = result["before"], result["after"]
+        print(f"{name:<32} {before['db_hits'] if before else '-':>15} {after['db_hits']:>14} "
+              f"{before['rows'] if before else '-':>12} {after['rows']:>11}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=4)
+
+
+if __name__ == "__main__":
+    main()
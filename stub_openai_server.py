@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Minimal local stand-in for the OpenAI endpoints used by convert-pdf-to-json.py.
+Point the OpenAI client at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1
+so the extraction pipeline can be exercised without network access or API cost.
+
+Every run completes with a canned agreement JSON whose agreement_name is the name
+of the attached file (for chat completions: the "part i of n" of the prompt). --fail-every N marks every Nth run as failed to exercise retries.
+"""
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def canned_agreement(filename: str) -> str:
+    agreement = {
+        "agreement": {
+            "agreement_name": filename,
+            "agreement_type": "Stub Agreement",
+            "effective_date": "2020-01-01",
+            "expiration_date": "",
+            "renewal_term": "",
+            "Notice_period_to_Terminate_Renewal": "",
+            "parties": [{"role": "Vendor", "name": "Stub Vendor Inc", "incorporation_country": "United States", "incorporation_state": "Delaware"}],
+            "governing_law": {"country": "United States", "state": "New York", "most_favored_country": "United States"},
+            "clauses": [{"clause_type": "Non-Compete", "exists": False, "excerpts": []}]
+        }
+    }
+    return "```json\n" + json.dumps(agreement) + "\n```"
+
+
+class StubState:
+    def __init__(self, fail_every: int = 0, delay: float = 0.0):
+        self.fail_every = fail_every
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.files = {}       # file_id -> filename
+        self.threads = {}     # thread_id -> list of messages
+        self.runs = {}        # run_id -> run object
+        self.assistants = {}  # assistant_id -> assistant object
+        self.run_count = 0
+        self.requests = []    # (method, path) log, useful for assertions in tests
+
+    def new_id(self, prefix: str) -> str:
+        with self.lock:
+            return f"{prefix}_{next(self.ids)}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state: StubState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _json_body(self):
+        body = self._read_body()
+        return json.loads(body) if body else {}
+
+    def _not_found(self):
+        self._send({"error": {"message": f"No route for {self.command} {self.path}", "type": "invalid_request_error"}}, 404)
+
+    def _record(self):
+        with self.state.lock:
+            self.state.requests.append((self.command, self.path.split('?')[0]))
+
+    def do_POST(self):
+        self._record()
+        state = self.state
+        path = self.path.split('?')[0]
+        now = int(time.time())
+
+        if path == "/v1/assistants":
+            body = self._json_body()
+            assistant = {"id": state.new_id("asst"), "object": "assistant", "created_at": now,
+                         "model": body.get("model"), "name": body.get("name"), "description": body.get("description"),
+                         "instructions": body.get("instructions"), "tools": body.get("tools", []), "metadata": body.get("metadata") or {}}
+            state.assistants[assistant["id"]] = assistant
+            return self._send(assistant)
+
+        if path == "/v1/files":
+            body = self._read_body()
+            match = re.search(rb'filename="([^"]+)"', body)
+            file_id = state.new_id("file")
+            filename = match.group(1).decode('utf-8') if match else file_id
+            state.files[file_id] = filename
+            return self._send({"id": file_id, "object": "file", "bytes": len(body), "created_at": now,
+                               "filename": filename, "purpose": "assistants", "status": "processed"})
+
+        if path == "/v1/chat/completions":
+            body = self._json_body()
+            time.sleep(state.delay)
+            prompt = body["messages"][-1]["content"] if body.get("messages") else ""
+            part = re.search(r"part (\d+) of (\d+)", prompt)
+            content = canned_agreement(f"chunk {part.group(1)} of {part.group(2)}" if part else "chat")
+            return self._send({"id": state.new_id("chatcmpl"), "object": "chat.completion", "created": now,
+                               "model": body.get("model"),
+                               "choices": [{"index": 0, "finish_reason": "stop",
+                                            "message": {"role": "assistant", "content": content}}],
+                               "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}})
+
+        if path == "/v1/threads":
+            thread_id = state.new_id("thread")
+            state.threads[thread_id] = []
+            return self._send({"id": thread_id, "object": "thread", "created_at": now, "metadata": {}})
+
+        match = re.fullmatch(r"/v1/threads/([^/]+)/messages", path)
+        if match:
+            body = self._json_body()
+            message = self._message(match.group(1), "user", body.get("content", ""), body.get("attachments") or [])
+            state.threads.setdefault(match.group(1), []).append(message)
+            return self._send(message)
+
+        match = re.fullmatch(r"/v1/threads/([^/]+)/runs", path)
+        if match:
+            body = self._json_body()
+            thread_id = match.group(1)
+            time.sleep(state.delay)
+            with state.lock:
+                state.run_count += 1
+                failed = state.fail_every and state.run_count % state.fail_every == 0
+            run = {"id": state.new_id("run"), "object": "thread.run", "created_at": now, "thread_id": thread_id,
+                   "assistant_id": body.get("assistant_id"), "status": "failed" if failed else "completed",
+                   "model": "stub", "instructions": "", "tools": [], "metadata": {}, "parallel_tool_calls": True}
+            if not failed:
+                attachments = [a for m in state.threads.get(thread_id, []) for a in m.get("attachments", [])]
+                filename = state.files.get(attachments[-1]["file_id"], "unknown") if attachments else "unknown"
+                state.threads[thread_id].insert(0, self._message(thread_id, "assistant", canned_agreement(filename), []))
+            state.runs[run["id"]] = run
+            return self._send(run)
+
+        self._not_found()
+
+    def do_GET(self):
+        self._record()
+        state = self.state
+        path = self.path.split('?')[0]
+
+        match = re.fullmatch(r"/v1/files/([^/]+)", path)
+        if match:
+            filename = state.files.get(match.group(1))
+            if filename is None:
+                return self._not_found()
+            return self._send({"id": match.group(1), "object": "file", "bytes": 0, "created_at": int(time.time()),
+                               "filename": filename, "purpose": "assistants", "status": "processed"})
+
+        match = re.fullmatch(r"/v1/threads/([^/]+)", path)
+        if match:
+            if match.group(1) not in state.threads:
+                return self._not_found()
+            return self._send({"id": match.group(1), "object": "thread", "created_at": int(time.time()), "metadata": {},
+                               "tool_resources": {"file_search": {"vector_store_ids": [f"vs_{match.group(1)}"]}}})
+
+        match = re.fullmatch(r"/v1/assistants/([^/]+)", path)
+        if match:
+            assistant = state.assistants.get(match.group(1))
+            return self._send(assistant) if assistant else self._not_found()
+
+        match = re.fullmatch(r"/v1/threads/([^/]+)/runs/([^/]+)", path)
+        if match and match.group(2) in state.runs:
+            return self._send(state.runs[match.group(2)])
+
+        match = re.fullmatch(r"/v1/threads/([^/]+)/messages", path)
+        if match:
+            messages = state.threads.get(match.group(1), [])
+            after = parse_qs(urlparse(self.path).query).get("after")
+            if after:
+                ids = [m["id"] for m in messages]
+                messages = messages[ids.index(after[0]) + 1:] if after[0] in ids else []
+            return self._send({"object": "list", "data": messages, "has_more": False,
+                               "first_id": messages[0]["id"] if messages else None,
+                               "last_id": messages[-1]["id"] if messages else None})
+
+        self._not_found()
+
+    def do_DELETE(self):
+        self._record()
+        state = self.state
+        path = self.path.split('?')[0]
+        for prefix, store, obj in (("/v1/files/", state.files, "file"),
+                                   ("/v1/threads/", state.threads, "thread"),
+                                   ("/v1/assistants/", state.assistants, "assistant"),
+                                   ("/v1/vector_stores/", {}, "vector_store")):
+            if path.startswith(prefix):
+                object_id = path[len(prefix):]
+                store.pop(object_id, None)
+                return self._send({"id": object_id, "object": f"{obj}.deleted", "deleted": True})
+        self._not_found()
+
+    def _message(self, thread_id, role, text, attachments):
+        return {"id": self.state.new_id("msg"), "object": "thread.message", "created_at": int(time.time()),
+                "thread_id": thread_id, "role": role, "attachments": attachments, "metadata": {},
+                "content": [{"type": "text", "text": {"value": text, "annotations": []}}]}
+
+
+def start_stub_server(port: int = 0, fail_every: int = 0, delay: float = 0.0):
+    """
+    Start the stub server in a background thread. Returns (server, state);
+    the base URL is http://127.0.0.1:<server.server_port>/v1
+    """
+    state = StubState(fail_every=fail_every, delay=delay)
+    handler = type("BoundStubHandler", (StubHandler,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-every", type=int, default=0, help="fail every Nth run (0 = never)")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds each run takes")
+    args = parser.parse_args()
+
+    server, _ = start_stub_server(args.port, args.fail_every, args.delay)
+    print(f"Stub OpenAI server listening on http://127.0.0.1:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
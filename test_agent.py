@@ -69,12 +69,18 @@ async def basic_agent() :
         history.add_message(result)
     
 
+def any_contract_id():
+    # contract ids are content hashes, so take one that is in the graph
+    records, _, _ = contract_search_neo4j._driver.execute_query(
+        "MATCH (a:Agreement) RETURN a.contract_id AS contract_id ORDER BY a.contract_id LIMIT 1")
+    return records[0]["contract_id"]
+
 async def test_contract_search():
     print(
         await kernel.invoke_prompt(
             function_name="get_contract",
             plugin_name="contract_search",
-            prompt="Can you get me information for contract 1 and return in JSON format",
+            prompt=f"Can you get me information for contract {any_contract_id()} and return in JSON format",
             settings=settings
         )
     )
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import ContractService
+from ContractService import ContractSearchService
+
+
+class FakeAsyncDriver:
+    instances = []
+
+    def __init__(self, uri, auth=None, max_connection_pool_size=None):
+        self.loops = set()
+        self.closed = False
+        FakeAsyncDriver.instances.append(self)
+
+    async def execute_query(self, query, parameters=None, routing_=None):
+        self.loops.add(asyncio.get_running_loop())
+        return [{"query": query}], None, None
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeSyncDriver:
+    def close(self):
+        pass
+
+
+def test_one_async_driver_serves_every_event_loop_and_is_closed():
+    original = ContractService.AsyncGraphDatabase.driver
+    ContractService.AsyncGraphDatabase.driver = FakeAsyncDriver
+    try:
+        service = ContractSearchService.__new__(ContractSearchService)
+        service._driver = FakeSyncDriver()
+        service._async_driver_config = {"uri": "bolt://fake", "auth": None, "max_connection_pool_size": 5}
+        service._async_driver = service._driver_loop = service._driver_loop_thread = None
+        service._driver_loop_lock = threading.Lock()
+
+        # Streamlit runs every request in its own asyncio.run loop
+        for _ in range(3):
+            records, _, _ = asyncio.run(service._execute_read("RETURN 1"))
+            assert records == [{"query": "RETURN 1"}]
+
+        assert len(FakeAsyncDriver.instances) == 1
+        driver = FakeAsyncDriver.instances[0]
+        assert len(driver.loops) == 1
+
+        asyncio.run(service.close())
+        assert driver.closed and not any(t.name == "neo4j-async-driver" for t in threading.enumerate())
+    finally:
+        ContractService.AsyncGraphDatabase.driver = original
+
+
+if __name__ == "__main__":
+    test_one_async_driver_serves_every_event_loop_and_is_closed()
@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+from ContractCatalog import ContractCatalog
+from ContractService import ContractSearchService
+
+INPUT_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "input", "CybergyHoldingsInc.pdf")
+
+
+def test_catalog_pages_and_searches_uploads():
+    with tempfile.TemporaryDirectory() as folder:
+        catalog = ContractCatalog(os.path.join(folder, "catalog.sqlite"))
+        for i, name in enumerate(["Supply Agreement", "Distribution Agreement", "Supply_100% Deal"]):
+            path = os.path.join(folder, f"contract_{i}.pdf")
+            shutil.copy(INPUT_PDF, path)
+            entry = catalog.add(name, path, uploaded_at=f"2025-01-0{i + 1}T00:00:00")
+            assert entry["size"] == os.path.getsize(INPUT_PDF) and entry["page_count"] > 0
+
+        assert [c["name"] for c in catalog.list()] == ["Supply_100% Deal", "Distribution Agreement", "Supply Agreement"]
+        assert [c["name"] for c in catalog.list(offset=1, limit=1)] == ["Distribution Agreement"]
+        assert catalog.count("supply") == 2
+        # LIKE wildcards in the search text are matched literally
+        assert [c["name"] for c in catalog.list(search="y_100%")] == ["Supply_100% Deal"]
+        assert catalog.count("y%a") == 0
+
+
+def test_service_backfills_the_catalog_from_the_contracts_folder():
+    with tempfile.TemporaryDirectory() as folder:
+        os.makedirs(os.path.join(folder, "data", "contracts"))
+        shutil.copy(INPUT_PDF, os.path.join(folder, "data", "contracts", "Cybergy_Holdings_20250101000000.pdf"))
+        service = ContractSearchService.__new__(ContractSearchService)
+        service._catalog = ContractCatalog(os.path.join(folder, "catalog.sqlite"))
+        service._catalog_synced = False
+
+        cwd = os.getcwd()
+        os.chdir(folder)
+        try:
+            contracts = service.get_all_contracts()
+            assert [c["name"] for c in contracts] == ["Cybergy Holdings"]
+            assert contracts[0]["file_path"] == os.path.join(folder, "data/contracts", "Cybergy_Holdings_20250101000000.pdf")
+
+            # files removed by hand disappear on the next rescan
+            os.remove(contracts[0]["file_path"])
+            assert service.sync_contract_catalog() == {"added": 0, "removed": 1}
+            assert service.count_contracts() == 0
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_catalog_pages_and_searches_uploads()
+    test_service_backfills_the_catalog_from_the_contracts_folder()
@@ -0,0 +1,59 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from ContractChunkIndex import BM25Index, ContractChunkIndex, SIDECAR_SUFFIX
+from ContractPlugin import ContractPlugin
+from PdfTextCache import PdfTextCache, contract_id_from_sha256
+from ResponseCache import ResponseCache
+
+INPUT_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "input", "CybergyHoldingsInc.pdf")
+
+
+class ExcerptService:
+    def __init__(self):
+        self.requested = []
+
+    async def get_contract_excerpts(self, contract_id):
+        self.requested.append(contract_id)
+        return {"contract_id": contract_id, "clauses": [
+            {"clause_type": "Non-Compete", "excerpts": ["No competition."]},
+            {"clause_type": "Governing Law", "excerpts": ["This agreement is governed by the laws of Delaware."]},
+        ]}
+
+
+def test_bm25_ranks_the_matching_chunk_first():
+    index = BM25Index(["The term of this agreement is five years.",
+                       "Either party may terminate on thirty days written notice.",
+                       "Payment is due within sixty days of the invoice."])
+    assert index.search("How can the agreement be terminated with notice?")[0][0] == 1
+    assert index.search("the of and") == []
+
+
+def test_chunk_index_is_persisted_and_used_for_questions():
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = os.path.join(folder, "contract.pdf")
+        shutil.copy(INPUT_PDF, pdf_path)
+        text_cache = PdfTextCache()
+        passages = ContractChunkIndex(text_cache).search(pdf_path, "governing law", top_k=2)
+        assert 1 <= len(passages) <= 2
+        assert any("law" in passage.lower() for passage in passages)
+        assert os.path.exists(pdf_path + SIDECAR_SUFFIX)
+
+        # a question without matching terms falls back to the contract's clause excerpts in the graph
+        service = ExcerptService()
+        plugin = ContractPlugin(service, response_cache=ResponseCache(os.path.join(folder, "responses.sqlite")))
+        context = asyncio.run(plugin.get_question_context(pdf_path, "zzzz qqqq"))
+        assert context == "Non-Compete: No competition.\n\n---\n\nGoverning Law: This agreement is governed by the laws of Delaware."
+        assert service.requested == [contract_id_from_sha256(text_cache.content_hash(pdf_path))]
+
+        # for a contract in the graph, the matching excerpts come first, then the matching chunks
+        context = asyncio.run(plugin.get_question_context(pdf_path, "governing law", top_k=2))
+        parts = context.split("\n\n---\n\n")
+        assert parts[0] == "Governing Law: This agreement is governed by the laws of Delaware."
+        assert parts[1:] == passages
+
+
+if __name__ == "__main__":
+    test_bm25_ranks_the_matching_chunk_first()
+    test_chunk_index_is_persisted_and_used_for_questions()
@@ -0,0 +1,88 @@
+import asyncio
+from AgreementSchema import ClauseType
+from ContractService import ContractSearchService
+from QueryCache import QueryResultCache
+
+
+class PagedService(ContractSearchService):
+    """
+    ContractSearchService over an in-memory list of agreements; _execute_read
+    applies the cursor and limit the way the Cypher page query does.
+    """
+    def __init__(self, contract_ids):
+        self._result_cache = QueryResultCache(generation_check_interval=3600)
+        self._contract_ids = sorted(contract_ids)
+        self.queries = []
+
+    async def _fetch_graph_generation(self):
+        return 0
+
+    async def _execute_read(self, query, parameters=None):
+        self.queries.append(parameters)
+        if "count(a)" in query:
+            return [{"count": len(self._contract_ids)}], None, None
+        if "UNWIND $contract_ids" in query:
+            excerpts = ["Shall not compete."] if parameters["include_excerpts"] else []
+            rows = [{"agreement": {"contract_id": i, "name": f"contract {i}"},
+                     "clauses": [{"type": "Non-Compete", "excerpts": excerpts}],
+                     "parties": []} for i in parameters["contract_ids"] if i in self._contract_ids]
+            return rows[::-1], None, None
+        after = parameters["after_contract_id"]
+        ids = [i for i in self._contract_ids if after is None or i > after][:parameters["limit"]]
+        rows = [{"agreement": {"contract_id": i, "name": f"contract {i}", "agreement_type": "License"},
+                 "parties": [{"name": "Acme", "role": "Licensor", "incorporation_country": "USA",
+                              "incorporation_state": "Delaware"}]} for i in ids]
+        return rows, None, None
+
+
+def test_cursor_pages_and_stream():
+    async def scenario():
+        service = PagedService([5, 1, 9, 3, 7])
+        first = await service.get_contracts_without_clause(ClauseType.NON_COMPETE, limit=2)
+        assert [a["contract_id"] for a in first] == [1, 3]
+        assert first[0]["parties"][0]["role"] == "Licensor"
+        second = await service.get_contracts_without_clause(
+            ClauseType.NON_COMPETE, limit=2, after_contract_id=first[-1]["contract_id"])
+        assert [a["contract_id"] for a in second] == [5, 7]
+
+        streamed = [a["contract_id"] async for a in service.stream_contracts_with_clause_type(
+            ClauseType.NON_COMPETE, page_size=2)]
+        assert streamed == [1, 3, 5, 7, 9]
+        assert await service.count_contracts_with_clause_type(ClauseType.NON_COMPETE) == 5
+
+    asyncio.run(scenario())
+
+
+def test_page_sizes_are_clamped():
+    async def scenario():
+        service = PagedService([5, 1, 9])
+        assert [a["contract_id"] for a in await service.get_contracts_with_clause_type(
+            ClauseType.NON_COMPETE, limit=-3)] == [1]
+        await service.get_contracts_without_clause(ClauseType.NON_COMPETE, limit=10 ** 6)
+        assert service.queries[-1]["limit"] == 500
+
+        streamed = [a["contract_id"] async for a in service.stream_contracts_without_clause(
+            ClauseType.NON_COMPETE, page_size=0)]
+        assert streamed == [1, 5, 9]
+
+    asyncio.run(scenario())
+
+
+def test_contracts_by_ids_in_one_query():
+    async def scenario():
+        service = PagedService([1, 3, 5])
+        agreements = await service.get_contracts_by_ids([5, 4, 1, 5], format="long")
+        assert [a["contract_id"] for a in agreements] == [5, 1]
+        assert agreements[0]["clauses"] == [{"clause_type": "Non-Compete"}]
+        assert len(service.queries) == 1
+
+        with_excerpts = await service.get_contracts_by_ids([3], include_excerpts=True)
+        assert with_excerpts[0]["clauses"] == [{"clause_type": "Non-Compete", "excerpts": ["Shall not compete."]}]
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_cursor_pages_and_stream()
+    test_page_sizes_are_clamped()
+    test_contracts_by_ids_in_one_query()
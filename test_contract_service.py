@@ -11,9 +11,13 @@ async def test_contract_service():
     
     service = ContractSearchService(uri, user, pwd)
     
-    # Test get_contract
-    print("=== Testing get_contract(contract_id=1) ===")
-    contract = await service.get_contract(contract_id=1)
+    # Test get_contract with an id from the graph (ids are content hashes)
+    records, _, _ = service._driver.execute_query(
+        "MATCH (a:Agreement) RETURN a.contract_id AS contract_id ORDER BY a.contract_id LIMIT 1")
+    contract_id = records[0]["contract_id"]
+    print(f"=== Testing get_contract(contract_id={contract_id}) ===")
+    contract = await service.get_contract(contract_id=contract_id)
+    assert contract["contract_id"] == contract_id
     print(contract)
     
     # Test get_contracts by organization
@@ -43,5 +47,12 @@ async def test_contract_service():
         except Exception as e:
             print(f"Error testing clause type {clause_type.value}: {e}")
 
+    # Test the count-only and streaming variants
+    print("\n=== Testing count/stream for the first ClauseType ===")
+    clause_type = list(ClauseType)[0]
+    total = await service.count_contracts_without_clause(clause_type)
+    streamed = [c async for c in service.stream_contracts_without_clause(clause_type, page_size=25)]
+    print(f"Clause Type: {clause_type.value}, counted {total}, streamed {len(streamed)}")
+
 if __name__ == "__main__":
     asyncio.run(test_contract_service())
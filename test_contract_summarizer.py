@@ -0,0 +1,70 @@
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+from ContractSummarizer import ContractSummarizer, SummaryCache
+
+
+class EchoLLM:
+    """
+    Chat service stand-in: answers every prompt with a short note and records the prompts.
+    """
+    ai_model_id = "echo"
+
+    def __init__(self):
+        self.prompts = []
+        self.running = 0
+        self.max_running = 0
+
+    async def get_chat_message_contents(self, chat_history, settings, kernel=None):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        prompt = chat_history.messages[-1].content
+        self.prompts.append(prompt)
+        return [SimpleNamespace(content=f"note {len(self.prompts)}")]
+
+
+def contract_pages(changed_section=None, inserted_section=None):
+    sections = [f"ARTICLE {i + 1}\n" + (f"Clause text {i} " * 40) for i in range(12)]
+    if changed_section is not None:
+        sections[changed_section] += "Amended."
+    if inserted_section is not None:
+        sections.insert(inserted_section, "ARTICLE 3A\n" + "Inserted clause text " * 30)
+    return ["\n".join(sections)]
+
+
+def test_map_reduce_with_bounded_concurrency_and_cached_chunks():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = SummaryCache(os.path.join(folder, "summaries.sqlite"))
+        llm = EchoLLM()
+        summarizer = ContractSummarizer(llm, cache, max_chars=1000, max_concurrency=2, reduce_group_size=4)
+        assert asyncio.run(summarizer.summarize(contract_pages())).startswith("note")
+        first_calls = summarizer.llm_calls
+        assert first_calls > 2
+        assert llm.max_running <= 2
+        assert llm.prompts[-1].startswith("Below are notes on the parts of a contract")
+
+        # one edited section: one map call plus the final summary
+        again = ContractSummarizer(llm, cache, max_chars=1000, max_concurrency=2, reduce_group_size=4)
+        asyncio.run(again.summarize(contract_pages(changed_section=3)))
+        assert again.llm_calls == 2
+
+        # an inserted section shifts the chunks after it, which are still cache hits
+        inserted = ContractSummarizer(llm, cache, max_chars=1000, max_concurrency=2, reduce_group_size=4)
+        asyncio.run(inserted.summarize(contract_pages(inserted_section=3)))
+        assert inserted.llm_calls == 2
+
+
+def test_short_contract_is_one_request():
+    llm = EchoLLM()
+    summarizer = ContractSummarizer(llm, cache=None)
+    asyncio.run(summarizer.summarize(["A short agreement."]))
+    assert summarizer.llm_calls == 1
+    assert llm.prompts[0].endswith("A short agreement.")
+
+
+if __name__ == "__main__":
+    test_map_reduce_with_bounded_concurrency_and_cached_chunks()
+    test_short_contract_is_one_request()
@@ -0,0 +1,150 @@
+import os
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from stub_openai_server import start_stub_server
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_PDF = os.path.join(BASE_DIR, "data", "input", "CybergyHoldingsInc.pdf")
+
+
+def run_converter(base_url, workdir, *extra_args):
+    env = dict(os.environ, OPENAI_API_KEY="stub-key", OPENAI_BASE_URL=base_url)
+    return subprocess.run(
+        [sys.executable, os.path.join(BASE_DIR, "convert-pdf-to-json.py"),
+         "--input-dir", os.path.join(workdir, "input"),
+         "--debug-dir", os.path.join(workdir, "debug"),
+         "--output-dir", os.path.join(workdir, "output"),
+         "--manifest", os.path.join(workdir, "manifest.jsonl"),
+         "--assistant-cache", os.path.join(workdir, "assistant_cache.json"),
+         *extra_args],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+
+
+def make_input_folder(workdir, count):
+    input_dir = os.path.join(workdir, "input")
+    os.makedirs(input_dir)
+    for i in range(count):
+        pdf_path = os.path.join(input_dir, f"contract_{i}.pdf")
+        shutil.copy(SAMPLE_PDF, pdf_path)
+        # trailing comment bytes give every copy its own content hash
+        with open(pdf_path, "ab") as fh:
+            fh.write(f"\n%copy {i}\n".encode())
+
+
+def test_concurrent_batch_with_retries():
+    # every 3rd run fails on the stub, so some files only succeed after a retry
+    server, state = start_stub_server(fail_every=3)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            make_input_folder(workdir, 6)
+            result = run_converter(f"http://127.0.0.1:{server.server_port}/v1", workdir,
+                                   "--concurrency", "3", "--retries", "3", "--backoff", "0.01")
+            print(result.stdout, result.stderr)
+            assert result.returncode == 0
+
+            outputs = sorted(os.listdir(os.path.join(workdir, "output")))
+            assert outputs == [f"contract_{i}.pdf.json" for i in range(6)]
+            for name in outputs:
+                with open(os.path.join(workdir, "output", name)) as fh:
+                    assert json.load(fh)["agreement"]["agreement_name"] == name[:-len(".json")]
+            assert "[6/6]" in result.stdout
+            assert "6 extracted, 0 skipped, 0 failed" in result.stdout
+    finally:
+        server.shutdown()
+
+
+def test_rerun_skips_unchanged_pdfs():
+    server, state = start_stub_server()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            make_input_folder(workdir, 2)
+            base_url = f"http://127.0.0.1:{server.server_port}/v1"
+            first = run_converter(base_url, workdir)
+            assert "2 extracted, 0 skipped" in first.stdout
+
+            uploads = state.requests.count(("POST", "/v1/files"))
+            second = run_converter(base_url, workdir)
+            print(second.stdout, second.stderr)
+            assert "0 extracted, 2 skipped" in second.stdout
+            assert state.requests.count(("POST", "/v1/files")) == uploads
+
+            # a missing output file makes the PDF stale again; its upload is reused
+            os.remove(os.path.join(workdir, "output", "contract_0.pdf.json"))
+            third = run_converter(base_url, workdir)
+            assert "1 extracted, 1 skipped" in third.stdout
+            assert state.requests.count(("POST", "/v1/files")) == uploads + 1
+    finally:
+        server.shutdown()
+
+
+def test_assistant_reused_and_remote_objects_cleaned_up():
+    server, state = start_stub_server()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            make_input_folder(workdir, 3)
+            base_url = f"http://127.0.0.1:{server.server_port}/v1"
+            run_converter(base_url, workdir)
+            assert state.requests.count(("POST", "/v1/assistants")) == 1
+            assert state.files == {} and state.threads == {}
+
+            os.remove(os.path.join(workdir, "output", "contract_0.pdf.json"))
+            result = run_converter(base_url, workdir)
+            assert "1 extracted, 2 skipped" in result.stdout
+            assert state.requests.count(("POST", "/v1/assistants")) == 1
+            assert state.files == {} and state.threads == {}
+    finally:
+        server.shutdown()
+
+
+def test_uploads_of_failed_pdfs_do_not_pile_up():
+    # every run fails: the uploads are kept in the manifest for the next attempt
+    server, state = start_stub_server(fail_every=1)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            make_input_folder(workdir, 2)
+            base_url = f"http://127.0.0.1:{server.server_port}/v1"
+            result = run_converter(base_url, workdir, "--retries", "0")
+            assert "0 extracted, 0 skipped, 2 failed" in result.stdout
+            assert len(state.files) == 2
+
+            # a removed PDF's upload is deleted; a failure older than the max age too
+            os.remove(os.path.join(workdir, "input", "contract_0.pdf"))
+            run_converter(base_url, workdir, "--retries", "0")
+            assert sorted(state.files.values()) == ["contract_1.pdf"]
+            run_converter(base_url, workdir, "--retries", "0", "--upload-max-age-days", "0")
+            assert state.files == {}
+    finally:
+        server.shutdown()
+
+
+def test_local_engine_merges_chunks_without_uploads():
+    server, state = start_stub_server()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            make_input_folder(workdir, 1)
+            result = run_converter(f"http://127.0.0.1:{server.server_port}/v1", workdir, "--engine", "local")
+            print(result.stdout, result.stderr)
+            assert "1 extracted" in result.stdout
+            assert state.requests.count(("POST", "/v1/files")) == 0
+            assert state.requests.count(("POST", "/v1/chat/completions")) > 1
+
+            with open(os.path.join(workdir, "output", "contract_0.pdf.json")) as fh:
+                agreement = json.load(fh)["agreement"]
+            # the first chunk wins for scalar fields, parties are merged by name
+            assert agreement["agreement_name"].startswith("chunk 1 of ")
+            assert [p["name"] for p in agreement["parties"]] == ["Stub Vendor Inc"]
+            assert agreement["clauses"] == [{"clause_type": "Non-Compete", "exists": False, "excerpts": []}]
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_concurrent_batch_with_retries()
+    test_rerun_skips_unchanged_pdfs()
+    test_assistant_reused_and_remote_objects_cleaned_up()
+    test_uploads_of_failed_pdfs_do_not_pile_up()
+    test_local_engine_merges_chunks_without_uploads()
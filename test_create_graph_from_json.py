@@ -0,0 +1,136 @@
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+from create_graph_from_json import diff_clauses, load_contracts, ingest_contracts, remove_legacy_agreements
+
+
+def clause(clause_type, excerpts, exists=True):
+    return {"clause_type": clause_type, "exists": exists, "excerpts": excerpts}
+
+
+def test_diff_clauses_only_reports_changes():
+    stored = [
+        {"clause_type": "Non-Compete", "excerpts": ["a", "b"]},
+        {"clause_type": "Insurance", "excerpts": ["c"]},
+    ]
+    agreement = {"clauses": [
+        clause("Non-Compete", ["a", "d"]),
+        clause("Audit Rights", ["e"]),
+        clause("Insurance", ["c"], exists=False),
+    ]}
+    diff = diff_clauses(stored, agreement)
+    assert diff["added_clauses"] == ["Audit Rights"]
+    assert diff["removed_clauses"] == ["Insurance"]
+    assert diff["added_excerpts"] == [{"clause_type": "Non-Compete", "text": "d"},
+                                      {"clause_type": "Audit Rights", "text": "e"}]
+    assert diff["removed_excerpts"] == [{"clause_type": "Non-Compete", "text": "b"}]
+
+    unchanged = diff_clauses(stored, {"clauses": [clause("Non-Compete", ["b", "a"]), clause("Insurance", ["c"])]})
+    assert unchanged == {"added_clauses": [], "removed_clauses": [], "added_excerpts": [], "removed_excerpts": []}
+
+
+def test_diff_clauses_rebuilds_duplicated_clauses():
+    stored = [
+        {"clause_type": "Non-Compete", "excerpts": ["a"]},
+        {"clause_type": "Non-Compete", "excerpts": ["a"]},
+    ]
+    diff = diff_clauses(stored, {"clauses": [clause("Non-Compete", ["a"])]})
+    assert diff["removed_clauses"] == ["Non-Compete"]
+    assert diff["added_clauses"] == ["Non-Compete"]
+    assert diff["added_excerpts"] == [{"clause_type": "Non-Compete", "text": "a"}]
+
+
+def test_contract_id_is_stable_across_runs_and_file_order():
+    with tempfile.TemporaryDirectory() as folder:
+        for name in ("b.pdf.json", "a.pdf.json"):
+            with open(os.path.join(folder, name), "w") as fh:
+                json.dump({"agreement": {"agreement_name": name, "clauses": []}}, fh)
+
+        first = {name: data["agreement"]["contract_id"] for name, data in load_contracts(folder, ["a.pdf.json", "b.pdf.json"])}
+        second = {name: data["agreement"]["contract_id"] for name, data in load_contracts(folder, ["b.pdf.json", "a.pdf.json"])}
+        assert first == second
+        assert first["a.pdf.json"] != first["b.pdf.json"]
+        assert all(0 < contract_id < 2 ** 53 for contract_id in first.values())
+
+
+def test_files_sharing_a_contract_id_are_loaded_once():
+    with tempfile.TemporaryDirectory() as folder:
+        # convert-pdf-to-json copies the output for byte-identical PDFs
+        for name in ("copy.pdf.json", "original.pdf.json"):
+            with open(os.path.join(folder, name), "w") as fh:
+                json.dump({"agreement": {"agreement_name": "Supply", "clauses": [clause("Non-Compete", ["a"])]}}, fh)
+
+        contracts = load_contracts(folder, ["original.pdf.json", "copy.pdf.json"])
+        assert [name for name, _ in contracts] == ["copy.pdf.json"]
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, fn, batch):
+        # like the MERGE on a null governing_law.country, one bad contract fails the whole transaction
+        if any(json_data["agreement"].get("bad") for json_data in batch):
+            raise ValueError("Cannot merge node using null property value")
+        self._driver.stored.extend(json_data["agreement"]["contract_id"] for json_data in batch)
+        return len(batch)
+
+
+class FakeDriver:
+    def __init__(self, fail_constraints=False):
+        self.stored = []
+        self.queries = []
+        self._fail_constraints = fail_constraints
+
+    def session(self):
+        return FakeSession(self)
+
+    def execute_query(self, query, *args, **kwargs):
+        self.queries.append(query)
+        if self._fail_constraints and "CONSTRAINT" in query:
+            raise ValueError("duplicates")
+        return SimpleNamespace(records=[])
+
+
+def test_failed_batch_is_retried_contract_by_contract():
+    contracts = [(f"{i}.json", {"agreement": {"contract_id": i, "bad": i == 3}}) for i in range(10)]
+    driver = FakeDriver()
+    assert ingest_contracts(driver, contracts, batch_size=5, workers=2) == 9
+    assert sorted(driver.stored) == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+    assert sum("REQUIRE" in query for query in driver.queries) == 4
+
+
+def test_concurrent_load_needs_the_unique_constraints():
+    contracts = [(f"{i}.json", {"agreement": {"contract_id": i}}) for i in range(4)]
+    # without the constraints the batches are still written, one at a time
+    assert ingest_contracts(FakeDriver(fail_constraints=True), contracts, batch_size=1, workers=4) == 4
+
+
+def test_legacy_agreements_are_removed_before_loading():
+    class LegacyDriver(FakeDriver):
+        def execute_query(self, query, *args, **kwargs):
+            self.queries.append((query, kwargs))
+            return [{"removed": 3}], None, None
+
+    driver = LegacyDriver()
+    contracts = [("a.json", {"agreement": {"contract_id": 11}}), ("b.json", {"agreement": {"contract_id": 12}})]
+    assert remove_legacy_agreements(driver, contracts) == 3
+    query, parameters = driver.queries[0]
+    assert "source_hash IS NULL" in query and parameters == {"contract_ids": [11, 12]}
+
+
+if __name__ == "__main__":
+    test_diff_clauses_only_reports_changes()
+    test_diff_clauses_rebuilds_duplicated_clauses()
+    test_contract_id_is_stable_across_runs_and_file_order()
+    test_files_sharing_a_contract_id_are_loaded_once()
+    test_failed_batch_is_retried_contract_by_contract()
+    test_concurrent_load_needs_the_unique_constraints()
+    test_legacy_agreements_are_removed_before_loading()
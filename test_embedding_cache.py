@@ -0,0 +1,51 @@
+import os
+import tempfile
+from EmbeddingCache import EmbeddingCache, CachedEmbedder
+from EmbeddingPipeline import LocalHashEmbedder
+
+
+class CountingQueryEmbedder:
+    """
+    A neo4j_graphrag-style embedder with only embed_query, like OpenAIEmbeddings.
+    """
+    model = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return LocalHashEmbedder(dimensions=32).embed_query(text)
+
+
+def test_repeated_texts_skip_the_embedding_call():
+    with tempfile.TemporaryDirectory() as folder:
+        inner = CountingQueryEmbedder()
+        embedder = CachedEmbedder(inner, EmbeddingCache(os.path.join(folder, "cache.sqlite")))
+        first = embedder.embed_documents(["a", "b", "a"])
+        assert inner.calls == 2
+        assert first[0] == first[2]
+
+        # a new cache object on the same file (another process) sees the stored vectors
+        again = CachedEmbedder(inner, EmbeddingCache(os.path.join(folder, "cache.sqlite")))
+        assert again.embed_query("b") == first[1]
+        assert inner.calls == 2
+
+
+def test_cache_is_keyed_by_model_and_bounded_in_size():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = EmbeddingCache(os.path.join(folder, "cache.sqlite"), max_bytes=256 * 1024)
+        cache.put_many("model-a", {"text": [1.0, 2.0]})
+        assert cache.get_many("model-b", ["text"]) == {}
+        assert cache.get_many("model-a", ["text"]) == {"text": [1.0, 2.0]}
+
+        CachedEmbedder(LocalHashEmbedder(), cache).embed_documents([f"excerpt {i}" for i in range(300)])
+        size = os.path.getsize(os.path.join(folder, "cache.sqlite"))
+        rows = cache._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        assert rows < 300
+        assert size < 4 * 1024 * 1024
+
+
+if __name__ == "__main__":
+    test_repeated_texts_skip_the_embedding_call()
+    test_cache_is_keyed_by_model_and_bounded_in_size()
@@ -0,0 +1,70 @@
+import math
+from EmbeddingPipeline import (EmbeddingPipeline, LocalHashEmbedder, GET_EXCERPTS_TO_EMBED_QUERY,
+                               SET_EMBEDDINGS_STATEMENT)
+
+
+class FakeExcerptDriver:
+    """
+    Stands in for the Neo4j driver: answers the two pipeline queries from an in-memory list of excerpts.
+    """
+    def __init__(self, texts):
+        self.excerpts = {f"4:x:{i:04d}": {"text": text, "embedding": None} for i, text in enumerate(texts)}
+
+    def execute_query(self, query, **params):
+        if query == GET_EXCERPTS_TO_EMBED_QUERY:
+            rows = [{"id": id, "text": e["text"]} for id, e in sorted(self.excerpts.items())
+                    if e["embedding"] is None and e["text"] and id > params["after"]]
+            return rows[:params["page_size"]], None, None
+        if query == SET_EMBEDDINGS_STATEMENT:
+            for row in params["rows"]:
+                for id in row["ids"]:
+                    self.excerpts[id]["embedding"] = row["embedding"]
+            return [], None, None
+        raise AssertionError(f"unexpected query {query}")
+
+
+class CountingEmbedder(LocalHashEmbedder):
+    def __init__(self, fail_first=0):
+        super().__init__(dimensions=64)
+        self.texts_embedded = 0
+        self.calls = 0
+        self.fail_first = fail_first
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.calls <= self.fail_first:
+            raise RuntimeError("rate limited")
+        self.texts_embedded += len(texts)
+        return super().embed_documents(texts)
+
+
+def test_local_embedder_is_deterministic_and_normalised():
+    embedder = LocalHashEmbedder(dimensions=64)
+    first, second = embedder.embed_documents(["The Licensee shall not assign", "The Licensee shall not assign"])
+    assert first == second and len(first) == 64
+    assert math.isclose(sum(v * v for v in first), 1.0)
+    assert embedder.embed_query("other text") != first
+
+
+def test_pipeline_embeds_each_distinct_text_once():
+    texts = ["boilerplate"] * 5 + [f"clause {i}" for i in range(7)] + [""]
+    driver = FakeExcerptDriver(texts)
+    embedder = CountingEmbedder()
+    stats = EmbeddingPipeline(driver, embedder, page_size=20, batch_size=3, max_concurrency=2, backoff=0).run()
+
+    assert stats["embedded"] == 12 and stats["failed"] == 0
+    assert embedder.texts_embedded == 8
+    assert all(e["embedding"] is not None for e in driver.excerpts.values() if e["text"])
+
+
+def test_pipeline_retries_and_pages_through_everything():
+    driver = FakeExcerptDriver([f"clause {i}" for i in range(10)])
+    embedder = CountingEmbedder(fail_first=1)
+    stats = EmbeddingPipeline(driver, embedder, page_size=4, batch_size=2, max_concurrency=1, backoff=0).run()
+    assert stats["embedded"] == 10 and stats["failed"] == 0
+
+
+if __name__ == "__main__":
+    test_local_embedder_is_deterministic_and_normalised()
+    test_pipeline_embeds_each_distinct_text_once()
+    test_pipeline_retries_and_pages_through_everything()
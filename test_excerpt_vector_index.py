@@ -0,0 +1,62 @@
+import asyncio
+import os
+import tempfile
+import numpy as np
+from ContractService import ContractSearchService
+from EmbeddingPipeline import LocalHashEmbedder
+from ExcerptVectorIndex import ExcerptVectorIndex, export_excerpt_index
+
+
+class FakeExcerptDriver:
+    """
+    Serves EXPORT_EXCERPTS_QUERY pages from a list of excerpts.
+    """
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda row: row["id"])
+
+    def execute_query(self, query, after="", page_size=1000, **kwargs):
+        return [row for row in self.rows if row["id"] > after][:page_size], None, None
+
+
+def make_rows(embedder, texts):
+    return [{"id": f"e{i:03d}", "agreement_name": f"contract {i % 3}", "contract_id": i % 3,
+             "clause_type": "Non-Compete", "excerpt": text, "embedding": embedder.embed_query(text)}
+            for i, text in enumerate(texts)]
+
+
+def test_export_and_exact_top_k():
+    embedder = LocalHashEmbedder(dimensions=64)
+    texts = [f"the supplier shall not compete in region {i}" for i in range(20)] + ["governing law is delaware"]
+    with tempfile.TemporaryDirectory() as folder:
+        index_dir = os.path.join(folder, "index")
+        assert export_excerpt_index(FakeExcerptDriver(make_rows(embedder, texts)), index_dir, page_size=7) == 21
+
+        index = ExcerptVectorIndex(index_dir, embedder=embedder, block_rows=5)
+        results = index.search_text("governing law is delaware", top_k=3)
+        assert results[0]["excerpt"] == "governing law is delaware"
+        assert abs(results[0]["score"] - 1.0) < 1e-5
+
+        vectors = np.asarray([embedder.embed_query(text) for text in texts])
+        query = np.asarray(embedder.embed_query("supplier compete region 4"))
+        expected = [texts[i] for i in np.argsort(-(vectors @ query), kind="stable")[:5]]
+        assert [item["excerpt"] for item in index.search(query, top_k=5)] == expected
+
+
+def test_backs_get_contracts_similar_text():
+    class OfflineService(ContractSearchService):
+        def __init__(self, excerpt_index, embedder):
+            self._excerpt_index = excerpt_index
+            self._openai_embedder = embedder
+
+    embedder = LocalHashEmbedder(dimensions=64)
+    with tempfile.TemporaryDirectory() as folder:
+        index_dir = os.path.join(folder, "index")
+        export_excerpt_index(FakeExcerptDriver(make_rows(embedder, ["no competition", "audit rights"])), index_dir)
+        service = OfflineService(ExcerptVectorIndex(index_dir), embedder)
+        agreements = asyncio.run(service.get_contracts_similar_text("audit rights", top_k=1, mode="vector"))
+        assert agreements[0]["clauses"][0]["excerpts"] == ["audit rights"]
+
+
+if __name__ == "__main__":
+    test_export_and_exact_top_k()
+    test_backs_get_contracts_similar_text()
@@ -0,0 +1,25 @@
+from neo4j import Record
+from formatters import my_vector_search_excerpt_record_formatter, format_records
+
+
+def test_excerpt_formatter_reads_projected_or_node_text():
+    text = "Licensee's \"territory\" ends 30 days after {notice}."
+    projected = Record([("text", text), ("score", 0.9), ("nodeLabels", ["Excerpt"]), ("id", "4:1")])
+    node = Record([("node", {"text": text, "embedding": [0.1] * 8}), ("score", 0.9)])
+    items = format_records([projected, node])
+    assert [item.content for item in items] == ["Excerpt: " + text] * 2
+    assert items[0].metadata == {"score": 0.9, "nodeLabels": ["Excerpt"], "id": "4:1"}
+
+
+def test_vector_search_formatter_copies_projected_fields():
+    record = Record([("agreement_name", "Supply"), ("contract_id", 7), ("clause_type", "Exclusivity"),
+                     ("excerpt", "exclusive"), ("score", 0.8)])
+    item = my_vector_search_excerpt_record_formatter(record)
+    assert item.content == {"agreement_name": "Supply", "contract_id": 7, "clause_type": "Exclusivity",
+                            "excerpt": "exclusive"}
+    assert item.metadata["contract_id"] == 7
+
+
+if __name__ == "__main__":
+    test_excerpt_formatter_reads_projected_or_node_text()
+    test_vector_search_formatter_copies_projected_fields()
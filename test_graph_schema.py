@@ -0,0 +1,48 @@
+import os
+import tempfile
+import GraphSchema
+
+
+class GenerationDriver:
+    def __init__(self, generation):
+        self.generation = generation
+
+    def execute_query(self, query, *args, **kwargs):
+        return [{"generation": self.generation}], None, None
+
+
+def test_schema_is_introspected_once_per_graph_generation():
+    calls = []
+
+    def fake_introspect(driver):
+        calls.append(driver.generation)
+        return f"Node properties:\nAgreement {{name: STRING}} g{driver.generation}"
+
+    original = GraphSchema.introspect_schema
+    GraphSchema.introspect_schema = fake_introspect
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            snapshot = os.path.join(folder, "schema.json")
+            driver = GenerationDriver(1)
+            first = GraphSchema.load_graph_schema(driver, snapshot)
+            assert GraphSchema.load_graph_schema(driver, snapshot) == first
+            assert calls == [1]
+
+            driver.generation = 2
+            assert GraphSchema.load_graph_schema(driver, snapshot).endswith("g2")
+            assert calls == [1, 2]
+    finally:
+        GraphSchema.introspect_schema = original
+
+
+def test_falls_back_to_the_built_in_schema():
+    class BrokenDriver:
+        def execute_query(self, *args, **kwargs):
+            raise RuntimeError("unreachable")
+
+    assert GraphSchema.load_graph_schema(BrokenDriver(), "unused.json") == GraphSchema.FALLBACK_NEO4J_SCHEMA
+
+
+if __name__ == "__main__":
+    test_schema_is_introspected_once_per_graph_generation()
+    test_falls_back_to_the_built_in_schema()
@@ -0,0 +1,83 @@
+import asyncio
+from ContractService import ContractSearchService
+from HybridSearch import lucene_query, reciprocal_rank_fusion, diversify
+
+
+def excerpt(contract_id, clause_type, text="..."):
+    return {"agreement_name": f"contract {contract_id}", "contract_id": contract_id,
+            "clause_type": clause_type, "excerpt": text}
+
+
+def clause_key(item):
+    return item["contract_id"], item["clause_type"]
+
+
+class FakeSearchService(ContractSearchService):
+    def __init__(self, vector, fulltext):
+        self._vector, self._fulltext = vector, fulltext
+        self.vector_calls = 0
+
+    async def _vector_excerpt_search(self, clause_text, limit):
+        self.vector_calls += 1
+        return self._vector[:limit]
+
+    async def _fulltext_excerpt_search(self, clause_text, limit):
+        if isinstance(self._fulltext, Exception):
+            raise self._fulltext
+        return self._fulltext[:limit]
+
+
+def test_fusion_dedupes_and_limits_per_contract():
+    vector = [excerpt(1, "Non-Compete"), excerpt(2, "Exclusivity"), excerpt(1, "Audit Rights")]
+    fulltext = [excerpt(2, "Exclusivity"), excerpt(1, "Non-Compete", "duplicate text"), excerpt(3, "Insurance")]
+    fused = reciprocal_rank_fusion([vector, fulltext], key=lambda item: (item["contract_id"], item["clause_type"]))
+    assert [(item["contract_id"], item["clause_type"]) for item in fused[:2]] == [(1, "Non-Compete"), (2, "Exclusivity")]
+    assert len(fused) == 4
+    assert [item["contract_id"] for item in diversify(fused, top_k=3, max_per_contract=1)] == [1, 2, 3]
+
+
+def test_fusion_counts_a_key_once_per_list():
+    # many excerpts of one clause must not outvote a clause ranked first by both searches
+    vector = [excerpt(2, "Exclusivity")] + [excerpt(1, "Non-Compete", f"excerpt {i}") for i in range(5)]
+    fulltext = [excerpt(2, "Exclusivity"), excerpt(1, "Non-Compete")]
+    fused = reciprocal_rank_fusion([vector, fulltext], key=clause_key)
+    assert [clause_key(item) for item in fused] == [(2, "Exclusivity"), (1, "Non-Compete")]
+    assert fused[1]["rrf_score"] == 1 / 62 + 1 / 62
+
+
+def test_modes():
+    async def scenario():
+        service = FakeSearchService([excerpt(1, "Non-Compete")], [excerpt(2, "Exclusivity")])
+        hybrid = await service.get_contracts_similar_text("shall not compete", top_k=5)
+        assert {a["contract_id"] for a in hybrid} == {1, 2}
+        fulltext = await service.get_contracts_similar_text("shall not compete", mode="fulltext")
+        assert [a["contract_id"] for a in fulltext] == [2]
+        assert service.vector_calls == 1
+
+        # a failing fulltext search leaves the vector results; alone it still raises
+        broken = FakeSearchService([excerpt(1, "Non-Compete")], ValueError("Cannot parse query"))
+        assert [a["contract_id"] for a in await broken.get_contracts_similar_text("shall not compete")] == [1]
+        try:
+            await broken.get_contracts_similar_text("shall not compete", mode="fulltext")
+            assert False, "expected the fulltext error"
+        except ValueError:
+            pass
+
+    asyncio.run(scenario())
+
+
+def test_lucene_query_escapes_operators():
+    assert lucene_query('term: "30 days" (notice)') == r'"term\: \"30 days\" \(notice\)"^2 OR (term\: \"30 days\" \(notice\))'
+    assert lucene_query("   ") == ""
+    # upper-case operator words are searched as words, not applied as operators
+    assert lucene_query("Licensee may NOT disclose Confidential Information") == \
+        '"Licensee may not disclose Confidential Information"^2 OR (Licensee may not disclose Confidential Information)'
+    assert lucene_query("rights AND") == '"rights and"^2 OR (rights and)'
+    assert lucene_query("this OR that && more") == r'"this or that \&& more"^2 OR (this or that \&& more)'
+
+
+if __name__ == "__main__":
+    test_fusion_dedupes_and_limits_per_contract()
+    test_fusion_counts_a_key_once_per_list()
+    test_modes()
+    test_lucene_query_escapes_operators()
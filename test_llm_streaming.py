@@ -0,0 +1,38 @@
+import asyncio
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+from ContractSummarizer import ContractSummarizer
+from LlmStreaming import LatencyLog, TimedStream, stream_chat
+
+
+class StreamingLLM:
+    ai_model_id = "streaming"
+
+    async def get_streaming_chat_message_contents(self, chat_history, settings, kernel=None):
+        for word in ["The ", "contract ", "is ", "short."]:
+            await asyncio.sleep(0.01)
+            yield [SimpleNamespace(content=word)]
+
+
+def test_timed_stream_yields_chunks_and_records_latency():
+    with tempfile.TemporaryDirectory() as folder:
+        log = LatencyLog(os.path.join(folder, "latency.jsonl"))
+        stream = TimedStream(stream_chat(StreamingLLM(), "Summarize"), kind="ask", log=log)
+        assert "".join(stream) == "The contract is short."
+        assert 0 < stream.metrics["ttft_s"] <= stream.metrics["total_s"]
+        with open(log.path, encoding="utf-8") as fh:
+            recorded = json.loads(fh.readline())
+        assert recorded["kind"] == "ask" and recorded["chars"] == len("The contract is short.")
+
+
+def test_summary_is_streamed():
+    summarizer = ContractSummarizer(StreamingLLM(), cache=None)
+    chunks = list(TimedStream(summarizer.stream_summary(["A short agreement."]), kind="summarize"))
+    assert chunks == ["The ", "contract ", "is ", "short."]
+
+
+if __name__ == "__main__":
+    test_timed_stream_yields_chunks_and_records_latency()
+    test_summary_is_streamed()
@@ -0,0 +1,30 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from PdfExtractor import extract_pages, _extract_range, page_count
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "input")
+LONG_PDF = os.path.join(INPUT_DIR, "AtnInternational.pdf")
+SHORT_PDF = os.path.join(INPUT_DIR, "CybergyHoldingsInc.pdf")
+
+
+def test_pool_extraction_matches_the_sequential_loop():
+    total = page_count(LONG_PDF)
+    assert total > 32
+    sequential = _extract_range(LONG_PDF, 0, total)
+    assert extract_pages(LONG_PDF, workers=4) == sequential
+    assert extract_pages(LONG_PDF, start=20, end=60, workers=2) == sequential[20:60]
+
+
+def test_concurrent_callers_share_the_pool():
+    # callers asking for different worker counts must not shut the pool down under each other
+    expected = {workers: _extract_range(LONG_PDF, 0, page_count(LONG_PDF)) for workers in (2, 4)}
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda workers: (workers, extract_pages(LONG_PDF, workers=workers)),
+                                    [2, 4, 2, 4]))
+    assert all(pages == expected[workers] for workers, pages in results)
+    assert extract_pages(SHORT_PDF, workers=4) == _extract_range(SHORT_PDF, 0, page_count(SHORT_PDF))
+
+
+if __name__ == "__main__":
+    test_pool_extraction_matches_the_sequential_loop()
+    test_concurrent_callers_share_the_pool()
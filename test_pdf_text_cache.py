@@ -0,0 +1,68 @@
+import json
+import os
+import shutil
+import tempfile
+from PdfTextCache import PdfTextCache, SIDECAR_SUFFIX
+
+INPUT_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "input", "CybergyHoldingsInc.pdf")
+
+
+class CountingTextCache(PdfTextCache):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.extractions = 0
+
+    def _extract_pages(self, pdf_path):
+        self.extractions += 1
+        return super()._extract_pages(pdf_path)
+
+
+def test_pages_are_served_from_memory_and_the_sidecar():
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = os.path.join(folder, "contract.pdf")
+        shutil.copy(INPUT_PDF, pdf_path)
+
+        cache = CountingTextCache()
+        pages = cache.get_pages(pdf_path)
+        assert pages and cache.get_pages(pdf_path) is pages
+        assert cache.extractions == 1
+        assert os.path.exists(pdf_path + SIDECAR_SUFFIX)
+
+        # a new instance (another process) reads the sidecar instead of the PDF
+        other = CountingTextCache()
+        assert other.get_pages(pdf_path) == pages
+        assert other.extractions == 0
+
+
+def test_stale_sidecar_is_ignored():
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = os.path.join(folder, "contract.pdf")
+        shutil.copy(INPUT_PDF, pdf_path)
+        CountingTextCache().get_pages(pdf_path)
+
+        # the sidecar was written for other PDF bytes
+        with open(pdf_path + SIDECAR_SUFFIX, "r", encoding="utf-8") as fh:
+            sidecar = json.load(fh)
+        with open(pdf_path + SIDECAR_SUFFIX, "w", encoding="utf-8") as fh:
+            json.dump({"sha256": "0" * 64, "pages": ["stale"]}, fh)
+
+        cache = CountingTextCache()
+        assert cache.get_pages(pdf_path) == sidecar["pages"]
+        assert cache.extractions == 1
+
+
+def test_hash_memo_is_bounded():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = PdfTextCache(max_hash_entries=2)
+        for i in range(4):
+            path = os.path.join(folder, f"{i}.pdf")
+            with open(path, "wb") as fh:
+                fh.write(bytes([i]))
+            cache.content_hash(path)
+        assert len(cache._hashes) == 2
+
+
+if __name__ == "__main__":
+    test_pages_are_served_from_memory_and_the_sidecar()
+    test_stale_sidecar_is_ignored()
+    test_hash_memo_is_bounded()
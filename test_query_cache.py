@@ -0,0 +1,57 @@
+import asyncio
+from QueryCache import QueryResultCache, cached_read
+
+
+class FakeService:
+    """
+    Stands in for ContractSearchService: counts reads and exposes a graph generation.
+    """
+    def __init__(self):
+        self._result_cache = QueryResultCache(generation_check_interval=0)
+        self.generation = 0
+        self.reads = 0
+
+    async def _fetch_graph_generation(self):
+        return self.generation
+
+    @cached_read
+    async def get_contract(self, contract_id: int):
+        self.reads += 1
+        return {"contract_id": contract_id}
+
+
+def test_repeated_reads_hit_the_cache_until_the_generation_changes():
+    async def scenario():
+        service = FakeService()
+        assert await service.get_contract(1) == {"contract_id": 1}
+        # positional and keyword calls share one entry
+        await service.get_contract(contract_id=1)
+        assert service.reads == 1
+        await service.get_contract(2)
+        assert service.reads == 2
+
+        service.generation += 1
+        await service.get_contract(1)
+        assert service.reads == 3
+        assert service._result_cache.hits == 1
+
+    asyncio.run(scenario())
+
+
+def test_entries_expire_and_are_bounded():
+    async def scenario():
+        service = FakeService()
+        service._result_cache = QueryResultCache(max_entries=2, ttl_seconds=0, generation_check_interval=0)
+        await service.get_contract(1)
+        await service.get_contract(1)
+        assert service.reads == 2
+        for contract_id in range(5):
+            await service.get_contract(contract_id)
+        assert len(service._result_cache._entries) == 2
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_repeated_reads_hit_the_cache_until_the_generation_changes()
+    test_entries_expire_and_are_bounded()
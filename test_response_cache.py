@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import time
+from types import SimpleNamespace
+from ContractPlugin import ContractPlugin
+from ContractSummarizer import SummaryCache
+from LlmStreaming import LatencyLog
+from ResponseCache import ResponseCache
+
+INPUT_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "input", "CybergyHoldingsInc.pdf")
+
+
+class CountingStreamingLLM:
+    ai_model_id = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_streaming_chat_message_contents(self, chat_history, settings, kernel=None):
+        self.calls += 1
+        for word in ["Delaware ", "law."]:
+            yield [SimpleNamespace(content=word)]
+
+
+class MovingService:
+    """
+    add_contract stand-in: moves the upload to data/contracts/<name>_<timestamp>.pdf like ContractSearchService.
+    """
+    def __init__(self):
+        self.uploads = 0
+
+    def add_contract(self, contract_name, source_file_path):
+        self.uploads += 1
+        dest_path = os.path.join(os.getcwd(), "data/contracts", f"{contract_name.replace(' ', '_')}_2025010100000{self.uploads}.pdf")
+        shutil.move(source_file_path, dest_path)
+        return dest_path
+
+
+def test_ttl_and_size_bounded_eviction():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ResponseCache(os.path.join(folder, "responses.sqlite"), ttl_seconds=0.2, max_bytes=30)
+        cache.put("pdf", "ask", "What law?", "m", "t", "Delaware")
+        assert cache.get("pdf", "ask", "  what LAW ", "m", "t") == "Delaware"
+        assert cache.get("pdf", "ask", "What law?", "other-model", "t") is None
+        for i in range(5):
+            cache.put("pdf", "ask", f"question {i}", "m", "t", "ten bytes!")
+        assert cache.get("pdf", "ask", "question 0", "m", "t") is None
+        assert cache.get("pdf", "ask", "question 4", "m", "t") == "ten bytes!"
+        time.sleep(0.3)
+        assert cache.get("pdf", "ask", "question 4", "m", "t") is None
+
+
+def test_answers_are_reused_until_the_contract_is_replaced():
+    with tempfile.TemporaryDirectory() as folder, open(INPUT_PDF, "rb") as fh:
+        pdf_bytes = fh.read()
+        uploaded = SimpleNamespace(getbuffer=lambda: pdf_bytes)
+        llm = CountingStreamingLLM()
+        plugin = ContractPlugin(MovingService(), llm=llm,
+                                response_cache=ResponseCache(os.path.join(folder, "responses.sqlite")),
+                                summary_cache=SummaryCache(os.path.join(folder, "summaries.sqlite")),
+                                latency_log=LatencyLog(os.path.join(folder, "latency.jsonl")))
+
+        cwd = os.getcwd()
+        os.chdir(folder)
+        try:
+            path = plugin.upload_contract("Supply Agreement", uploaded)["file_path"]
+            first = plugin.stream_answer(path, "Which governing law?")
+            assert "".join(first) == "Delaware law."
+            again = plugin.stream_answer(path, "which governing law")
+            assert "".join(again) == "Delaware law."
+            assert llm.calls == 1
+            # the cache hit is logged apart from the LLM request
+            assert not first.metrics["cached"] and again.metrics["cached"]
+
+            # uploading the contract again (the same bytes) invalidates the cached answers
+            path = plugin.upload_contract("Supply Agreement", uploaded)["file_path"]
+            "".join(plugin.stream_answer(path, "Which governing law?"))
+            assert llm.calls == 2
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_ttl_and_size_bounded_eviction()
+    test_answers_are_reused_until_the_contract_is_replaced()
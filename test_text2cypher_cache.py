@@ -0,0 +1,56 @@
+import asyncio
+from ContractService import ContractSearchService
+from EmbeddingPipeline import LocalHashEmbedder
+from Text2CypherCache import Text2CypherCache, normalize_question
+
+
+class CountingService(ContractSearchService):
+    """
+    ContractSearchService with the LLM and Neo4j replaced by counters.
+    """
+    def __init__(self):
+        self._text2cypher_cache = Text2CypherCache(max_entries=2)
+        self.generated = 0
+        self.validated = 0
+
+    def _generate_cypher(self, user_question):
+        self.generated += 1
+        return "MATCH (a:Agreement) RETURN count(a) AS agreements"
+
+    def _validate_cypher(self, cypher):
+        self.validated += 1
+
+    async def _execute_read(self, query, parameters=None):
+        return [{"agreements": 42}], None, None
+
+
+def test_repeated_questions_skip_generation():
+    async def scenario():
+        service = CountingService()
+        first = await service.answer_aggregation_question("How many agreements are there?")
+        second = await service.answer_aggregation_question("  how many AGREEMENTS are there ")
+        assert first == second and "42" in first
+        assert service.generated == 1 and service.validated == 1
+        assert service.text2cypher_cache_stats()["hits"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_eviction_and_similar_questions():
+    assert normalize_question("Which  contracts?") == "which contracts"
+    cache = Text2CypherCache(max_entries=1)
+    cache.put("first question", "RETURN 1")
+    cache.put("second question", "RETURN 2")
+    assert cache.get("first question") is None
+    assert cache.stats()["evictions"] == 1
+
+    similar = Text2CypherCache(embedder=LocalHashEmbedder(dimensions=256), similarity_threshold=0.8)
+    similar.put("how many agreements are governed by the law of delaware", "RETURN 3")
+    assert similar.get("how many agreements are governed by the law of Delaware please") == "RETURN 3"
+    assert similar.get("list organizations incorporated in france") is None
+    assert similar.stats()["similar_hits"] == 1
+
+
+if __name__ == "__main__":
+    test_repeated_questions_skip_generation()
+    test_eviction_and_similar_questions()